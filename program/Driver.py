@@ -1,44 +1,239 @@
+import os
 import sys
-from antlr4 import *
-from CompiscriptLexer import CompiscriptLexer
-from CompiscriptParser import CompiscriptParser
+import argparse
+from program.frontend.parsing import parse_file, parse_source
+from program.frontend.lowering import lower_program
+from program.frontend.deep import run_deep
 from program.semantic.type_checker import TypeChecker
-from program.semantic.error_reporter import ErrorReporter
+from program.semantic.parallel import check_program_parallel
+from program.semantic.error_reporter import ErrorReporter, SemanticError, text_sink, jsonl_sink
 from program.semantic.table import print_symbol_table
+from program.semantic.profiling import VisitorProfile
+from program.semantic.interface import StaleInterface, read_interface, write_interface, install
+from program.ir.tac_builder import TACBuilder
+from program.ir.tac_ir import ColumnarTACProgram
+from program.ir.tac_binary import write_tac
+from program.ir.tac_sink import TextSink
+from program.ir.optimize import optimize, PASSES, DEFAULT_PASSES
+from program.ir.liveness import rename_temps
 
 
-def main(argv):
-    if len(argv) < 2:
-        print("Uso: python Driver.py <archivo.cps>")
-        return
+def opt_passes(text: str) -> tuple[str, ...]:
+    passes = tuple(p.strip() for p in text.split(",") if p.strip())
+    unknown = [p for p in passes if p not in PASSES]
+    if not passes:
+        raise argparse.ArgumentTypeError("lista de pasadas vacía")
+    if unknown:
+        raise argparse.ArgumentTypeError(f"pasadas desconocidas: {', '.join(unknown)}")
+    return passes
+
+
+def build_arg_parser() -> argparse.ArgumentParser:
+    ap = argparse.ArgumentParser(prog="Driver.py", description="Compilador de Compiscript")
+    ap.add_argument("source", help="archivo .cps a compilar")
+    ap.add_argument("--ll", action="store_true",
+                    help="forzar parseo LL completo (sin la etapa SLL)")
+    ap.add_argument("--tac", action="store_true",
+                    help="generar TAC en el mismo recorrido del chequeo de tipos")
+    ap.add_argument("--tac-columns", action="store_true",
+                    help="con --tac, guardar el TAC por columnas (array de enteros), para programas grandes")
+    ap.add_argument("--opt", nargs="?", const=DEFAULT_PASSES, type=opt_passes, metavar="PASADAS",
+                    help="con --tac, optimizar el TAC; PASADAS separadas por coma entre "
+                         f"{', '.join(PASSES)} (por defecto {','.join(DEFAULT_PASSES)})")
+    ap.add_argument("--tac-out", metavar="ARCHIVO",
+                    help="con --tac, guardar además el TAC en formato binario (.ctac)")
+    ap.add_argument("--tac-stream", metavar="ARCHIVO",
+                    help="escribir el TAC en ARCHIVO a medida que se cierra cada función, "
+                         "sin tener el programa entero en memoria")
+    ap.add_argument("--jobs", type=int, default=1, metavar="N",
+                    help="procesos para chequear los cuerpos de funciones (1 = secuencial)")
+    ap.add_argument("--max-errors", type=int, default=None, metavar="N",
+                    help="detener el chequeo al llegar a N errores")
+    ap.add_argument("--dedupe", action="store_true",
+                    help="colapsar errores repetidos con el mismo código y símbolo")
+    ap.add_argument("--stream", action="store_true",
+                    help="imprimir cada error en cuanto se detecta")
+    ap.add_argument("--errors-jsonl", metavar="ARCHIVO",
+                    help="escribir los errores en ARCHIVO, un objeto JSON por línea")
+    ap.add_argument("--profile", nargs="?", const="table", choices=("table", "json"),
+                    help="medir tiempo y llamadas por visitor del chequeo (secuencial)")
+    ap.add_argument("--lib", action="append", default=[], metavar="ARCHIVO",
+                    help="cargar las declaraciones globales de ARCHIVO.cps (usa ARCHIVO.cpsi si está al día)")
+    ap.add_argument("--emit-interface", action="store_true",
+                    help="si no hay errores, guardar las declaraciones globales en <fuente>.cpsi")
+    ap.add_argument("--deep", action="store_true",
+                    help="permitir programas con anidamiento muy profundo (stack grande)")
+    return ap
+
+
+def check_tac_flags(ap: argparse.ArgumentParser, args) -> None:
+    """Rechaza las opciones de TAC que no tendrían efecto con las demás."""
+    given = [flag for flag, on in (("--tac-out", args.tac_out), ("--opt", args.opt),
+                                   ("--tac-columns", args.tac_columns)) if on]
+    if given and args.tac_stream:
+        ap.error(f"{given[0]} no se puede usar con --tac-stream")
+    if given and not args.tac:
+        ap.error(f"{given[0]} requiere --tac")
+
 
-    
-    input_stream = FileStream(argv[1], encoding="utf-8")
-    lexer = CompiscriptLexer(input_stream)
-    stream = CommonTokenStream(lexer)
-    parser = CompiscriptParser(stream)
+def interface_path(source_path: str) -> str:
+    return os.path.splitext(source_path)[0] + ".cpsi"
 
-    
-    tree = parser.program()
 
-    
+def library_symbols(path: str, force_ll: bool = False) -> list:
+    """
+    Símbolos globales de una biblioteca. Si su .cpsi corresponde al fuente
+    actual (y a esta versión del compilador) se cargan de ahí; si no, se
+    chequea el fuente y se regenera el .cpsi.
+    """
+    with open(path, encoding="utf-8") as f:
+        source = f.read()
+    cached = interface_path(path)
+    try:
+        return read_interface(cached, source)
+    except (OSError, StaleInterface):
+        pass
+
     reporter = ErrorReporter()
     checker = TypeChecker(reporter)
+    checker.visit(lower_program(parse_source(source, force_ll=force_ll).tree))
+    if reporter.has_errors():
+        print(f"\nErrores semánticos en {path}:")
+        for e in reporter:
+            print("   ", e)
+    else:
+        write_interface(cached, checker.scopes.stack[0], source)
+    return list(checker.scopes.stack[0].slots)
+
 
-    
-    checker.visit(tree)
+def _stdout_sink():
+    """Imprime el encabezado con el primer error y luego cada error."""
+    write = text_sink(sys.stdout)
+    started = False
+    def sink(e: SemanticError):
+        nonlocal started
+        if not started:
+            print("\nErrores semánticos encontrados:")
+            started = True
+        write(e)
+    return sink
+
+
+def main(argv):
+    ap = build_arg_parser()
+    args = ap.parse_args(argv[1:])
+    check_tac_flags(ap, args)
+    if args.deep:
+        # Parser, lowering y chequeo en un hilo con stack grande
+        run_deep(compile_file, args)
+    else:
+        compile_file(args)
+
+
+def compile_file(args):
+    parsed = parse_file(args.source, force_ll=args.ll)
+    print(parsed.summary())
+
+    # Árbol de ANTLR -> AST compacto; el árbol y el token stream ya no se usan
+    program = lower_program(parsed.tree)
+    parsed.release()
+
+    sinks = []
+    jsonl = open(args.errors_jsonl, "w", encoding="utf-8") if args.errors_jsonl else None
+    if jsonl is not None:
+        sinks.append(jsonl_sink(jsonl))
+    if args.stream:
+        sinks.append(_stdout_sink())
+    # Con sinks los errores no se acumulan en memoria
+    reporter = ErrorReporter(
+        sink=(lambda e: [f(e) for f in sinks]) if sinks else None,
+        keep=not sinks, dedupe=args.dedupe, max_errors=args.max_errors,
+    )
+    libs = [sym for path in args.lib for sym in library_symbols(path, force_ll=args.ll)]
+    tac_stream = open(args.tac_stream, "w", encoding="utf-8") if args.tac_stream else None
+    if tac_stream is not None:
+        builder = TACBuilder(sink=TextSink(tac_stream))
+    elif args.tac:
+        builder = TACBuilder(ColumnarTACProgram() if args.tac_columns else None)
+    else:
+        builder = None
+    profile = VisitorProfile() if args.profile else None
+    # La emisión de TAC, el perfil y las bibliotecas son secuenciales
+    sequential = [flag for flag, on in (("--tac", args.tac), ("--tac-stream", tac_stream),
+                                        ("--profile", profile), ("--lib", libs)) if on]
+    if args.jobs > 1 and sequential:
+        print(f"Aviso: --jobs {args.jobs} se ignora con {', '.join(sequential)}; "
+              "el chequeo es secuencial.", file=sys.stderr)
+    lib_slots = 0   # slots globales que vienen de --lib
+    try:
+        if args.jobs > 1 and not sequential:
+            # sin esas opciones los cuerpos se reparten entre procesos
+            checker = check_program_parallel(program, reporter, args.jobs)
+        else:
+            checker = TypeChecker(reporter, builder, profile)
+            install(checker, libs)
+            lib_slots = len(checker.scopes.stack[0].slots)
+            checker.visit(program)
+    finally:
+        if jsonl is not None:
+            jsonl.close()
+        if tac_stream is not None:
+            tac_stream.close()
 
-    
     if reporter.has_errors():
-        print("\nErrores semánticos encontrados:")
+        if not args.stream:
+            print("\nErrores semánticos encontrados:")
         for e in reporter:
             print("   ", e)
+        if jsonl is not None:
+            print(f"    ({reporter.count()} errores escritos en {args.errors_jsonl})")
+        if reporter.suppressed:
+            print(f"    ({reporter.suppressed} errores repetidos omitidos)")
+        if reporter.aborted:
+            print(f"    Se alcanzó el límite de {reporter.max_errors} errores; chequeo detenido.")
     else:
         print("\nAnálisis semántico completado sin errores.")
 
-    
     print_symbol_table(checker.scopes)
 
+    if args.emit_interface and not reporter.has_errors():
+        with open(args.source, encoding="utf-8") as f:
+            # solo las declaraciones propias: las de --lib tienen su propio .cpsi
+            write_interface(interface_path(args.source), checker.scopes.stack[0], f.read(),
+                            skip=lib_slots)
+
+    if builder is not None and builder.unsupported and not reporter.has_errors():
+        # Sin TAC para estas construcciones el programa emitido no sirve
+        print("\nTAC no generado: construcciones sin soporte en TAC:")
+        for line, col, what in builder.unsupported:
+            print(f"    [{line}:{col}] {what}")
+        if tac_stream is not None:
+            os.remove(args.tac_stream)
+    elif tac_stream is not None:
+        if reporter.has_errors():
+            print(f"\n(TAC incompleto en {args.tac_stream}: hubo errores)")
+        else:
+            print(f"\n(TAC escrito en {args.tac_stream}; {builder.peak_temps} temporales vivos como máximo)")
+    elif builder is not None and not reporter.has_errors():
+        tac, stats, peak = builder.tac, None, builder.peak_temps
+        if args.opt:
+            tac, stats = optimize(tac, args.opt)
+            # las pasadas acortan o quitan rangos: se reciclan de nuevo
+            peak = rename_temps(tac, builder.tmps.prefix)
+        print("\nCódigo de tres direcciones")
+        print("==========================")
+        print(tac.dump())
+        print(f"\n({peak} temporales vivos como máximo)")
+        if stats is not None:
+            print("(optimización: " + ", ".join(f"{name} {n}" for name, n in stats.items()) + ")")
+        if args.tac_out:
+            write_tac(args.tac_out, tac)
+
+    if profile is not None:
+        print("\nPerfil del chequeo de tipos")
+        print("===========================")
+        print(profile.to_json() if args.profile == "json" else profile.table())
+
 
 if __name__ == "__main__":
     main(sys.argv)
@@ -0,0 +1,43 @@
+"""
+Modo para programas muy anidados.
+
+El parser que genera ANTLR es de descenso recursivo (unos 11 frames de
+Python por nivel de paréntesis) y el lowering y el TypeChecker recorren
+sentencias y bloques anidados recursivamente, así que con unos cientos
+de niveles se alcanza el límite de recursión de Python. Las cadenas de
+operadores (a + b + c ..., - - x) ya se recorren en loops; para el resto,
+run_deep() ejecuta la fase en un hilo con un stack grande y el límite de
+recursión subido: el uso de stack sigue siendo lineal en la profundidad.
+"""
+from __future__ import annotations
+import sys
+import threading
+
+DEFAULT_STACK_MB = 512
+FRAMES_PER_MB = 2000   # frames de Python por MB de stack de C (con margen)
+
+
+def run_deep(fn, *args, stack_mb: int = DEFAULT_STACK_MB, **kwargs):
+    """Llama fn(*args, **kwargs) en un hilo con 'stack_mb' MB de stack y devuelve su resultado."""
+    outcome: dict = {}
+
+    def target():
+        previous = sys.getrecursionlimit()
+        sys.setrecursionlimit(max(previous, stack_mb * FRAMES_PER_MB))
+        try:
+            outcome["value"] = fn(*args, **kwargs)
+        except BaseException as exc:   # se relanza en el hilo que llamó
+            outcome["error"] = exc
+        finally:
+            sys.setrecursionlimit(previous)
+
+    previous_size = threading.stack_size(stack_mb * 1024 * 1024)
+    try:
+        worker = threading.Thread(target=target, name="compiscript-deep")
+        worker.start()
+    finally:
+        threading.stack_size(previous_size)
+    worker.join()
+    if "error" in outcome:
+        raise outcome["error"]
+    return outcome.get("value")
@@ -0,0 +1,332 @@
+"""
+Lowering: árbol de ANTLR (*Context) -> AST compacto (frontend/nodes.py).
+
+Las reglas que solo envuelven a otra (expression, primaryExpr, ExprNoAssign,
+cadenas de precedencia con un solo operando, ...) no generan nodo: se
+devuelve directamente el nodo del hijo.
+"""
+from __future__ import annotations
+from sys import intern
+from program.CompiscriptParser import CompiscriptParser as P
+from program.frontend import nodes as N
+
+
+# Reglas de expresión que con un solo hijo no generan nodo (primaryExpr
+# también con '(' expression ')')
+_PASS_THROUGH = frozenset({
+    P.ExpressionContext, P.ExprNoAssignContext, P.TernaryExprContext,
+    P.LogicalOrExprContext, P.LogicalAndExprContext, P.EqualityExprContext,
+    P.RelationalExprContext, P.AdditiveExprContext, P.MultiplicativeExprContext,
+    P.UnaryExprContext, P.PrimaryExprContext,
+})
+
+
+def _pos(ctx):
+    tok = ctx.start
+    return tok.line, tok.column
+
+
+class Lowering:
+    def __init__(self) -> None:
+        self._stmt = {
+            P.VariableDeclarationContext: self.variable_declaration,
+            P.ConstantDeclarationContext: self.constant_declaration,
+            P.AssignmentContext: self.assignment,
+            P.FunctionDeclarationContext: self.function_declaration,
+            P.ClassDeclarationContext: self.class_declaration,
+            P.ExpressionStatementContext: self.expression_statement,
+            P.PrintStatementContext: self.print_statement,
+            P.BlockContext: self.block,
+            P.IfStatementContext: self.if_statement,
+            P.WhileStatementContext: self.while_statement,
+            P.DoWhileStatementContext: self.do_while_statement,
+            P.ForStatementContext: self.for_statement,
+            P.ForeachStatementContext: self.foreach_statement,
+            P.TryCatchStatementContext: self.try_catch_statement,
+            P.SwitchStatementContext: self.switch_statement,
+            P.BreakStatementContext: self.break_statement,
+            P.ContinueStatementContext: self.continue_statement,
+            P.ReturnStatementContext: self.return_statement,
+        }
+        self._atom = {
+            P.IdentifierExprContext: self.identifier_expr,
+            P.NewExprContext: self.new_expr,
+            P.ThisExprContext: self.this_expr,
+        }
+        self._suffix = {
+            P.CallExprContext: self.call_expr,
+            P.IndexExprContext: self.index_expr,
+            P.PropertyAccessExprContext: self.property_access_expr,
+        }
+        self._expr = {
+            P.AssignExprContext: self.assign_expr,
+            P.PropertyAssignExprContext: self.property_assign_expr,
+            P.TernaryExprContext: self.ternary_expr,
+            P.UnaryExprContext: self.unary_expr,
+            P.LiteralExprContext: self.literal_expr,
+            P.LeftHandSideContext: self.left_hand_side,
+            **{k: self.chain for k in self._CHAINS},
+        }
+
+    # ---------- sentencias ----------
+
+    def program(self, ctx: P.ProgramContext) -> N.Program:
+        return N.Program(self.statements(ctx.statement()), *_pos(ctx))
+
+    def statements(self, stmts) -> tuple:
+        return tuple(self.statement(s) for s in stmts)
+
+    def statement(self, ctx: P.StatementContext) -> N.Node:
+        inner = ctx.getChild(0)
+        return self._stmt[type(inner)](inner)
+
+    def block(self, ctx: P.BlockContext) -> N.Block:
+        return N.Block(self.statements(ctx.statement()), *_pos(ctx))
+
+    def type_ref(self, ctx: P.TypeContext) -> N.TypeRef:
+        dims = (ctx.getChildCount() - 1) // 2
+        return N.TypeRef(intern(ctx.baseType().getText()), dims, *_pos(ctx))
+
+    def _annotation(self, ctx):
+        ann = ctx.typeAnnotation()
+        return self.type_ref(ann.type_()) if ann else None
+
+    def variable_declaration(self, ctx: P.VariableDeclarationContext) -> N.VariableDeclaration:
+        init = ctx.initializer()
+        return N.VariableDeclaration(
+            intern(ctx.Identifier().getText()),
+            self._annotation(ctx),
+            self.expression(init.expression()) if init else None,
+            *_pos(ctx))
+
+    def constant_declaration(self, ctx: P.ConstantDeclarationContext) -> N.ConstantDeclaration:
+        return N.ConstantDeclaration(
+            intern(ctx.Identifier().getText()),
+            self._annotation(ctx),
+            self.expression(ctx.expression()),
+            *_pos(ctx))
+
+    def assignment(self, ctx: P.AssignmentContext) -> N.Assignment:
+        exprs = ctx.expression()
+        name = intern(ctx.Identifier().getText())
+        if len(exprs) == 2:
+            return N.Assignment(self.expression(exprs[0]), name, self.expression(exprs[1]), *_pos(ctx))
+        return N.Assignment(None, name, self.expression(exprs[0]), *_pos(ctx))
+
+    def function_declaration(self, ctx: P.FunctionDeclarationContext) -> N.FunctionDeclaration:
+        params = ()
+        if ctx.parameters():
+            params = tuple(
+                N.Parameter(intern(p.Identifier().getText()),
+                            self.type_ref(p.type_()) if p.type_() else None,
+                            *_pos(p))
+                for p in ctx.parameters().parameter()
+            )
+        return N.FunctionDeclaration(
+            intern(ctx.Identifier().getText()),
+            params,
+            self.type_ref(ctx.type_()) if ctx.type_() else None,
+            self.block(ctx.block()),
+            *_pos(ctx))
+
+    def class_declaration(self, ctx: P.ClassDeclarationContext) -> N.ClassDeclaration:
+        members = []
+        for m in ctx.classMember():
+            inner = m.getChild(0)
+            members.append(self._stmt[type(inner)](inner))
+        base = ctx.Identifier(1)
+        return N.ClassDeclaration(
+            intern(ctx.Identifier(0).getText()),
+            intern(base.getText()) if base else None,
+            tuple(members),
+            *_pos(ctx))
+
+    def expression_statement(self, ctx: P.ExpressionStatementContext) -> N.ExpressionStatement:
+        return N.ExpressionStatement(self.expression(ctx.expression()), *_pos(ctx))
+
+    def print_statement(self, ctx: P.PrintStatementContext) -> N.PrintStatement:
+        return N.PrintStatement(self.expression(ctx.expression()), *_pos(ctx))
+
+    def if_statement(self, ctx: P.IfStatementContext) -> N.IfStatement:
+        orelse = ctx.block(1)
+        return N.IfStatement(
+            self.expression(ctx.expression()),
+            self.block(ctx.block(0)),
+            self.block(orelse) if orelse else None,
+            *_pos(ctx))
+
+    def while_statement(self, ctx: P.WhileStatementContext) -> N.WhileStatement:
+        return N.WhileStatement(self.expression(ctx.expression()), self.block(ctx.block()), *_pos(ctx))
+
+    def do_while_statement(self, ctx: P.DoWhileStatementContext) -> N.DoWhileStatement:
+        return N.DoWhileStatement(self.block(ctx.block()), self.expression(ctx.expression()), *_pos(ctx))
+
+    def for_statement(self, ctx: P.ForStatementContext) -> N.ForStatement:
+        # 'for' '(' (variableDeclaration | assignment | ';') expression? ';' expression? ')' block
+        init = None
+        if ctx.variableDeclaration():
+            init = self.variable_declaration(ctx.variableDeclaration())
+        elif ctx.assignment():
+            init = self.assignment(ctx.assignment())
+        # condición y paso se distinguen por su posición respecto al ';' intermedio
+        cond = step = None
+        seen_sep = False
+        for i in range(3, ctx.getChildCount()):
+            ch = ctx.getChild(i)
+            if isinstance(ch, P.ExpressionContext):
+                if seen_sep:
+                    step = self.expression(ch)
+                else:
+                    cond = self.expression(ch)
+            elif ch.getText() == ";":
+                seen_sep = True
+            elif ch.getText() == ")":
+                break
+        return N.ForStatement(init, cond, step, self.block(ctx.block()), *_pos(ctx))
+
+    def foreach_statement(self, ctx: P.ForeachStatementContext) -> N.ForeachStatement:
+        return N.ForeachStatement(
+            intern(ctx.Identifier().getText()),
+            self.expression(ctx.expression()),
+            self.block(ctx.block()),
+            *_pos(ctx))
+
+    def try_catch_statement(self, ctx: P.TryCatchStatementContext) -> N.TryCatchStatement:
+        return N.TryCatchStatement(
+            self.block(ctx.block(0)),
+            intern(ctx.Identifier().getText()),
+            self.block(ctx.block(1)),
+            *_pos(ctx))
+
+    def switch_statement(self, ctx: P.SwitchStatementContext) -> N.SwitchStatement:
+        cases = tuple(
+            N.SwitchCase(self.expression(c.expression()), self.statements(c.statement()), *_pos(c))
+            for c in ctx.switchCase()
+        )
+        default = ctx.defaultCase()
+        return N.SwitchStatement(
+            self.expression(ctx.expression()),
+            cases,
+            self.statements(default.statement()) if default else None,
+            *_pos(ctx))
+
+    def break_statement(self, ctx) -> N.BreakStatement:
+        return N.BreakStatement(*_pos(ctx))
+
+    def continue_statement(self, ctx) -> N.ContinueStatement:
+        return N.ContinueStatement(*_pos(ctx))
+
+    def return_statement(self, ctx: P.ReturnStatementContext) -> N.ReturnStatement:
+        e = ctx.expression()
+        return N.ReturnStatement(self.expression(e) if e is not None else None, *_pos(ctx))
+
+    # ---------- expresiones ----------
+
+    def expression(self, ctx) -> N.Node:
+        """
+        Cualquier contexto de expresión (expression, assignmentExpr, ...,
+        primaryExpr). Los niveles que solo envuelven a un hijo y los
+        paréntesis se saltan en el while, sin un frame de Python por nivel
+        de precedencia; el primer nivel que aporta algo se despacha por tabla.
+        """
+        t = type(ctx)
+        while t in _PASS_THROUGH:
+            children = ctx.children
+            if len(children) == 1:
+                ctx = children[0]
+            elif t is P.PrimaryExprContext:
+                ctx = children[1]          # '(' expression ')'
+            else:
+                break
+            t = type(ctx)
+        return self._expr[t](ctx)
+
+    def assign_expr(self, ctx: P.AssignExprContext) -> N.AssignExpr:
+        return N.AssignExpr(self.left_hand_side(ctx.lhs), self.expression(ctx.children[2]), *_pos(ctx))
+
+    def property_assign_expr(self, ctx: P.PropertyAssignExprContext) -> N.PropertyAssignExpr:
+        return N.PropertyAssignExpr(
+            self.left_hand_side(ctx.lhs),
+            intern(ctx.Identifier().getText()),
+            self.expression(ctx.children[-1]),
+            *_pos(ctx))
+
+    def ternary_expr(self, ctx: P.TernaryExprContext) -> N.TernaryExpr:
+        # logicalOrExpr '?' expression ':' expression
+        c = ctx.children
+        return N.TernaryExpr(self.expression(c[0]), self.expression(c[2]), self.expression(c[4]), *_pos(ctx))
+
+    _CHAINS = {
+        P.LogicalOrExprContext: N.LogicalOrExpr,
+        P.LogicalAndExprContext: N.LogicalAndExpr,
+        P.EqualityExprContext: N.EqualityExpr,
+        P.RelationalExprContext: N.RelationalExpr,
+        P.AdditiveExprContext: N.AdditiveExpr,
+        P.MultiplicativeExprContext: N.MultiplicativeExpr,
+    }
+
+    def chain(self, ctx) -> N.Node:
+        """Cadena `operand (op operand)*` con al menos un operador."""
+        c = ctx.children
+        operands = tuple(self.expression(c[i]) for i in range(0, len(c), 2))
+        ops = tuple(intern(c[i].getText()) for i in range(1, len(c), 2))
+        return self._CHAINS[type(ctx)](operands, ops, *_pos(ctx))
+
+    def unary_expr(self, ctx: P.UnaryExprContext) -> N.UnaryExpr:
+        # ('-' | '!') unaryExpr; los operadores seguidos (- - x) se juntan en un loop
+        ops = []
+        while type(ctx) is P.UnaryExprContext and len(ctx.children) == 2:
+            ops.append(ctx)
+            ctx = ctx.children[1]
+        node = self.expression(ctx)
+        for u in reversed(ops):
+            node = N.UnaryExpr(intern(u.children[0].getText()), node, *_pos(u))
+        return node
+
+    def literal_expr(self, ctx: P.LiteralExprContext) -> N.Node:
+        if ctx.arrayLiteral():
+            arr = ctx.arrayLiteral()
+            return N.ArrayLiteral(tuple(self.expression(e) for e in arr.expression()), *_pos(arr))
+        txt = ctx.getText()
+        if txt == "null":
+            return N.LiteralExpr(N.LIT_NULL, None, *_pos(ctx))
+        if txt in ("true", "false"):
+            return N.LiteralExpr(N.LIT_BOOLEAN, txt == "true", *_pos(ctx))
+        if txt.isdigit():
+            return N.LiteralExpr(N.LIT_INTEGER, int(txt), *_pos(ctx))
+        return N.LiteralExpr(N.LIT_STRING, txt[1:-1], *_pos(ctx))
+
+    def left_hand_side(self, ctx: P.LeftHandSideContext) -> N.Node:
+        atom_ctx = ctx.primaryAtom()
+        atom = self._atom[type(atom_ctx)](atom_ctx)
+        suffixes = ctx.suffixOp()
+        if not suffixes:
+            return atom
+        return N.LeftHandSide(atom, tuple(self._suffix[type(s)](s) for s in suffixes), *_pos(ctx))
+
+    def identifier_expr(self, ctx: P.IdentifierExprContext) -> N.IdentifierExpr:
+        return N.IdentifierExpr(intern(ctx.Identifier().getText()), *_pos(ctx))
+
+    def new_expr(self, ctx: P.NewExprContext) -> N.NewExpr:
+        return N.NewExpr(intern(ctx.Identifier().getText()), self.arguments(ctx.arguments()),
+                         ctx.getText(), *_pos(ctx))
+
+    def this_expr(self, ctx: P.ThisExprContext) -> N.ThisExpr:
+        return N.ThisExpr(*_pos(ctx))
+
+    def arguments(self, ctx) -> tuple:
+        return tuple(self.expression(e) for e in ctx.expression()) if ctx else ()
+
+    def call_expr(self, ctx: P.CallExprContext) -> N.CallExpr:
+        return N.CallExpr(self.arguments(ctx.arguments()), *_pos(ctx))
+
+    def index_expr(self, ctx: P.IndexExprContext) -> N.IndexExpr:
+        return N.IndexExpr(self.expression(ctx.expression()), *_pos(ctx))
+
+    def property_access_expr(self, ctx: P.PropertyAccessExprContext) -> N.PropertyAccessExpr:
+        return N.PropertyAccessExpr(intern(ctx.Identifier().getText()), *_pos(ctx))
+
+
+def lower_program(tree: P.ProgramContext) -> N.Program:
+    """Convierte el árbol de ANTLR de un programa completo en el AST compacto."""
+    return Lowering().program(tree)
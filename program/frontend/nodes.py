@@ -0,0 +1,326 @@
+"""
+AST compacto de Compiscript.
+
+Cada nodo usa __slots__ (sin __dict__), guarda solo sus hijos y la posición
+de inicio en el fuente (line, col), y los identificadores van internados
+(sys.intern) para que comparar/hashear nombres sea barato.  Las cadenas de
+operadores con la misma precedencia (a + b - c ...) se guardan como un solo
+nodo n-ario con sus operandos y operadores, igual que en la gramática.
+
+El AST se construye desde el árbol de ANTLR en frontend/lowering.py.
+"""
+from __future__ import annotations
+from typing import Optional, Tuple
+
+
+class Node:
+    __slots__ = ("line", "col")
+    _visit = "visitNode"
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._visit = "visit" + cls.__name__
+
+    def accept(self, visitor):
+        return getattr(visitor, self._visit)(self)
+
+    def fields(self):
+        """(nombre, valor) de los slots propios del nodo (sin la posición)."""
+        for klass in reversed(type(self).__mro__):
+            for name in getattr(klass, "__slots__", ()):
+                if name not in ("line", "col"):
+                    yield name, getattr(self, name)
+
+    def __repr__(self) -> str:
+        args = ", ".join(f"{k}={v!r}" for k, v in self.fields())
+        return f"{type(self).__name__}({args})"
+
+
+class _DispatchTable(dict):
+    """type(node) -> método visit<Clase> ya ligado; se llena al primer uso de cada clase."""
+    __slots__ = ("visitor",)
+
+    def __init__(self, visitor):
+        super().__init__()
+        self.visitor = visitor
+
+    def __missing__(self, cls):
+        if issubclass(cls, Node):
+            fn = getattr(self.visitor, cls._visit)
+        else:
+            fn = lambda tree: tree.accept(self.visitor)   # p. ej. el árbol de ANTLR
+        self[cls] = fn
+        return fn
+
+
+class NodeVisitor:
+    """
+    Visitor base del AST: despacha a visit<Clase>(node) con una tabla
+    type(node) -> método ligado, sin pasar por node.accept(). Si se
+    reemplaza un visit* en la instancia después del primer visit(),
+    hay que vaciar self._dispatch.
+    """
+    def __init__(self):
+        self._dispatch = _DispatchTable(self)
+
+    def visit(self, node):
+        return self._dispatch[type(node)](node)
+
+
+# ------------------
+# Tipos
+# ------------------
+
+class TypeRef(Node):
+    __slots__ = ("name", "dims")
+    def __init__(self, name: str, dims: int, line: int = 0, col: int = 0):
+        self.name = name; self.dims = dims
+        self.line = line; self.col = col
+
+
+# ------------------
+# Sentencias
+# ------------------
+
+class Program(Node):
+    __slots__ = ("body",)
+    def __init__(self, body: Tuple[Node, ...], line: int = 0, col: int = 0):
+        self.body = body
+        self.line = line; self.col = col
+
+class Block(Node):
+    __slots__ = ("body",)
+    def __init__(self, body: Tuple[Node, ...], line: int = 0, col: int = 0):
+        self.body = body
+        self.line = line; self.col = col
+
+class VariableDeclaration(Node):
+    __slots__ = ("name", "type", "init")
+    def __init__(self, name: str, type: Optional[TypeRef], init: Optional[Node], line: int = 0, col: int = 0):
+        self.name = name; self.type = type; self.init = init
+        self.line = line; self.col = col
+
+class ConstantDeclaration(Node):
+    __slots__ = ("name", "type", "value")
+    def __init__(self, name: str, type: Optional[TypeRef], value: Node, line: int = 0, col: int = 0):
+        self.name = name; self.type = type; self.value = value
+        self.line = line; self.col = col
+
+class Assignment(Node):
+    """
+    `name = value;` o, si obj no es None, `obj.name = value;`.
+    addr: (profundidad, slot) del destino, lo completa el TypeChecker.
+    """
+    __slots__ = ("obj", "name", "value", "addr")
+    def __init__(self, obj: Optional[Node], name: str, value: Node, line: int = 0, col: int = 0):
+        self.obj = obj; self.name = name; self.value = value
+        self.addr = None
+        self.line = line; self.col = col
+
+class Parameter(Node):
+    __slots__ = ("name", "type")
+    def __init__(self, name: str, type: Optional[TypeRef], line: int = 0, col: int = 0):
+        self.name = name; self.type = type
+        self.line = line; self.col = col
+
+class FunctionDeclaration(Node):
+    __slots__ = ("name", "params", "ret", "body")
+    def __init__(self, name: str, params: Tuple[Parameter, ...], ret: Optional[TypeRef], body: Block,
+                 line: int = 0, col: int = 0):
+        self.name = name; self.params = params; self.ret = ret; self.body = body
+        self.line = line; self.col = col
+
+class ClassDeclaration(Node):
+    """members: FunctionDeclaration | VariableDeclaration | ConstantDeclaration."""
+    __slots__ = ("name", "base", "members")
+    def __init__(self, name: str, base: Optional[str], members: Tuple[Node, ...], line: int = 0, col: int = 0):
+        self.name = name; self.base = base; self.members = members
+        self.line = line; self.col = col
+
+class ExpressionStatement(Node):
+    __slots__ = ("expr",)
+    def __init__(self, expr: Node, line: int = 0, col: int = 0):
+        self.expr = expr
+        self.line = line; self.col = col
+
+class PrintStatement(Node):
+    __slots__ = ("expr",)
+    def __init__(self, expr: Node, line: int = 0, col: int = 0):
+        self.expr = expr
+        self.line = line; self.col = col
+
+class IfStatement(Node):
+    __slots__ = ("cond", "then", "orelse")
+    def __init__(self, cond: Node, then: Block, orelse: Optional[Block], line: int = 0, col: int = 0):
+        self.cond = cond; self.then = then; self.orelse = orelse
+        self.line = line; self.col = col
+
+class WhileStatement(Node):
+    __slots__ = ("cond", "body")
+    def __init__(self, cond: Node, body: Block, line: int = 0, col: int = 0):
+        self.cond = cond; self.body = body
+        self.line = line; self.col = col
+
+class DoWhileStatement(Node):
+    __slots__ = ("body", "cond")
+    def __init__(self, body: Block, cond: Node, line: int = 0, col: int = 0):
+        self.body = body; self.cond = cond
+        self.line = line; self.col = col
+
+class ForStatement(Node):
+    """init: VariableDeclaration | Assignment | None."""
+    __slots__ = ("init", "cond", "step", "body")
+    def __init__(self, init: Optional[Node], cond: Optional[Node], step: Optional[Node], body: Block,
+                 line: int = 0, col: int = 0):
+        self.init = init; self.cond = cond; self.step = step; self.body = body
+        self.line = line; self.col = col
+
+class ForeachStatement(Node):
+    __slots__ = ("name", "iterable", "body")
+    def __init__(self, name: str, iterable: Node, body: Block, line: int = 0, col: int = 0):
+        self.name = name; self.iterable = iterable; self.body = body
+        self.line = line; self.col = col
+
+class TryCatchStatement(Node):
+    __slots__ = ("body", "name", "handler")
+    def __init__(self, body: Block, name: str, handler: Block, line: int = 0, col: int = 0):
+        self.body = body; self.name = name; self.handler = handler
+        self.line = line; self.col = col
+
+class SwitchCase(Node):
+    __slots__ = ("value", "body")
+    def __init__(self, value: Node, body: Tuple[Node, ...], line: int = 0, col: int = 0):
+        self.value = value; self.body = body
+        self.line = line; self.col = col
+
+class SwitchStatement(Node):
+    """default: sentencias del `default:` o None si no hay."""
+    __slots__ = ("subject", "cases", "default")
+    def __init__(self, subject: Node, cases: Tuple[SwitchCase, ...], default: Optional[Tuple[Node, ...]],
+                 line: int = 0, col: int = 0):
+        self.subject = subject; self.cases = cases; self.default = default
+        self.line = line; self.col = col
+
+class BreakStatement(Node):
+    __slots__ = ()
+    def __init__(self, line: int = 0, col: int = 0):
+        self.line = line; self.col = col
+
+class ContinueStatement(Node):
+    __slots__ = ()
+    def __init__(self, line: int = 0, col: int = 0):
+        self.line = line; self.col = col
+
+class ReturnStatement(Node):
+    __slots__ = ("value",)
+    def __init__(self, value: Optional[Node], line: int = 0, col: int = 0):
+        self.value = value
+        self.line = line; self.col = col
+
+
+# ------------------
+# Expresiones
+# ------------------
+
+class AssignExpr(Node):
+    """`target = value` como expresión (target es un LeftHandSide)."""
+    __slots__ = ("target", "value")
+    def __init__(self, target: Node, value: Node, line: int = 0, col: int = 0):
+        self.target = target; self.value = value
+        self.line = line; self.col = col
+
+class PropertyAssignExpr(Node):
+    __slots__ = ("target", "name", "value")
+    def __init__(self, target: Node, name: str, value: Node, line: int = 0, col: int = 0):
+        self.target = target; self.name = name; self.value = value
+        self.line = line; self.col = col
+
+class TernaryExpr(Node):
+    __slots__ = ("cond", "then", "orelse")
+    def __init__(self, cond: Node, then: Node, orelse: Node, line: int = 0, col: int = 0):
+        self.cond = cond; self.then = then; self.orelse = orelse
+        self.line = line; self.col = col
+
+class OpChain(Node):
+    """operands[0] ops[0] operands[1] ops[1] ... (asociatividad izquierda)."""
+    __slots__ = ("operands", "ops")
+    def __init__(self, operands: Tuple[Node, ...], ops: Tuple[str, ...], line: int = 0, col: int = 0):
+        self.operands = operands; self.ops = ops
+        self.line = line; self.col = col
+
+class LogicalOrExpr(OpChain): __slots__ = ()
+class LogicalAndExpr(OpChain): __slots__ = ()
+class EqualityExpr(OpChain): __slots__ = ()
+class RelationalExpr(OpChain): __slots__ = ()
+class AdditiveExpr(OpChain): __slots__ = ()
+class MultiplicativeExpr(OpChain): __slots__ = ()
+
+class UnaryExpr(Node):
+    __slots__ = ("op", "operand")
+    def __init__(self, op: str, operand: Node, line: int = 0, col: int = 0):
+        self.op = op; self.operand = operand
+        self.line = line; self.col = col
+
+# Clases de literal
+LIT_INTEGER = "integer"
+LIT_STRING = "string"
+LIT_BOOLEAN = "boolean"
+LIT_NULL = "null"
+
+class LiteralExpr(Node):
+    """kind: LIT_*; value: int | str (sin comillas) | bool | None."""
+    __slots__ = ("kind", "value")
+    def __init__(self, kind: str, value, line: int = 0, col: int = 0):
+        self.kind = kind; self.value = value
+        self.line = line; self.col = col
+
+class ArrayLiteral(Node):
+    __slots__ = ("elements",)
+    def __init__(self, elements: Tuple[Node, ...], line: int = 0, col: int = 0):
+        self.elements = elements
+        self.line = line; self.col = col
+
+class IdentifierExpr(Node):
+    """addr: (profundidad, slot) del símbolo resuelto, lo completa el TypeChecker."""
+    __slots__ = ("name", "addr")
+    def __init__(self, name: str, line: int = 0, col: int = 0):
+        self.name = name
+        self.addr = None
+        self.line = line; self.col = col
+
+class NewExpr(Node):
+    """text: texto original (getText) de la expresión `new`, usado en mensajes."""
+    __slots__ = ("class_name", "args", "text")
+    def __init__(self, class_name: str, args: Tuple[Node, ...], text: str, line: int = 0, col: int = 0):
+        self.class_name = class_name; self.args = args; self.text = text
+        self.line = line; self.col = col
+
+class ThisExpr(Node):
+    __slots__ = ()
+    def __init__(self, line: int = 0, col: int = 0):
+        self.line = line; self.col = col
+
+class LeftHandSide(Node):
+    """atom (IdentifierExpr | NewExpr | ThisExpr) seguido de sufijos Call/Index/PropertyAccess."""
+    __slots__ = ("atom", "suffixes")
+    def __init__(self, atom: Node, suffixes: Tuple[Node, ...], line: int = 0, col: int = 0):
+        self.atom = atom; self.suffixes = suffixes
+        self.line = line; self.col = col
+
+class CallExpr(Node):
+    __slots__ = ("args",)
+    def __init__(self, args: Tuple[Node, ...], line: int = 0, col: int = 0):
+        self.args = args
+        self.line = line; self.col = col
+
+class IndexExpr(Node):
+    __slots__ = ("index",)
+    def __init__(self, index: Node, line: int = 0, col: int = 0):
+        self.index = index
+        self.line = line; self.col = col
+
+class PropertyAccessExpr(Node):
+    __slots__ = ("name",)
+    def __init__(self, name: str, line: int = 0, col: int = 0):
+        self.name = name
+        self.line = line; self.col = col
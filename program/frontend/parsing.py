@@ -0,0 +1,84 @@
+from __future__ import annotations
+import time
+from dataclasses import dataclass
+from antlr4 import CommonTokenStream, FileStream, InputStream
+from antlr4.atn.PredictionMode import PredictionMode
+from antlr4.error.ErrorStrategy import BailErrorStrategy, DefaultErrorStrategy
+from antlr4.error.Errors import ParseCancellationException
+from program.CompiscriptLexer import CompiscriptLexer
+from program.CompiscriptParser import CompiscriptParser
+
+# Rutas posibles del parseo
+PARSE_SLL = "SLL"          # SLL resolvió todo el programa
+PARSE_SLL_LL = "SLL->LL"   # SLL falló y se re-parseó con LL completo
+PARSE_LL = "LL"            # LL forzado desde el inicio
+
+
+@dataclass
+class ParseResult:
+    parser: CompiscriptParser
+    tokens: CommonTokenStream
+    tree: CompiscriptParser.ProgramContext
+    mode: str          # PARSE_SLL | PARSE_SLL_LL | PARSE_LL
+    elapsed: float     # segundos
+
+    def summary(self) -> str:
+        return f"Parseo: {self.mode} ({self.elapsed * 1000:.2f} ms)"
+
+    def release(self) -> None:
+        """Suelta parser, token stream y árbol (p. ej. después del lowering al AST)."""
+        self.parser = None
+        self.tokens = None
+        self.tree = None
+
+
+def parse_stream(input_stream: InputStream, force_ll: bool = False) -> ParseResult:
+    """
+    Parseo en dos etapas:
+      1. PredictionMode.SLL + BailErrorStrategy, sin listeners de error
+         (si SLL no puede decidir o hay error de sintaxis se aborta rápido).
+      2. Solo si (1) falla: rebobina el token stream y re-parsea con LL completo
+         y la estrategia por defecto, de modo que los errores se reportan
+         exactamente igual que con un parseo LL directo.
+    Con force_ll=True se salta la etapa SLL.
+    """
+    lexer = CompiscriptLexer(input_stream)
+    tokens = CommonTokenStream(lexer)
+    parser = CompiscriptParser(tokens)
+
+    start = time.perf_counter()
+    if force_ll:
+        tree = parser.program()
+        return ParseResult(parser, tokens, tree, PARSE_LL, time.perf_counter() - start)
+
+    listeners = list(parser._listeners)
+    parser.removeErrorListeners()
+    parser._errHandler = BailErrorStrategy()
+    parser._interp.predictionMode = PredictionMode.SLL
+    try:
+        tree = parser.program()
+    except ParseCancellationException:
+        tree = None
+
+    # Restaurar la configuración por defecto (LL + reporte normal de errores)
+    for listener in listeners:
+        parser.addErrorListener(listener)
+    parser._errHandler = DefaultErrorStrategy()
+    parser._interp.predictionMode = PredictionMode.LL
+
+    if tree is not None:
+        mode = PARSE_SLL
+    else:
+        parser.reset()   # rebobina también el token stream (seek(0))
+        tree = parser.program()
+        mode = PARSE_SLL_LL
+
+    return ParseResult(parser, tokens, tree, mode, time.perf_counter() - start)
+
+
+def parse_source(source: str, force_ll: bool = False) -> ParseResult:
+    return parse_stream(InputStream(source), force_ll=force_ll)
+
+
+def parse_file(path: str, force_ll: bool = False, encoding: str = "utf-8") -> ParseResult:
+    return parse_stream(FileStream(path, encoding=encoding), force_ll=force_ll)
@@ -1,14 +1,16 @@
 import sys, os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 import streamlit as st
-from antlr4 import InputStream, CommonTokenStream
 from antlr4.tree.Trees import Trees
-from CompiscriptLexer import CompiscriptLexer
-from CompiscriptParser import CompiscriptParser
+from frontend.parsing import parse_source
+from frontend.lowering import lower_program
 from semantic.type_checker import TypeChecker
 from semantic.error_reporter import ErrorReporter
 from semantic.scopes import GlobalScope
 from semantic.symbols import FuncSymbol, ClassSymbol, VarSymbol
+from program.ir.tac_builder import TACBuilder
+from program.semantic.incremental import IncrementalChecker
+from program.frontend.deep import run_deep
 
 
 # --- Graphviz helpers ---
@@ -25,22 +27,21 @@ def build_parse_tree_dot(parser, tree, max_nodes: int = 2000) -> str:
     counter = 0
     overflow = False
 
-    def add_node(n):
-        nonlocal counter, overflow
+    # Preorden con pila explícita (sin recursión: el árbol puede ser muy profundo)
+    stack = [(tree, None)]   # (nodo, id del padre)
+    while stack:
+        n, parent_id = stack.pop()
         if counter >= max_nodes:
             overflow = True
-            return None
+            break
         my_id = f"n{counter}"
         counter += 1
         lines.append(f'{my_id} [label="{_node_label(parser, n)}"];')
-        for i in range(n.getChildCount()):
-            ch = n.getChild(i)
-            cid = add_node(ch)
-            if cid is not None:
-                lines.append(f"{my_id} -> {cid};")
-        return my_id
-
-    add_node(tree)
+        if parent_id is not None:
+            lines.append(f"{parent_id} -> {my_id};")
+        for i in range(n.getChildCount() - 1, -1, -1):
+            stack.append((n.getChild(i), my_id))
+
     if overflow:
         warn_id = f"n{counter}"
         lines.append(f'{warn_id} [label="... (árbol truncado en {max_nodes} nodos)"];')
@@ -48,19 +49,26 @@ def build_parse_tree_dot(parser, tree, max_nodes: int = 2000) -> str:
     return "\n".join(lines)
 
 
-def compile_code(source: str):
-    input_stream = InputStream(source)
-    lexer = CompiscriptLexer(input_stream)
-    stream = CommonTokenStream(lexer)
-    parser = CompiscriptParser(stream)
-
-    tree = parser.program()
+def compile_code(source: str, force_ll: bool = False, gen_tac: bool = False,
+                 incremental: IncrementalChecker | None = None):
+    parsed = parse_source(source, force_ll=force_ll)
+    parser, tree = parsed.parser, parsed.tree   # se conservan para dibujar el árbol
 
     reporter = ErrorReporter()
-    checker = TypeChecker(reporter)
-    checker.visit(tree)
+    if incremental is not None and not gen_tac:
+        # solo se recorren los cuerpos que cambiaron desde la compilación anterior
+        checker = incremental.check(lower_program(tree), source, reporter)
+    else:
+        builder = TACBuilder() if gen_tac else None
+        checker = TypeChecker(reporter, builder)   # con builder, el TAC sale en el mismo recorrido
+        checker.visit(lower_program(tree))
 
-    return reporter, checker.scopes, parser, tree
+    builder = checker.builder
+    ok = builder is not None and not reporter.has_errors()
+    # con construcciones sin soporte el TAC está incompleto: no se muestra
+    tac = builder.tac if ok and builder.complete else None
+    unsupported = builder.unsupported if ok else []
+    return reporter, checker.scopes, parser, tree, parsed, tac, unsupported
 
 def render_scope(scope, container, indent=0):
     pad = " " * (indent * 2)
@@ -189,16 +197,26 @@ code = st.text_area("Editor", default_code, height=400)
 
 
 # Controles
-col_a, col_b, col_c = st.columns([1,1,2])
+col_a, col_b, col_d, col_e, col_c = st.columns([1,1,1,1,2])
 with col_a:
     do_compile = st.button("Compile 🚀", key="compile_main")
 with col_b:
     show_tree = st.checkbox("Árbol sintáctico", value=True)
+with col_d:
+    force_ll = st.checkbox("Forzar LL", value=False)
+with col_e:
+    gen_tac = st.checkbox("Generar TAC", value=False)
+    deep = st.checkbox("Anidamiento profundo", value=False)
 with col_c:
     max_nodes = st.slider("Límite de nodos del árbol", min_value=200, max_value=5000, value=2000, step=100)
 
 if do_compile:
-    reporter, scopes, parser, tree = compile_code(code)
+    incremental = st.session_state.setdefault("incremental", IncrementalChecker())
+    # con anidamiento profundo el parser y el chequeo corren en un hilo con stack grande
+    compile_fn = (lambda *a, **kw: run_deep(compile_code, *a, **kw)) if deep else compile_code
+    reporter, scopes, parser, tree, parsed, tac, unsupported = compile_fn(code, force_ll=force_ll, gen_tac=gen_tac,
+                                                             incremental=incremental)
+    st.caption(parsed.summary())
 
     if reporter.has_errors():
         st.error(" Errores semánticos encontrados:")
@@ -207,6 +225,14 @@ if do_compile:
     else:
         st.success(" Compilación completada sin errores")
 
+    if tac is not None:
+        st.subheader("Código de tres direcciones")
+        st.code(tac.dump(), language="text")
+    elif unsupported:
+        st.warning("TAC no generado: construcciones sin soporte en TAC")
+        for line, col, what in unsupported:
+            st.write(f"- [{line}:{col}] {what}")
+
     if show_tree:
         st.subheader("Árbol sintáctico")
         dot = build_parse_tree_dot(parser, tree, max_nodes=max_nodes)
@@ -0,0 +1,288 @@
+"""
+Grafo de flujo de control (CFG) por bloques básicos sobre un TACProgram.
+
+Un bloque empieza en una o más 'label' seguidas (o después de un
+terminador) y termina en goto/ifgoto/ret o antes de la siguiente label.
+build_cfg arma todo en una pasada por las instrucciones más una por los
+bloques:
+
+- cfg.blocks: bloques en el orden del programa (id = índice);
+- cfg.by_label: Label -> id del bloque que la define (una label definida
+  dos veces es un error: ValueError);
+- cfg.succ / cfg.pred: listas de ids por bloque;
+- cfg.entries: el bloque 0 y la entrada de cada función llamada (las
+  llamadas no son aristas: el cuerpo se salta con goto y se entra por call);
+- cfg.rpo / cfg.rpo_number: orden postorden inverso desde las entradas
+  (rpo_number = -1 para los bloques inalcanzables);
+- cfg.idom: dominador inmediato de cada bloque (-1 en las entradas).
+  entries, rpo e idom se recalculan solo cuando se piden y el grafo cambió.
+
+Para editar un bloque se cambia block.code y se llama cfg.update(id): se
+recalculan sus labels, sus aristas y las de los bloques que saltaban a
+labels que aparecieron o desaparecieron. cfg.to_program() vuelve a
+aplanar los bloques en orden.
+"""
+from __future__ import annotations
+from dataclasses import dataclass, field
+from typing import Iterator, List, Optional
+from .tac_ir import Op, Label, Quadruple, TACProgram, ColumnarTACProgram, OperandPool
+
+
+@dataclass
+class BasicBlock:
+    id: int
+    code: List[Quadruple] = field(default_factory=list)
+    labels: List[Label] = field(default_factory=list)   # las 'label' con que empieza
+
+    @property
+    def terminator(self) -> Optional[Quadruple]:
+        """Última instrucción si es goto/ifgoto/ret."""
+        if self.code and self.code[-1].op.terminator:
+            return self.code[-1]
+        return None
+
+    def __iter__(self) -> Iterator[Quadruple]:
+        return iter(self.code)
+
+    def __len__(self) -> int:
+        return len(self.code)
+
+
+class CFG:
+    def __init__(self, pool: OperandPool | None = None) -> None:
+        self.blocks: List[BasicBlock] = []
+        self.by_label: dict[Label, int] = {}
+        self.succ: List[List[int]] = []
+        self.pred: List[List[int]] = []
+        self._entries: Optional[List[int]] = None
+        self.pool = pool if pool is not None else OperandPool()
+        self._jumps_to: dict[Label, set[int]] = {}   # label -> bloques que saltan a ella
+        self._jump_label: List[Optional[Label]] = []  # label a la que salta cada bloque
+        self._calls: List[List[Label]] = []           # funciones llamadas desde cada bloque
+        self._rpo: Optional[List[int]] = None
+        self._rpo_number: Optional[List[int]] = None
+        self._idom: Optional[List[int]] = None
+
+    # ---------- construcción ----------
+
+    def _new_block(self) -> BasicBlock:
+        b = BasicBlock(len(self.blocks))
+        self.blocks.append(b)
+        self.succ.append([])
+        self.pred.append([])
+        self._jump_label.append(None)
+        self._calls.append([])
+        return b
+
+    def _targets(self, b: int) -> List[int]:
+        last = self.blocks[b].code[-1] if self.blocks[b].code else None
+        out: List[int] = []
+        if last is not None and (last.op is Op.GOTO or last.op is Op.IFGOTO):
+            self._jump_label[b] = last.dst
+            self._jumps_to.setdefault(last.dst, set()).add(b)
+            t = self.by_label.get(last.dst)
+            if t is not None:
+                out.append(t)
+        falls = last is None or not (last.op is Op.GOTO or last.op is Op.RET)
+        if falls and b + 1 < len(self.blocks) and b + 1 not in out:
+            out.append(b + 1)
+        return out
+
+    def _link(self, b: int) -> None:
+        """Recalcula las aristas que salen de b (y los pred de sus destinos)."""
+        for s in self.succ[b]:
+            self.pred[s].remove(b)
+        old = self._jump_label[b]
+        if old is not None:
+            self._jumps_to[old].discard(b)
+            self._jump_label[b] = None
+        self.succ[b] = self._targets(b)
+        for s in self.succ[b]:
+            self.pred[s].append(b)
+        self._rpo = self._rpo_number = self._idom = None
+
+    def _find_entries(self) -> List[int]:
+        entries = [0] if self.blocks else []
+        for calls in self._calls:
+            for lbl in calls:
+                b = self.by_label.get(lbl)
+                if b is not None and b not in entries:
+                    entries.append(b)
+        return entries
+
+    @property
+    def entries(self) -> List[int]:
+        if self._entries is None:
+            self._entries = self._find_entries()
+        return self._entries
+
+    # ---------- edición ----------
+
+    def update(self, b: int) -> None:
+        """
+        Sincroniza el grafo después de cambiar blocks[b].code (las label
+        tienen que seguir al principio del bloque y el terminador al final).
+        """
+        block = self.blocks[b]
+        old = set(block.labels)
+        calls = [q.a for q in block.code if q.op is Op.CALL]
+        block.labels = []
+        for q in block.code:
+            if q.op is not Op.LABEL:
+                break
+            block.labels.append(q.dst)
+        new = set(block.labels)
+        if len(new) != len(block.labels):
+            raise ValueError(f"label repetida en el bloque B{b}")
+        for lbl in new - old:
+            other = self.by_label.get(lbl)
+            if other is not None and other != b:
+                raise ValueError(f"label {lbl} definida en B{other} y en B{b}")
+        for lbl in old - new:
+            if self.by_label.get(lbl) == b:
+                del self.by_label[lbl]
+        for lbl in new - old:
+            self.by_label[lbl] = b
+        relink = {b}
+        for lbl in old ^ new:
+            relink |= self._jumps_to.get(lbl, set())
+        for r in sorted(relink):
+            self._link(r)
+        if old != new or calls != self._calls[b]:
+            self._calls[b] = calls
+            self._entries = self._rpo = self._rpo_number = self._idom = None
+
+    def clear_block(self, b: int) -> None:
+        """Vacía el bloque b (queda como bloque vacío que cae al siguiente)."""
+        self.blocks[b].code = []
+        self.update(b)
+
+    # ---------- orden ----------
+
+    def _compute_rpo(self) -> None:
+        seen = [False] * len(self.blocks)
+        post: List[int] = []
+        for root in reversed(self.entries):   # al invertir, la entrada 0 queda primera
+            if seen[root]:
+                continue
+            seen[root] = True
+            stack = [(root, iter(self.succ[root]))]
+            while stack:
+                b, it = stack[-1]
+                for s in it:
+                    if not seen[s]:
+                        seen[s] = True
+                        stack.append((s, iter(self.succ[s])))
+                        break
+                else:
+                    stack.pop()
+                    post.append(b)
+        post.reverse()
+        self._rpo = post
+        number = [-1] * len(self.blocks)
+        for i, b in enumerate(post):
+            number[b] = i
+        self._rpo_number = number
+
+    @property
+    def rpo(self) -> List[int]:
+        if self._rpo is None:
+            self._compute_rpo()
+        return self._rpo
+
+    @property
+    def rpo_number(self) -> List[int]:
+        if self._rpo_number is None:
+            self._compute_rpo()
+        return self._rpo_number
+
+    def reachable(self, b: int) -> bool:
+        return self.rpo_number[b] >= 0
+
+    def _compute_idom(self) -> List[int]:
+        # Cooper, Harvey y Kennedy sobre el RPO; las entradas cuelgan de una
+        # raíz virtual (índice n) para que las intersecciones terminen
+        n = len(self.blocks)
+        num = self.rpo_number + [-1]
+        idom: List[Optional[int]] = [None] * n + [n]
+        for e in self.entries:
+            idom[e] = n
+        roots = set(self.entries)
+        changed = True
+        while changed:
+            changed = False
+            for b in self.rpo:
+                if b in roots:
+                    continue
+                new: Optional[int] = None
+                for p in self.pred[b]:
+                    if idom[p] is None:
+                        continue
+                    if new is None:
+                        new = p
+                        continue
+                    x, y = p, new
+                    while x != y:
+                        while num[x] > num[y]:
+                            x = idom[x]
+                        while num[y] > num[x]:
+                            y = idom[y]
+                    new = x
+                if idom[b] != new:
+                    idom[b] = new
+                    changed = True
+        return [-1 if d is None or d == n else d for d in idom[:n]]
+
+    @property
+    def idom(self) -> List[int]:
+        """Dominador inmediato de cada bloque (-1 en las entradas y los inalcanzables)."""
+        if self._idom is None:
+            self._idom = self._compute_idom()
+        return self._idom
+
+    # ---------- salida ----------
+
+    def __iter__(self) -> Iterator[BasicBlock]:
+        return iter(self.blocks)
+
+    def __len__(self) -> int:
+        return len(self.blocks)
+
+    def to_program(self) -> TACProgram:
+        return TACProgram([q for block in self.blocks for q in block.code], self.pool)
+
+    def dump(self) -> str:
+        lines = []
+        for block in self.blocks:
+            succ = ", ".join(f"B{s}" for s in self.succ[block.id]) or "-"
+            lines.append(f"B{block.id} -> {succ}")
+            lines.extend(f"    {q!r}" for q in block.code)
+        return "\n".join(lines)
+
+
+def build_cfg(program: TACProgram | ColumnarTACProgram) -> CFG:
+    cfg = CFG(program.pool)
+    block: Optional[BasicBlock] = None
+    for q in program:
+        op = q.op
+        if op is Op.LABEL:
+            # varias labels seguidas abren un solo bloque
+            if block is None or len(block.labels) != len(block.code):
+                block = cfg._new_block()
+            block.labels.append(q.dst)
+            if q.dst in cfg.by_label:
+                raise ValueError(f"label {q.dst} definida dos veces")
+            cfg.by_label[q.dst] = block.id
+        elif block is None:
+            block = cfg._new_block()
+        if op is Op.CALL:
+            cfg._calls[block.id].append(q.a)
+        block.code.append(q)
+        if op.terminator:
+            block = None
+
+    for b in range(len(cfg.blocks)):
+        cfg.succ[b] = cfg._targets(b)
+        for s in cfg.succ[b]:
+            cfg.pred[s].append(b)
+    return cfg
@@ -0,0 +1,205 @@
+"""
+Plegado y propagación de constantes sobre el CFG del TAC.
+
+Análisis hacia adelante por bloques (en RPO, hasta el punto fijo): el
+estado de un punto es {Temp|Var: valor} con las variables cuyo valor es
+la misma constante por todos los caminos; la que no está es desconocida.
+En las entradas (programa y funciones) no se sabe nada. Una 'call' borra
+todas las Var (la función puede cambiar globales); los temporales son del
+frame y se conservan.
+
+Luego, en los bloques alcanzables:
+- los usos de variables con valor conocido se reemplazan por la Const;
+- las operaciones con operandos constantes se pliegan a 'dst := k';
+- 'if k goto L' se vuelve 'goto L' (k verdadero) o desaparece.
+
+Semántica de integer (typesys): enteros de 32 bits (WORD_SIZE); '/'
+trunca hacia cero y '%' lleva el signo del dividendo. No se pliega una
+división por cero ni un resultado fuera de rango: queda para ejecución.
+Las relacionales y ==/!= dan 0/1. 'concat' se pliega con strings y
+enteros (el entero en decimal).
+
+Las asignaciones que quedan sin uso (p. ej. 't0 := 2' ya propagado) las
+quita la eliminación de código muerto.
+"""
+from __future__ import annotations
+from typing import Callable, Optional
+from .cfg import CFG
+from .tac_ir import Op, Operand, OperandPool, Const, Var, Temp, Quadruple
+
+_INT_MIN, _INT_MAX = -2**31, 2**31 - 1
+_NO = object()   # la operación no se puede plegar
+
+
+def _int(v) -> bool:
+    return type(v) is int
+
+
+def _checked(r: int):
+    return r if _INT_MIN <= r <= _INT_MAX else _NO
+
+
+def _div(a: int, b: int):
+    if b == 0:
+        return _NO
+    q = abs(a) // abs(b)
+    return _checked(q if (a < 0) == (b < 0) else -q)
+
+
+def _mod(a: int, b: int):
+    if b == 0:
+        return _NO
+    r = abs(a) % abs(b)
+    return r if a >= 0 else -r
+
+
+def _arith(fn: Callable[[int, int], int]):
+    return lambda a, b: _checked(fn(a, b)) if _int(a) and _int(b) else _NO
+
+
+def _relational(fn: Callable[[int, int], bool]):
+    return lambda a, b: int(fn(a, b)) if _int(a) and _int(b) else _NO
+
+
+def _scalar(v) -> bool:
+    return v is None or type(v) in (int, bool)
+
+
+def _equality(negate: bool):
+    def fold(a, b):
+        if not (_scalar(a) and _scalar(b)):
+            return _NO   # strings: la igualdad en ejecución puede no ser por valor
+        if (a is None) != (b is None):
+            return int(negate)
+        return int((a is None or int(a) == int(b)) != negate)
+    return fold
+
+
+def _concat(a, b):
+    if type(a) in (str, int) and type(b) in (str, int):
+        return str(a) + str(b)
+    return _NO
+
+
+# Op -> función de plegado (a, b) -> valor | _NO; None = no se pliega
+_FOLD: list[Optional[Callable]] = [None] * len(Op)
+_FOLD[Op.ADD] = _arith(lambda a, b: a + b)
+_FOLD[Op.SUB] = _arith(lambda a, b: a - b)
+_FOLD[Op.MUL] = _arith(lambda a, b: a * b)
+_FOLD[Op.DIV] = lambda a, b: _div(a, b) if _int(a) and _int(b) else _NO
+_FOLD[Op.MOD] = lambda a, b: _mod(a, b) if _int(a) and _int(b) else _NO
+_FOLD[Op.LT] = _relational(lambda a, b: a < b)
+_FOLD[Op.LE] = _relational(lambda a, b: a <= b)
+_FOLD[Op.GT] = _relational(lambda a, b: a > b)
+_FOLD[Op.GE] = _relational(lambda a, b: a >= b)
+_FOLD[Op.EQ] = _equality(False)
+_FOLD[Op.NE] = _equality(True)
+_FOLD[Op.CONCAT] = _concat
+
+
+def fold(op: Op, a, b, pool: OperandPool):
+    """Const de 'pool' con el valor de 'op a, b' (a y b valores Python), o None si no se pliega."""
+    fn = _FOLD[op]
+    r = fn(a, b) if fn is not None else _NO
+    return None if r is _NO else pool.const(r)
+
+
+def _truth(v) -> Optional[bool]:
+    return bool(v) if type(v) in (int, bool) else None
+
+
+def _transfer(q: Quadruple, state: dict, pool: OperandPool) -> None:
+    """Efecto de q sobre el estado (sin reescribir nada)."""
+    op, dst = q.op, q.dst
+    if op is Op.CALL:
+        for k in [k for k in state if type(k) is Var]:
+            del state[k]
+    if not op.defines or type(dst) not in (Temp, Var):
+        return
+    value = None
+    if op is Op.COPY:
+        value = _value(q.a, state)
+    elif _FOLD[op] is not None:
+        a, b = _value(q.a, state), _value(q.b, state)
+        if a is not None and b is not None:
+            value = fold(op, a.value, b.value, pool)
+    if value is None:
+        state.pop(dst, None)
+    else:
+        state[dst] = value
+
+
+def _value(o: Optional[Operand], state: dict) -> Optional[Const]:
+    if type(o) is Const:
+        return o
+    return state.get(o) if o is not None else None
+
+
+def _analyze(cfg: CFG) -> list[Optional[dict]]:
+    """Estado a la entrada de cada bloque alcanzable (None si no se alcanza)."""
+    n = len(cfg)
+    ins: list[Optional[dict]] = [None] * n
+    outs: list[Optional[dict]] = [None] * n
+    entries = set(cfg.entries)
+    changed = True
+    while changed:
+        changed = False
+        for b in cfg.rpo:
+            if b in entries:
+                state: dict = {}
+            else:
+                preds = [outs[p] for p in cfg.pred[b] if outs[p] is not None]
+                if not preds:
+                    continue
+                state = dict(preds[0])
+                for other in preds[1:]:
+                    for k in [k for k, v in state.items() if other.get(k) is not v]:
+                        del state[k]
+            ins[b] = dict(state)
+            for q in cfg.blocks[b].code:
+                _transfer(q, state, cfg.pool)
+            if state != outs[b]:
+                outs[b] = state
+                changed = True
+    return ins
+
+
+def propagate_constants(cfg: CFG) -> int:
+    """Reescribe el CFG en el lugar; devuelve cuántas instrucciones cambió o quitó."""
+    pool = cfg.pool
+    changes = 0
+    for b, state in enumerate(_analyze(cfg)):
+        if state is None:
+            continue
+        block = cfg.blocks[b]
+        code: list[Quadruple] = []
+        edited_jump = False
+        for q in block.code:
+            op = q.op
+            new = q
+            if op is not Op.LABEL and op is not Op.GOTO and op is not Op.CALL:
+                a = _value(q.a, state) or q.a
+                b_ = _value(q.b, state) or q.b
+                if _FOLD[op] is not None and type(a) is Const and type(b_) is Const:
+                    k = fold(op, a.value, b_.value, pool)
+                    if k is not None:
+                        new = Quadruple(Op.COPY, k, None, q.dst)
+                if new is q and (a is not q.a or b_ is not q.b):
+                    new = Quadruple(op, a, b_, q.dst)
+            if new.op is Op.IFGOTO and type(new.a) is Const:
+                taken = _truth(new.a.value)
+                if taken is not None:
+                    edited_jump = True
+                    changes += 1
+                    if taken:
+                        code.append(Quadruple(Op.GOTO, None, None, q.dst))
+                    _transfer(q, state, pool)
+                    continue
+            if new is not q:
+                changes += 1
+            code.append(new)
+            _transfer(q, state, pool)
+        block.code = code
+        if edited_jump:
+            cfg.update(b)
+    return changes
@@ -0,0 +1,186 @@
+"""
+Eliminación de código inalcanzable y de asignaciones muertas sobre el CFG.
+
+eliminate_dead_code hace, en orden:
+1. encadenamiento de saltos: un goto/ifgoto a un bloque que solo es
+   'goto M' pasa a saltar directo a M;
+2. vacía los bloques que no se alcanzan desde ninguna entrada (código
+   después de ret/break, funciones que nadie llama);
+3. quita los goto/ifgoto a la label del siguiente bloque no vacío;
+4. quita las asignaciones (ops con defines y sin side_effects) a Temp o
+   Var cuyo valor no se lee después, por vida hacia atrás hasta el punto
+   fijo. call, print, param, ret y los stores (dst Addr) se quedan.
+
+Las Var no tienen ámbito en el TAC: una Var que aparece en una sola región
+(el programa principal o una función, sin contar llamadas) es local a ella;
+si aparece en varias es compartida, y se toma como leída por cada call y
+viva al salir de la región (ret o fin del programa).
+"""
+from __future__ import annotations
+from typing import Optional
+from .cfg import CFG
+from .tac_ir import Op, Operand, Var, Temp, Addr, Label, Quadruple
+
+_VALUE = (Temp, Var)
+
+
+def _read(o: Optional[Operand], live: set) -> None:
+    t = type(o)
+    if t in _VALUE:
+        live.add(o)
+    elif t is Addr:
+        _read(o.base, live)
+
+
+def _jump_target(cfg: CFG, label: Label) -> Label:
+    """Label final de la cadena label -> 'goto M' -> ... (sin dar vueltas)."""
+    seen = {label}
+    while True:
+        b = cfg.by_label.get(label)
+        if b is None:
+            return label
+        block = cfg.blocks[b]
+        if len(block.code) != len(block.labels) + 1 or block.code[-1].op is not Op.GOTO:
+            return label
+        nxt = block.code[-1].dst
+        if nxt in seen:
+            return label
+        seen.add(nxt)
+        label = nxt
+
+
+def _thread_jumps(cfg: CFG) -> None:
+    for block in cfg.blocks:
+        last = block.terminator
+        if last is None or last.op is Op.RET:
+            continue
+        target = _jump_target(cfg, last.dst)
+        if target != last.dst:
+            block.code[-1] = Quadruple(last.op, last.a, last.b, target)
+            cfg.update(block.id)
+
+
+def _remove_unreachable(cfg: CFG) -> int:
+    removed = 0
+    while True:   # al vaciar un bloque con call, la función llamada puede quedar sin entrada
+        dead = [b for b in range(len(cfg)) if not cfg.reachable(b) and cfg.blocks[b].code]
+        if not dead:
+            return removed
+        for b in dead:
+            removed += len(cfg.blocks[b].code)
+            cfg.clear_block(b)
+
+
+def _remove_jumps_to_next(cfg: CFG) -> int:
+    removed = 0
+    nxt: Optional[int] = None   # siguiente bloque no vacío
+    for b in range(len(cfg) - 1, -1, -1):
+        block = cfg.blocks[b]
+        last = block.terminator
+        if (last is not None and last.op is not Op.RET and nxt is not None
+                and last.dst in cfg.blocks[nxt].labels):
+            block.code.pop()
+            cfg.update(b)
+            removed += 1
+        if block.code:
+            nxt = b
+    return removed
+
+
+def _shared_vars(cfg: CFG) -> set:
+    """Var que aparecen en bloques de más de una región (entrada del CFG)."""
+    owner: dict = {}
+    shared: set = set()
+    for e in cfg.entries:
+        seen = {e}
+        stack = [e]
+        while stack:
+            b = stack.pop()
+            for q in cfg.blocks[b].code:
+                for o in (q.a, q.b, q.dst):
+                    if type(o) is Addr:
+                        o = o.base
+                    if type(o) is Var and owner.setdefault(o, e) != e:
+                        shared.add(o)
+            for s in cfg.succ[b]:
+                if s not in seen:
+                    seen.add(s)
+                    stack.append(s)
+    return shared
+
+
+def _live_out(cfg: CFG, shared: set) -> list[set]:
+    """
+    Vida a la salida de cada bloque. Una asignación muerta no hace vivos sus
+    operandos, así una cadena de copias sin uso muere entera en una pasada.
+    """
+    n = len(cfg)
+    live_in: list[set] = [set() for _ in range(n)]
+    live_out: list[set] = [set() for _ in range(n)]
+    order = cfg.rpo[::-1]
+    changed = True
+    while changed:
+        changed = False
+        for b in order:
+            block = cfg.blocks[b]
+            last = block.terminator
+            exits = not cfg.succ[b] or (last is not None and last.op is Op.RET)
+            out = set(shared) if exits else set()
+            for s in cfg.succ[b]:
+                out |= live_in[s]
+            live_out[b] = out
+            live = set(out)
+            for q in reversed(block.code):
+                _step(q, live, shared)
+            if live != live_in[b]:
+                live_in[b] = live
+                changed = True
+    return live_out
+
+
+def _step(q: Quadruple, live: set, shared: set) -> bool:
+    """
+    Vida antes de q a partir de la vida después (en el lugar). Devuelve
+    False si q es una asignación muerta (y entonces no lee nada).
+    """
+    op = q.op
+    if op is Op.LABEL or op is Op.GOTO:
+        return True
+    dst = q.dst
+    if op.defines and type(dst) in _VALUE:
+        if dst not in live and not op.side_effects:
+            return False
+        live.discard(dst)
+    elif op is not Op.IFGOTO:
+        _read(dst, live)        # store: dst Addr lee su base
+    if op is Op.CALL:
+        live |= shared          # a es la label de la función
+        return True
+    _read(q.a, live)
+    _read(q.b, live)
+    return True
+
+
+def _remove_dead_stores(cfg: CFG) -> int:
+    removed = 0
+    shared = _shared_vars(cfg)
+    for b, out in enumerate(_live_out(cfg, shared)):
+        if not cfg.reachable(b):
+            continue
+        block = cfg.blocks[b]
+        live = set(out)
+        keep = [q for q in reversed(block.code) if _step(q, live, shared)]
+        if len(keep) != len(block.code):
+            removed += len(block.code) - len(keep)
+            keep.reverse()
+            block.code = keep       # no toca labels ni terminador: el grafo no cambia
+    return removed
+
+
+def eliminate_dead_code(cfg: CFG) -> int:
+    """Edita el CFG en el lugar; devuelve cuántas instrucciones quitó."""
+    _thread_jumps(cfg)
+    removed = _remove_unreachable(cfg)
+    removed += _remove_jumps_to_next(cfg)
+    removed += _remove_dead_stores(cfg)
+    return removed
@@ -1,7 +1,7 @@
 from __future__ import annotations
 from dataclasses import dataclass, field
 from typing import List, Optional
-from .tac_ir import Label
+from .tac_ir import Label, OperandPool
 
 @dataclass
 class LoopLabels:
@@ -13,12 +13,23 @@ class LabelManager:
     prefix: str = "L"
     _counter: int = 0
     _loop_stack: List[LoopLabels] = field(default_factory=list)
+    _func_counter: int = 0
+    pool: Optional[OperandPool] = None   # si se da, devuelve las instancias del pool
 
     def new(self, prefix: Optional[str] = None) -> Label:
         p = prefix if prefix is not None else self.prefix
         name = f"{p}{self._counter}"
         self._counter += 1
-        return Label(name)
+        return self.pool.label(name) if self.pool is not None else Label(name)
+
+    def func(self, name: str) -> Label:
+        """
+        Etiqueta de entrada de una función: F_<nombre>_<n>, única aunque dos
+        funciones anidadas se llamen igual o el nombre parezca una etiqueta.
+        """
+        lbl = f"F_{name}_{self._func_counter}"
+        self._func_counter += 1
+        return self.pool.label(lbl) if self.pool is not None else Label(lbl)
 
     def push_loop(self, continue_lbl: Label, break_lbl: Label) -> None:
         self._loop_stack.append(LoopLabels(continue_lbl, break_lbl))
@@ -27,6 +38,10 @@ class LabelManager:
         assert self._loop_stack, "loop stack underflow"
         self._loop_stack.pop()
 
+    @property
+    def in_loop(self) -> bool:
+        return bool(self._loop_stack)
+
     @property
     def current_continue(self) -> Label:
         assert self._loop_stack, "no active loop"
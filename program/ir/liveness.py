@@ -0,0 +1,116 @@
+"""
+Vida de los temporales del TAC y renombrado a un conjunto mínimo.
+
+El builder crea un temporal nuevo por cada valor intermedio; al terminar,
+rename_temps calcula el rango de vida de cada uno y les reasigna nombres
+t0, t1, ... por planificación de intervalos: dos temporales comparten
+nombre solo si sus rangos no se solapan. El número de nombres resultante
+es el pico de temporales vivos a la vez (el tamaño que necesita el frame).
+
+El rango de un temporal es la envoltura [primera, última] posición en la
+que está vivo o se escribe. La vida se calcula sobre el flujo real
+(goto/ifgoto a su label, sin caída después de goto/ret): desde cada uso se
+recorren los predecesores hasta llegar a una definición, así un valor que
+cruza el salto de vuelta de un ciclo queda vivo en todo el ciclo.
+"""
+from __future__ import annotations
+from heapq import heappop, heappush
+from typing import Optional
+from .tac_ir import Op, OPS, Operand, Temp, TACProgram, ColumnarTACProgram
+
+
+def _rows(program: TACProgram | ColumnarTACProgram):
+    """Columnas (ops, a, b, dst) del programa como listas de Op y operandos."""
+    if isinstance(program, ColumnarTACProgram):
+        operands = program.operands
+        return (list(program.ops), [operands[i] for i in program.a],
+                [operands[i] for i in program.b], [operands[i] for i in program.dst])
+    code = program.code
+    return ([q.op for q in code], [q.a for q in code], [q.b for q in code], [q.dst for q in code])
+
+
+def _jumps_in(ops, dst) -> dict[int, list[int]]:
+    """Posición de cada label -> posiciones de los saltos que llegan a ella."""
+    at = {dst[i]: i for i, op in enumerate(ops) if op == Op.LABEL}
+    jumps: dict[int, list[int]] = {}
+    for i, op in enumerate(ops):
+        if op == Op.GOTO or op == Op.IFGOTO:
+            j = at.get(dst[i])
+            if j is not None:
+                jumps.setdefault(j, []).append(i)
+    return jumps
+
+
+def live_ranges(program: TACProgram | ColumnarTACProgram) -> dict[Temp, tuple[int, int]]:
+    """
+    Rango [inicio, fin] (posiciones de instrucción, inclusivo) de cada
+    temporal, en orden de primera aparición.
+    """
+    ops, a, b, dst = _rows(program)
+    jumps_in = _jumps_in(ops, dst)
+    uses: dict[Temp, list[int]] = {}
+    defs: dict[Temp, set[int]] = {}
+    for i, op in enumerate(ops):
+        for o in (a[i], b[i]):
+            if type(o) is Temp:
+                uses.setdefault(o, []).append(i)
+                defs.setdefault(o, set())
+        d = dst[i]
+        if type(d) is Temp:
+            (defs.setdefault(d, set()).add(i) if OPS[op].defines
+             else uses.setdefault(d, []).append(i))
+
+    no_fall = (Op.GOTO, Op.RET)
+    ranges: dict[Temp, tuple[int, int]] = {}
+    for t, t_defs in defs.items():
+        live: set[int] = set()           # posiciones donde t está vivo a la entrada
+        pending = list(uses.get(t, ()))
+        while pending:
+            p = pending.pop()
+            if p in live:
+                continue
+            live.add(p)
+            if p > 0 and ops[p - 1] not in no_fall and p - 1 not in t_defs:
+                pending.append(p - 1)
+            for q in jumps_in.get(p, ()):
+                if q not in t_defs:
+                    pending.append(q)
+        points = live | t_defs
+        ranges[t] = (min(points), max(points))
+    return dict(sorted(ranges.items(), key=lambda kv: kv[1][0]))
+
+
+def rename_temps(program: TACProgram | ColumnarTACProgram, prefix: str = "t") -> int:
+    """
+    Renombra en el lugar los temporales del programa a prefix0, prefix1, ...
+    (el número más bajo libre) y devuelve el pico de temporales vivos.
+    """
+    active: list[tuple[int, int]] = []   # (fin, número) de los rangos abiertos
+    free: list[int] = []
+    slots: dict[Temp, int] = {}
+    peak = 0
+    for t, (start, end) in live_ranges(program).items():
+        while active and active[0][0] < start:
+            heappush(free, heappop(active)[1])
+        if free:
+            slot = heappop(free)
+        else:
+            slot, peak = peak, peak + 1
+        heappush(active, (end, slot))
+        slots[t] = slot
+
+    pool = program.pool
+    renamed: dict[Operand, Temp] = {t: pool.temp(f"{prefix}{n}") for t, n in slots.items()}
+    if isinstance(program, ColumnarTACProgram):
+        ids = {pool.id(t): pool.id(new) for t, new in renamed.items()}
+        for col in (program.a, program.b, program.dst):
+            for i, x in enumerate(col):
+                new_id = ids.get(x)
+                if new_id is not None:
+                    col[i] = new_id
+    else:
+        def rn(o: Optional[Operand]) -> Optional[Operand]:
+            return renamed.get(o, o) if type(o) is Temp else o
+        for q in program.code:
+            q.a, q.b, q.dst = rn(q.a), rn(q.b), rn(q.dst)
+    return peak
@@ -0,0 +1,196 @@
+"""
+Numeración de valores (eliminación de subexpresiones comunes) sobre el CFG.
+
+Cada valor recibe un número (VN): las Const por (tipo, valor), las Temp y
+Var por el valor que tienen ahora, las lecturas de memoria (Addr) por
+(VN de la base, offset). Una operación pura 'op a, b -> t' se identifica
+por (op, VN(a), VN(b)), con los operandos ordenados si op es conmutativa.
+Si ese valor ya está en alguna variable o temporal, la instrucción pasa a
+ser 't := esa' (o desaparece si t ya lo tiene).
+
+- value_numbering: por bloque básico, cada bloque empieza sin nada.
+- global_value_numbering: recorre el árbol de dominadores; un bloque hereda
+  la tabla de su dominador inmediato, quitando los nombres que se escriben
+  en los bloques entre los dos (y la memoria si ahí hay stores o calls).
+
+Un store (dst Addr) invalida toda la memoria conocida; una call, además,
+todas las Var (puede cambiar globales). Las copias que quedan sin uso las
+quita la eliminación de código muerto.
+"""
+from __future__ import annotations
+from itertools import count
+from typing import Iterator, Optional
+from .cfg import CFG
+from .tac_ir import Op, Operand, Const, Var, Temp, Addr, Quadruple
+
+_PURE = frozenset((Op.ADD, Op.SUB, Op.MUL, Op.DIV, Op.MOD, Op.CONCAT,
+                   Op.EQ, Op.NE, Op.LT, Op.LE, Op.GT, Op.GE))
+_COMMUTATIVE = frozenset((Op.ADD, Op.MUL, Op.EQ, Op.NE))
+_NAME = (Temp, Var)
+
+
+class _Table:
+    """Valores conocidos en un punto del programa."""
+    def __init__(self, numbers: Iterator[int]) -> None:
+        self.numbers = numbers
+        self.names: dict[Operand, int] = {}      # Temp/Var -> VN que tiene
+        self.holders: dict[int, list] = {}       # VN -> nombres que lo tienen
+        self.consts: dict[tuple, int] = {}       # (tipo, valor) -> VN
+        self.memory: dict[tuple, int] = {}       # (VN base, offset) -> VN leído
+        self.exprs: dict[tuple, int] = {}        # (op, VN a, VN b) -> VN
+
+    def copy(self) -> "_Table":
+        t = _Table(self.numbers)
+        t.names = dict(self.names)
+        t.holders = {vn: list(h) for vn, h in self.holders.items()}
+        t.consts = self.consts
+        t.memory = dict(self.memory)
+        t.exprs = {k: vn for k, vn in self.exprs.items() if vn in t.holders}
+        return t
+
+    def value(self, o: Optional[Operand]) -> int:
+        if o is None:
+            return 0
+        t = type(o)
+        if t is Const:
+            key = (type(o.value), o.value)
+            vn = self.consts.get(key)
+            if vn is None:
+                vn = self.consts[key] = next(self.numbers)
+            return vn
+        if t is Addr:
+            key = (self.value(o.base), o.offset)
+            vn = self.memory.get(key)
+            if vn is None:
+                vn = self.memory[key] = next(self.numbers)
+            return vn
+        vn = self.names.get(o)
+        if vn is None:
+            vn = next(self.numbers)
+            self.bind(o, vn)
+        return vn
+
+    def holder(self, vn: int) -> Optional[Operand]:
+        h = self.holders.get(vn)
+        return h[0] if h else None
+
+    def kill(self, name: Operand) -> None:
+        vn = self.names.pop(name, None)
+        if vn is not None:
+            h = self.holders[vn]
+            h.remove(name)
+            if not h:
+                del self.holders[vn]
+
+    def bind(self, name: Operand, vn: int) -> None:
+        self.kill(name)
+        self.names[name] = vn
+        self.holders.setdefault(vn, []).append(name)
+
+    def kill_vars(self) -> None:
+        for name in [n for n in self.names if type(n) is Var]:
+            self.kill(name)
+
+
+def _number_block(code: list[Quadruple], table: _Table) -> tuple[list[Quadruple], int]:
+    out: list[Quadruple] = []
+    changes = 0
+    for q in code:
+        op, dst = q.op, q.dst
+        if op is Op.CALL:
+            table.kill_vars()
+            table.memory.clear()
+        if not op.defines:
+            out.append(q)
+            continue
+        if op is Op.CALL:
+            vn = next(table.numbers)
+        elif op is Op.COPY:
+            vn = table.value(q.a)
+        elif op in _PURE:
+            va, vb = table.value(q.a), table.value(q.b)
+            if op in _COMMUTATIVE and vb < va:
+                va, vb = vb, va
+            key = (op, va, vb)
+            vn = table.exprs.get(key)
+            have = table.holder(vn) if vn is not None else None
+            if have is not None:
+                changes += 1
+                if table.names.get(dst) == vn:
+                    continue                     # dst ya tiene ese valor
+                q = Quadruple(Op.COPY, have, None, dst)
+            elif vn is None:
+                vn = table.exprs[key] = next(table.numbers)
+        else:
+            vn = next(table.numbers)
+        if type(dst) in _NAME:
+            table.bind(dst, vn)
+        elif type(dst) is Addr:
+            base = table.value(dst.base)
+            table.memory.clear()
+            table.memory[(base, dst.offset)] = vn
+        out.append(q)
+    return out, changes
+
+
+def value_numbering(cfg: CFG) -> int:
+    """Numeración local (por bloque); devuelve cuántas instrucciones reemplazó o quitó."""
+    numbers = count(1)
+    changes = 0
+    for b in cfg.rpo:
+        block = cfg.blocks[b]
+        block.code, n = _number_block(block.code, _Table(numbers))
+        changes += n
+    return changes
+
+
+def _between(cfg: CFG, b: int, dom: int) -> set[int]:
+    """Bloques por los que se puede llegar a b desde dom sin volver a pasar por dom."""
+    seen: set[int] = set()
+    stack = [p for p in cfg.pred[b] if p != dom]
+    while stack:
+        p = stack.pop()
+        if p in seen or not cfg.reachable(p):
+            continue
+        seen.add(p)
+        stack.extend(x for x in cfg.pred[p] if x != dom)
+    return seen
+
+
+def _inherit(cfg: CFG, b: int, dom: int, table: _Table) -> _Table:
+    t = table.copy()
+    if cfg.pred[b] == [dom]:
+        return t
+    for p in _between(cfg, b, dom):
+        for q in cfg.blocks[p].code:
+            if q.op is Op.CALL:
+                t.kill_vars()
+                t.memory.clear()
+            if q.op.defines and type(q.dst) in _NAME:
+                t.kill(q.dst)
+            elif q.op.defines and type(q.dst) is Addr:
+                t.memory.clear()
+    return t
+
+
+def global_value_numbering(cfg: CFG) -> int:
+    """
+    Numeración con alcance de dominadores; devuelve cuántas instrucciones
+    reemplazó o quitó.
+    """
+    numbers = count(1)
+    idom = cfg.idom
+    children: list[list[int]] = [[] for _ in cfg.blocks]
+    for b in cfg.rpo:
+        if idom[b] >= 0:
+            children[idom[b]].append(b)
+    changes = 0
+    stack: list[tuple[int, _Table]] = [(e, _Table(numbers)) for e in reversed(cfg.entries)]
+    while stack:
+        b, table = stack.pop()
+        block = cfg.blocks[b]
+        block.code, n = _number_block(block.code, table)
+        changes += n
+        for c in reversed(children[b]):
+            stack.append((c, _inherit(cfg, c, b, table)))
+    return changes
@@ -0,0 +1,33 @@
+"""
+Optimizaciones sobre el TAC terminado (después de reciclar temporales).
+
+optimize arma el CFG del programa, corre las pasadas pedidas en orden y
+lo vuelve a aplanar. Cada pasada recibe el CFG, lo edita en el lugar y
+devuelve cuántas instrucciones cambió o quitó.
+"""
+from __future__ import annotations
+from typing import Sequence
+from .cfg import build_cfg
+from .constprop import propagate_constants
+from .dce import eliminate_dead_code
+from .lvn import value_numbering, global_value_numbering
+from .tac_ir import TACProgram, ColumnarTACProgram
+
+PASSES = {
+    "const": propagate_constants,
+    "lvn": value_numbering,
+    "gvn": global_value_numbering,
+    "dce": eliminate_dead_code,
+}
+DEFAULT_PASSES = ("const", "lvn", "dce")
+
+
+def optimize(program: TACProgram | ColumnarTACProgram,
+             passes: Sequence[str] = DEFAULT_PASSES) -> tuple[TACProgram | ColumnarTACProgram, dict[str, int]]:
+    """Programa optimizado (en la misma representación) y cambios por pasada."""
+    cfg = build_cfg(program)
+    stats = {name: PASSES[name](cfg) for name in passes}
+    out = cfg.to_program()
+    if isinstance(program, ColumnarTACProgram):
+        out = ColumnarTACProgram.from_program(out)
+    return out, stats
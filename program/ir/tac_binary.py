@@ -0,0 +1,249 @@
+"""
+Formato binario del TAC (.ctac), para guardar y pasar el programa entre
+etapas sin volver a leer el texto de dump().
+
+Formato (little-endian):
+    cabecera  _HEADER: MAGIC, versión del formato, número de opcodes,
+              cantidad de strings, de operandos y de instrucciones
+    strings   (n+1) uint32 con los offsets en el blob, y el blob UTF-8
+              (relleno hasta múltiplo de 4)
+    operandos registros _OPERAND de 16 bytes: tipo y payload de 8 bytes
+              (entero, float, índice de string o id base + offset de Addr);
+              el id 0 es "sin operando" y no se guarda
+    código    registros de 16 bytes: Op, id de a, id de b, id de dst (int32)
+
+El tipo de cada operando va explícito, así Const("x") y Var("x") (o
+Const(1) y Const(true)) no se confunden al volver a cargarlo.
+
+read_tac mapea el archivo con mmap: las instrucciones no se decodifican,
+las columnas del programa son vistas con paso sobre el mapeo; solo se
+arma la tabla de operandos.
+"""
+from __future__ import annotations
+import mmap
+import os
+import struct
+import sys
+from array import array
+from .tac_ir import (
+    Op, Operand, Const, Var, Temp, Label, Addr, OperandPool,
+    TACProgram, ColumnarTACProgram,
+)
+
+MAGIC = b"CTAC"
+FORMAT_VERSION = 1
+_HEADER = struct.Struct("<4sHHIII")
+_OPERAND = struct.Struct("<B7x8s")
+_RECORD = 16   # bytes por instrucción
+_LITTLE = sys.byteorder == "little"
+
+# tipos de operando
+(_K_NULL, _K_INT, _K_BIGINT, _K_FLOAT, _K_BOOL, _K_STR,
+ _K_VAR, _K_TEMP, _K_LABEL, _K_ADDR) = range(10)
+_NAMED = {Var: _K_VAR, Temp: _K_TEMP, Label: _K_LABEL}
+_I64, _F64, _II = struct.Struct("<q"), struct.Struct("<d"), struct.Struct("<ii")
+
+
+class TACFormatError(Exception):
+    """El archivo no es TAC binario de esta versión, o está dañado."""
+
+
+# ---------- escritura ----------
+
+class _Encoder:
+    def __init__(self):
+        self.table = OperandPool()        # ids densos propios del archivo
+        self.strings: list[str] = []
+        self._string_ids: dict[str, int] = {}
+
+    def id(self, o: Operand | None) -> int:
+        if type(o) is Addr:
+            self.id(o.base)               # la base queda antes que el Addr
+        return self.table.id(o)
+
+    def string(self, s: str) -> int:
+        i = self._string_ids.get(s)
+        if i is None:
+            i = self._string_ids[s] = len(self.strings)
+            self.strings.append(s)
+        return i
+
+    def operand(self, o: Operand) -> bytes:
+        t = type(o)
+        if t in _NAMED:
+            return _OPERAND.pack(_NAMED[t], _I64.pack(self.string(o.name)))
+        if t is Addr:
+            return _OPERAND.pack(_K_ADDR, _II.pack(self.table.id(o.base), o.offset))
+        v = o.value
+        if v is None:
+            return _OPERAND.pack(_K_NULL, bytes(8))
+        if type(v) is bool:
+            return _OPERAND.pack(_K_BOOL, _I64.pack(v))
+        if type(v) is int:
+            if -2**63 <= v < 2**63:
+                return _OPERAND.pack(_K_INT, _I64.pack(v))
+            return _OPERAND.pack(_K_BIGINT, _I64.pack(self.string(str(v))))
+        if type(v) is float:
+            return _OPERAND.pack(_K_FLOAT, _F64.pack(v))
+        return _OPERAND.pack(_K_STR, _I64.pack(self.string(v)))
+
+
+def dump_tac(program: TACProgram | ColumnarTACProgram) -> bytes:
+    enc = _Encoder()
+    code = array("i")
+    if isinstance(program, ColumnarTACProgram):
+        ids = [enc.id(o) for o in program.operands]
+        for op, a, b, dst in zip(program.ops, program.a, program.b, program.dst):
+            code.extend((op, ids[a], ids[b], ids[dst]))
+    else:
+        for q in program.code:
+            code.extend((q.op, enc.id(q.a), enc.id(q.b), enc.id(q.dst)))
+    if not _LITTLE:
+        code.byteswap()
+
+    operands = b"".join(enc.operand(o) for o in enc.table.operands[1:])
+    blobs = [s.encode("utf-8") for s in enc.strings]
+    offsets = array("I", [0])
+    for s in blobs:
+        offsets.append(offsets[-1] + len(s))
+    if not _LITTLE:
+        offsets.byteswap()
+    blob = b"".join(blobs)
+    blob += bytes(-len(blob) % 4)
+
+    header = _HEADER.pack(MAGIC, FORMAT_VERSION, len(Op), len(enc.strings),
+                          len(enc.table), len(program))
+    return b"".join((header, offsets.tobytes(), blob, operands, code.tobytes()))
+
+
+def write_tac(path: str, program: TACProgram | ColumnarTACProgram) -> None:
+    data = dump_tac(program)
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+# ---------- lectura ----------
+
+class MappedTACProgram(ColumnarTACProgram):
+    """
+    Programa de solo lectura sobre un buffer .ctac (bytes o mmap). Las
+    columnas ops/a/b/dst son memoryviews con paso sobre los registros, así
+    que __iter__, dump() y columns() funcionan sin copiar el código.
+    to_columnar() da una copia que se puede seguir extendiendo.
+    """
+    def __init__(self, buf, pool: OperandPool, offset: int, n: int) -> None:
+        self._buf = buf
+        self.pool = pool
+        self.operands = pool.operands
+        view = memoryview(buf)[offset:offset + n * _RECORD]
+        if _LITTLE:
+            words = view.cast("i")
+        else:
+            words = array("i", view.tobytes())
+            words.byteswap()
+            words = memoryview(words)
+        self._words = words
+        self.ops, self.a, self.b, self.dst = words[0::4], words[1::4], words[2::4], words[3::4]
+
+    def emit(self, *args, **kwargs):
+        raise TypeError("MappedTACProgram es de solo lectura; usar to_columnar()")
+
+    def columns(self) -> tuple[memoryview, memoryview, memoryview, memoryview]:
+        return self.ops, self.a, self.b, self.dst
+
+    def to_columnar(self) -> ColumnarTACProgram:
+        out = ColumnarTACProgram()
+        out.pool, out.operands = self.pool, self.operands
+        for col, view in zip((out.ops, out.a, out.b, out.dst), self.columns()):
+            col.frombytes(view.tobytes())
+        return out
+
+    def close(self) -> None:
+        """Suelta las vistas y cierra el mmap (si lo abrió read_tac)."""
+        for view in (self.ops, self.a, self.b, self.dst, self._words):
+            view.release()
+        if isinstance(self._buf, mmap.mmap):
+            self._buf.close()
+
+    def __enter__(self) -> "MappedTACProgram":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def _decode_operands(buf, offset: int, count: int, strings: list[str]) -> OperandPool:
+    pool = OperandPool()
+    operands = pool.operands
+    for kind, payload in _OPERAND.iter_unpack(buf[offset:offset + count * _OPERAND.size]):
+        if kind == _K_VAR:
+            o = pool.var(strings[_I64.unpack(payload)[0]])
+        elif kind == _K_TEMP:
+            o = pool.temp(strings[_I64.unpack(payload)[0]])
+        elif kind == _K_LABEL:
+            o = pool.label(strings[_I64.unpack(payload)[0]])
+        elif kind == _K_ADDR:
+            base, off = _II.unpack(payload)
+            o = pool.intern(Addr(operands[base], off))
+        elif kind == _K_NULL:
+            o = pool.const(None)
+        elif kind == _K_BOOL:
+            o = pool.const(bool(_I64.unpack(payload)[0]))
+        elif kind == _K_INT:
+            o = pool.const(_I64.unpack(payload)[0])
+        elif kind == _K_BIGINT:
+            o = pool.const(int(strings[_I64.unpack(payload)[0]]))
+        elif kind == _K_FLOAT:
+            o = pool.const(_F64.unpack(payload)[0])
+        elif kind == _K_STR:
+            o = pool.const(strings[_I64.unpack(payload)[0]])
+        else:
+            raise TACFormatError(f"tipo de operando desconocido: {kind}")
+    if len(pool) != count:
+        raise TACFormatError("tabla de operandos con entradas repetidas")
+    return pool
+
+
+def load_tac(buf) -> MappedTACProgram:
+    """Programa guardado en 'buf' (bytes, bytearray o mmap). Lanza TACFormatError si no sirve."""
+    if len(buf) < _HEADER.size:
+        raise TACFormatError("archivo TAC truncado")
+    magic, fmt, n_ops, n_strings, n_operands, n_code = _HEADER.unpack_from(buf)
+    if magic != MAGIC:
+        raise TACFormatError("no es un archivo TAC binario")
+    if (fmt, n_ops) != (FORMAT_VERSION, len(Op)):
+        raise TACFormatError("TAC binario de otra versión del compilador")
+
+    pos = _HEADER.size
+    offsets = array("I", bytes(buf[pos:pos + 4 * (n_strings + 1)]))
+    if not _LITTLE:
+        offsets.byteswap()
+    pos += 4 * (n_strings + 1)
+    blob_len = offsets[-1] if n_strings else 0
+    blob = bytes(buf[pos:pos + blob_len])
+    pos += blob_len + (-blob_len % 4)
+    ops_pos = pos + n_operands * _OPERAND.size
+    if len(buf) != ops_pos + n_code * _RECORD:
+        raise TACFormatError("archivo TAC truncado o con datos de más")
+
+    try:
+        strings = [blob[offsets[i]:offsets[i + 1]].decode("utf-8") for i in range(n_strings)]
+        pool = _decode_operands(buf, pos, n_operands, strings)
+    except (IndexError, UnicodeDecodeError, struct.error) as exc:
+        raise TACFormatError(f"archivo TAC dañado: {exc}") from None
+    return MappedTACProgram(buf, pool, ops_pos, n_code)
+
+
+def read_tac(path: str) -> MappedTACProgram:
+    """Mapea 'path' en memoria; cerrar con close() (o usar 'with')."""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            raise TACFormatError("archivo TAC vacío")
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+        return load_tac(mm)
+    except Exception:
+        mm.close()
+        raise
@@ -1,9 +1,11 @@
 from __future__ import annotations
 from dataclasses import dataclass
-from typing import Optional
-from .tac_ir import TACProgram, Operand, Const, Var, Temp, Label
+from typing import Optional, Sequence
+from .tac_ir import Op, TACProgram, ColumnarTACProgram, Operand, Const, Var, Temp, Label, Quadruple
 from .temp_alloc import TempAllocator
 from .label_mgr import LabelManager
+from .liveness import rename_temps
+from .tac_sink import TACSink
 
 @dataclass
 class ExprResult:
@@ -16,40 +18,101 @@ class TACBuilder:
     Persona A es propietaria de este archivo (sección expresiones).
     Persona B/C lo extenderán con statements/llamadas/memoria.
     """
-    def __init__(self) -> None:
-        self.tac = TACProgram()
+    def __init__(self, tac: TACProgram | ColumnarTACProgram | None = None,
+                 sink: TACSink | None = None) -> None:
+        # Con sink, self.tac es solo el trozo en curso (ver tac_sink)
+        self.sink = sink
         self.tmps = TempAllocator()
         self.labels = LabelManager()
+        self._set_program(tac if tac is not None else TACProgram())
+        self._func_depth = 0
+        self.peak_temps: Optional[int] = None   # lo fija finish()
+        # (línea, columna, construcción) que el TAC no cubre; si hay alguna,
+        # el programa emitido está incompleto y no se debe usar
+        self.unsupported: list[tuple[int, int, str]] = []
+
+    def _set_program(self, tac: TACProgram | ColumnarTACProgram) -> None:
+        self.tac = tac
+        # Operandos canónicos del programa: sin una instancia nueva por uso
+        self.pool = self.tmps.pool = self.labels.pool = tac.pool
+        self._zero = ExprResult(self.pool.const(0), is_temp=False)
+
+    @property
+    def complete(self) -> bool:
+        return not self.unsupported
+
+    def mark_unsupported(self, line: int, col: int, what: str) -> None:
+        self.unsupported.append((line, col, what))
+
+    def flush(self) -> None:
+        """
+        Entrega al sink el código emitido hasta ahora (con los temporales
+        ya reciclados) y empieza un trozo nuevo. Solo se llama donde no hay
+        temporales vivos: al cerrar una función de nivel superior y al final.
+        """
+        peak = rename_temps(self.tac, self.tmps.prefix)
+        self.peak_temps = max(self.peak_temps or 0, peak)
+        if self.complete:   # un trozo incompleto no llega al sink
+            self.sink.write(self.tac)
+        self.tmps.reset()
+        self._set_program(TACProgram())
+
+    def finish(self) -> int:
+        """
+        Cierra el programa: recicla los temporales según su vida
+        (liveness.rename_temps) y devuelve el pico de temporales vivos.
+        """
+        if self.sink is None:
+            self.peak_temps = rename_temps(self.tac, self.tmps.prefix)
+        else:
+            self.flush()
+            self.sink.close()
+        return self.peak_temps
 
-    def _binop(self, op: str, lhs: ExprResult, rhs: ExprResult) -> ExprResult:
+    def _binop(self, op: Op | str, lhs: ExprResult, rhs: ExprResult) -> ExprResult:
         t = self.tmps.new()
         self.tac.emit(op, lhs.value, rhs.value, t)
-        if lhs.is_temp and isinstance(lhs.value, Temp):
-            self.tmps.free(lhs.value)
-        if rhs.is_temp and isinstance(rhs.value, Temp):
-            self.tmps.free(rhs.value)
         return ExprResult(t, is_temp=True)
 
+    def _detached(self, cb) -> list[Quadruple]:
+        """Código que emite cb(self), sin agregarlo al programa (para ubicarlo después)."""
+        main = self.tac
+        self.tac = TACProgram(pool=self.pool)
+        try:
+            cb(self)
+        finally:
+            side, self.tac = self.tac, main
+        return side.code
+
+    def _splice(self, code: list[Quadruple]) -> None:
+        for q in code:
+            self.tac.emit(q.op, q.a, q.b, q.dst)
+
     def _assign(self, dst: Operand, src: ExprResult) -> None:
-        self.tac.emit(":=", src.value, None, dst)
-        if src.is_temp and isinstance(src.value, Temp):
-            self.tmps.free(src.value)
+        self.tac.emit(Op.COPY, src.value, None, dst)
 
     # Literales y variables
     def gen_expr_literal(self, value) -> ExprResult:
         t = self.tmps.new()
-        self.tac.emit(":=", Const(value), None, t)
+        self.tac.emit(Op.COPY, self.pool.const(value), None, t)
         return ExprResult(t, is_temp=True)
 
     def gen_expr_var(self, name: str) -> ExprResult:
-        return ExprResult(Var(name), is_temp=False)
+        return ExprResult(self.pool.var(name), is_temp=False)
 
     # Aritmética
-    def gen_expr_add(self, L: ExprResult, R: ExprResult) -> ExprResult: return self._binop("+", L, R)
-    def gen_expr_sub(self, L: ExprResult, R: ExprResult) -> ExprResult: return self._binop("-", L, R)
-    def gen_expr_mul(self, L: ExprResult, R: ExprResult) -> ExprResult: return self._binop("*", L, R)
-    def gen_expr_div(self, L: ExprResult, R: ExprResult) -> ExprResult: return self._binop("/", L, R)
-    def gen_expr_mod(self, L: ExprResult, R: ExprResult) -> ExprResult: return self._binop("%", L, R)
+    def gen_expr_add(self, L: ExprResult, R: ExprResult) -> ExprResult: return self._binop(Op.ADD, L, R)
+    def gen_expr_sub(self, L: ExprResult, R: ExprResult) -> ExprResult: return self._binop(Op.SUB, L, R)
+    def gen_expr_mul(self, L: ExprResult, R: ExprResult) -> ExprResult: return self._binop(Op.MUL, L, R)
+    def gen_expr_div(self, L: ExprResult, R: ExprResult) -> ExprResult: return self._binop(Op.DIV, L, R)
+    def gen_expr_mod(self, L: ExprResult, R: ExprResult) -> ExprResult: return self._binop(Op.MOD, L, R)
+
+    def gen_expr_neg(self, E: ExprResult) -> ExprResult:
+        return self._binop(Op.SUB, self._zero, E)
+
+    # Cadenas: '+' con algún operando string
+    def gen_expr_concat(self, L: ExprResult, R: ExprResult) -> ExprResult:
+        return self._binop(Op.CONCAT, L, R)
 
     # Relacionales (0/1)
     def gen_expr_rel(self, op: str, L: ExprResult, R: ExprResult) -> ExprResult:
@@ -57,8 +120,7 @@ class TACBuilder:
 
     # Lógicos con short-circuit
     def gen_expr_not(self, E: ExprResult) -> ExprResult:
-        zero = ExprResult(Const(0), is_temp=False)
-        return self._binop("==", E, zero)
+        return self._binop(Op.EQ, E, self._zero)
 
     def gen_expr_and(self, L: ExprResult, R_cb) -> ExprResult:
         res = self.tmps.new()
@@ -66,27 +128,23 @@ class TACBuilder:
         L_false = self.labels.new()
         L_end = self.labels.new()
 
-        self.tac.emit("ifgoto", L.value, None, L_check_rhs)
-        self.tac.emit("goto", None, None, L_false)
+        self.tac.emit(Op.IFGOTO, L.value, None, L_check_rhs)
+        self.tac.emit(Op.GOTO, None, None, L_false)
 
         self.tac.label(L_check_rhs)
         R = R_cb()
         L_true = self.labels.new()
-        self.tac.emit("ifgoto", R.value, None, L_true)
-        self.tac.emit("goto", None, None, L_false)
+        self.tac.emit(Op.IFGOTO, R.value, None, L_true)
+        self.tac.emit(Op.GOTO, None, None, L_false)
 
         self.tac.label(L_true)
-        self.tac.emit(":=", Const(1), None, res)
-        self.tac.emit("goto", None, None, L_end)
+        self.tac.emit(Op.COPY, self.pool.const(1), None, res)
+        self.tac.emit(Op.GOTO, None, None, L_end)
 
         self.tac.label(L_false)
-        self.tac.emit(":=", Const(0), None, res)
+        self.tac.emit(Op.COPY, self.pool.const(0), None, res)
 
         self.tac.label(L_end)
-
-        if L.is_temp and isinstance(L.value, Temp): self.tmps.free(L.value)
-        if R.is_temp and isinstance(R.value, Temp): self.tmps.free(R.value)  # type: ignore
-
         return ExprResult(res, is_temp=True)
 
     def gen_expr_or(self, L: ExprResult, R_cb) -> ExprResult:
@@ -95,45 +153,96 @@ class TACBuilder:
         L_check_rhs = self.labels.new()
         L_end = self.labels.new()
 
-        self.tac.emit("ifgoto", L.value, None, L_true)
-        self.tac.emit("goto", None, None, L_check_rhs)
+        self.tac.emit(Op.IFGOTO, L.value, None, L_true)
+        self.tac.emit(Op.GOTO, None, None, L_check_rhs)
 
         self.tac.label(L_check_rhs)
         R = R_cb()
-        self.tac.emit("ifgoto", R.value, None, L_true)
-        self.tac.emit(":=", Const(0), None, res)
-        self.tac.emit("goto", None, None, L_end)
+        self.tac.emit(Op.IFGOTO, R.value, None, L_true)
+        self.tac.emit(Op.COPY, self.pool.const(0), None, res)
+        self.tac.emit(Op.GOTO, None, None, L_end)
 
         self.tac.label(L_true)
-        self.tac.emit(":=", Const(1), None, res)
+        self.tac.emit(Op.COPY, self.pool.const(1), None, res)
         self.tac.label(L_end)
+        return ExprResult(res, is_temp=True)
 
-        if L.is_temp and isinstance(L.value, Temp): self.tmps.free(L.value)
-        if R.is_temp and isinstance(R.value, Temp): self.tmps.free(R.value)  # type: ignore
+    def gen_expr_ternary(self, cond: ExprResult, then_cb, else_cb) -> ExprResult:
+        res = self.tmps.new()
+        L_then = self.labels.new()
+        L_else = self.labels.new()
+        L_end = self.labels.new()
 
+        self.tac.emit(Op.IFGOTO, cond.value, None, L_then)
+        self.tac.emit(Op.GOTO, None, None, L_else)
+        self.tac.label(L_then)
+        self._assign(res, then_cb())
+        self.tac.emit(Op.GOTO, None, None, L_end)
+
+        self.tac.label(L_else)
+        self._assign(res, else_cb())
+        self.tac.label(L_end)
         return ExprResult(res, is_temp=True)
 
+    # ============================
+    # LLAMADAS Y FUNCIONES
+    # ============================
+
+    def func_label(self, name: str) -> Label:
+        """Etiqueta de entrada para una función `name` recién declarada."""
+        return self.labels.func(name)
+
+    def gen_expr_call(self, entry: Label, args: Sequence[ExprResult], has_value: bool = True) -> ExprResult:
+        """`param a_i` por argumento y `call f, nargs -> t` (sin destino si la función es void)."""
+        for a in args:
+            self.tac.emit(Op.PARAM, a.value)
+        dst = self.tmps.new() if has_value else None
+        self.tac.emit(Op.CALL, entry, self.pool.const(len(args)), dst)
+        if dst is None:
+            return ExprResult(self.pool.const(None), is_temp=False)
+        return ExprResult(dst, is_temp=True)
+
+    def gen_func_begin(self, entry: Label) -> Label:
+        """
+        Abre el cuerpo de la función con etiqueta de entrada `entry`
+        (func_label): salta por encima de él (el código se emite en línea) y
+        coloca la etiqueta. Devuelve la etiqueta de salida que recibe
+        gen_func_end.
+        """
+        L_skip = self.labels.new("Lfunc_end")
+        self.tac.emit(Op.GOTO, None, None, L_skip)
+        self.tac.label(entry)
+        self._func_depth += 1
+        return L_skip
+
+    def gen_func_end(self, L_skip: Label, needs_ret: bool = True) -> None:
+        if needs_ret:
+            self.tac.emit(Op.RET)
+        self.tac.label(L_skip)
+        self._func_depth -= 1
+        if self.sink is not None and not self._func_depth and not self.labels.in_loop:
+            self.flush()
+
+    def gen_stmt_expr(self, expr: ExprResult) -> None:
+        """Sentencia-expresión: el valor se descarta (su temporal muere aquí)."""
+
     # Demo de statement: print
     def gen_stmt_print(self, expr: ExprResult) -> None:
-        self.tac.emit("print", expr.value)
-        if expr.is_temp and isinstance(expr.value, Temp):
-            self.tmps.free(expr.value)
+        self.tac.emit(Op.PRINT, expr.value)
 
     def gen_stmt_if(self, cond: ExprResult, then_body_cb, else_body_cb=None) -> None:
         L_then = self.labels.new()
         L_end  = self.labels.new()
         L_else = self.labels.new() if else_body_cb else L_end
-        self.tac.emit("ifgoto", cond.value, None, L_then)
-        self.tac.emit("goto", None, None, L_else)
+        self.tac.emit(Op.IFGOTO, cond.value, None, L_then)
+        self.tac.emit(Op.GOTO, None, None, L_else)
         self.tac.label(L_then)
         then_body_cb(self)
         if else_body_cb:
-            self.tac.emit("goto", None, None, L_end)
+            self.tac.emit(Op.GOTO, None, None, L_end)
             self.tac.label(L_else)
             else_body_cb(self)
         self.tac.label(L_end)
-        if cond.is_temp and isinstance(cond.value, Temp):
-            self.tmps.free(cond.value)
 
     # ============================
     # CONTROL DE FLUJO (Persona B)
@@ -148,8 +257,8 @@ class TACBuilder:
         # Empieza el ciclo
         self.tac.label(L_start)
         cond = cond_cb(self)
-        self.tac.emit("ifgoto", cond.value, None, L_body)
-        self.tac.emit("goto", None, None, L_end)
+        self.tac.emit(Op.IFGOTO, cond.value, None, L_body)
+        self.tac.emit(Op.GOTO, None, None, L_end)
 
         # Registrar etiquetas de loop
         self.labels.push_loop(continue_lbl=L_start, break_lbl=L_end)
@@ -157,15 +266,12 @@ class TACBuilder:
         # Cuerpo
         self.tac.label(L_body)
         body_cb(self)
-        self.tac.emit("goto", None, None, L_start)
+        self.tac.emit(Op.GOTO, None, None, L_start)
 
         # Fin del ciclo
         self.labels.pop_loop()
         self.tac.label(L_end)
 
-        if cond.is_temp and isinstance(cond.value, Temp):
-            self.tmps.free(cond.value)
-
     def gen_stmt_do_while(self, body_cb, cond_cb) -> None:
         """Genera TAC para un ciclo do { body } while(cond)"""
         L_body = self.labels.new("Ldo_body")
@@ -180,14 +286,15 @@ class TACBuilder:
 
         self.tac.label(L_cond)
         cond = cond_cb(self)
-        self.tac.emit("ifgoto", cond.value, None, L_body)
+        self.tac.emit(Op.IFGOTO, cond.value, None, L_body)
         self.tac.label(L_end)
 
-        if cond.is_temp and isinstance(cond.value, Temp):
-            self.tmps.free(cond.value)
-
     def gen_stmt_for(self, init_cb, cond_cb, step_cb, body_cb) -> None:
-        """Genera TAC para for(init; cond; step) { body }"""
+        """
+        Genera TAC para for(init; cond; step) { body }. Los callbacks se
+        llaman en el orden del fuente (step antes que body, como los chequea
+        el TypeChecker); el código de step se ubica después del cuerpo.
+        """
         L_cond = self.labels.new("Lfor_cond")
         L_body = self.labels.new("Lfor_body")
         L_step = self.labels.new("Lfor_step")
@@ -199,31 +306,28 @@ class TACBuilder:
 
         self.tac.label(L_cond)
         cond = cond_cb(self)
-        self.tac.emit("ifgoto", cond.value, None, L_body)
-        self.tac.emit("goto", None, None, L_end)
+        self.tac.emit(Op.IFGOTO, cond.value, None, L_body)
+        self.tac.emit(Op.GOTO, None, None, L_end)
 
         self.labels.push_loop(continue_lbl=L_step, break_lbl=L_end)
+        step = self._detached(step_cb) if step_cb else []
 
         self.tac.label(L_body)
         body_cb(self)
         self.tac.label(L_step)
-        if step_cb:
-            step_cb(self)
-        self.tac.emit("goto", None, None, L_cond)
+        self._splice(step)
+        self.tac.emit(Op.GOTO, None, None, L_cond)
 
         self.labels.pop_loop()
         self.tac.label(L_end)
 
-        if cond.is_temp and isinstance(cond.value, Temp):
-            self.tmps.free(cond.value)
-
     def gen_stmt_break(self) -> None:
         """Salto a la etiqueta break del bucle actual"""
-        self.tac.emit("goto", None, None, self.labels.current_break)
+        self.tac.emit(Op.GOTO, None, None, self.labels.current_break)
 
     def gen_stmt_continue(self) -> None:
         """Salto a la etiqueta continue del bucle actual"""
-        self.tac.emit("goto", None, None, self.labels.current_continue)
+        self.tac.emit(Op.GOTO, None, None, self.labels.current_continue)
 
     def gen_stmt_switch(self, expr: ExprResult, case_blocks, default_cb=None) -> None:
         """
@@ -238,10 +342,13 @@ class TACBuilder:
         # Comparaciones de expr con cada case
         for lbl, val, _ in case_labels:
             t_cmp = self.tmps.new()
-            self.tac.emit("==", expr.value, Const(val), t_cmp)
-            self.tac.emit("ifgoto", t_cmp, None, lbl)
-            self.tmps.free(t_cmp)
-        self.tac.emit("goto", None, None, L_default)
+            self.tac.emit(Op.EQ, expr.value, self.pool.const(val), t_cmp)
+            self.tac.emit(Op.IFGOTO, t_cmp, None, lbl)
+        self.tac.emit(Op.GOTO, None, None, L_default)
+
+        # break dentro del switch salta a L_end; continue sigue siendo el del bucle que lo rodea
+        outer_continue = self.labels.current_continue if self.labels.in_loop else L_end
+        self.labels.push_loop(continue_lbl=outer_continue, break_lbl=L_end)
 
         # Ejecutar cada case
         for lbl, _, cb in case_labels:
@@ -253,16 +360,12 @@ class TACBuilder:
             self.tac.label(L_default)
             default_cb(self)
 
+        self.labels.pop_loop()
         self.tac.label(L_end)
 
-        if expr.is_temp and isinstance(expr.value, Temp):
-            self.tmps.free(expr.value)
-
     def gen_stmt_return(self, expr: Optional[ExprResult] = None) -> None:
         """Genera 'ret v' o 'ret'"""
         if expr:
-            self.tac.emit("ret", expr.value)
-            if expr.is_temp and isinstance(expr.value, Temp):
-                self.tmps.free(expr.value)
+            self.tac.emit(Op.RET, expr.value)
         else:
-            self.tac.emit("ret")
+            self.tac.emit(Op.RET)
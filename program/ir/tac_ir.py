@@ -1,12 +1,19 @@
 from __future__ import annotations
+from array import array
 from dataclasses import dataclass, field
-from typing import List, Optional, Union
+from enum import IntEnum
+from typing import Iterator, List, Optional, Union
 
 class Operand:
+    """
+    Operando del TAC. La igualdad y el hash son por identidad: la instancia
+    canónica de cada valor o nombre la da el OperandPool del programa
+    (TACProgram.emit y pool.intern convierten los creados fuera del pool).
+    """
     def __str__(self) -> str:
         return self.__repr__()
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, eq=False)
 class Const(Operand):
     value: Union[int, float, bool, str, None]
     def __repr__(self) -> str:
@@ -16,68 +23,218 @@ class Const(Operand):
             return "null"
         return str(self.value).lower() if isinstance(self.value, bool) else str(self.value)
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, eq=False)
 class Var(Operand):
     name: str
     def __repr__(self) -> str:
         return self.name
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, eq=False)
 class Temp(Operand):
     name: str
     def __repr__(self) -> str:
         return self.name
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, eq=False)
 class Addr(Operand):
     base: Operand
     offset: int
     def __repr__(self) -> str:
         return f"&({self.base}+{self.offset})"
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, eq=False)
 class Label(Operand):
     name: str
     def __repr__(self) -> str:
         return self.name
 
+class OperandPool:
+    """
+    Operandos canónicos de un programa: una sola instancia por valor o
+    nombre, con un id entero denso (0 = sin operando, luego 1, 2, ... en
+    orden de aparición). Los operandos se comparan por identidad, así que el
+    pool es la única fuente de igualdad: dos operandos son el mismo si son
+    la misma instancia del pool. pool.id(o) sirve de índice para tablas y
+    conjuntos de bits en los análisis.
+
+        pool.const(0) is pool.const(0)       # True
+        pool.temp("t0") is pool.temp("t0")   # True
+        pool.operands[pool.id(x)] is x       # True si x es canónico
+    """
+    def __init__(self) -> None:
+        self.operands: List[Optional[Operand]] = [None]
+        # 1 == True en Python, pero se imprimen distinto: las constantes se
+        # indexan por (tipo, valor)
+        self._consts: dict[tuple, int] = {}
+        self._names: dict[type, dict[str, int]] = {Var: {}, Temp: {}, Label: {}}
+        self._addrs: dict[tuple, int] = {}   # (base canónica, offset)
+        self._by_obj: dict[int, int] = {}   # id(instancia canónica) -> id denso
+
+    def _add(self, table: dict, key, o: Operand) -> Operand:
+        i = table[key] = len(self.operands)
+        self._by_obj[id(o)] = i
+        self.operands.append(o)
+        return o
+
+    def const(self, value) -> Const:
+        key = (type(value), value)
+        i = self._consts.get(key)
+        return self.operands[i] if i is not None else self._add(self._consts, key, Const(value))
+
+    def var(self, name: str) -> Var:
+        table = self._names[Var]
+        i = table.get(name)
+        return self.operands[i] if i is not None else self._add(table, name, Var(name))
+
+    def temp(self, name: str) -> Temp:
+        table = self._names[Temp]
+        i = table.get(name)
+        return self.operands[i] if i is not None else self._add(table, name, Temp(name))
+
+    def label(self, name: str) -> Label:
+        table = self._names[Label]
+        i = table.get(name)
+        return self.operands[i] if i is not None else self._add(table, name, Label(name))
+
+    def intern(self, o: Operand) -> Operand:
+        """Instancia canónica de un operando creado fuera del pool."""
+        if id(o) in self._by_obj:
+            return o
+        if type(o) is Const:
+            table, key = self._consts, (type(o.value), o.value)
+        elif type(o) is Addr:
+            base = self.intern(o.base)
+            if base is not o.base:
+                o = Addr(base, o.offset)
+            table, key = self._addrs, (base, o.offset)
+        else:
+            table, key = self._names[type(o)], o.name
+        i = table.get(key)
+        return self.operands[i] if i is not None else self._add(table, key, o)
+
+    def id(self, o: Optional[Operand]) -> int:
+        if o is None:
+            return 0
+        i = self._by_obj.get(id(o))
+        return i if i is not None else self._by_obj[id(self.intern(o))]
+
+    def __len__(self) -> int:
+        return len(self.operands) - 1
+
+
+class Op(IntEnum):
+    """
+    Opcodes del TAC. Cada uno lleva su forma textual y metadatos:
+
+    - text: como se imprime (y se lee con Op.parse);
+    - arity: operandos fuente que usa (a, b);
+    - defines: escribe dst (en label/goto/ifgoto dst es la etiqueta destino);
+    - terminator: termina un bloque básico;
+    - side_effects: no se puede quitar aunque su resultado no se use.
+
+    Son enteros densos desde 0: las tablas indexadas por opcode
+    (p. ej. _FORMATS) son listas y no cadenas de comparaciones.
+    """
+    def __new__(cls, value: int, text: str, arity: int, defines: bool,
+                terminator: bool, side_effects: bool):
+        obj = int.__new__(cls, value)
+        obj._value_ = value
+        obj.text = text
+        obj.arity = arity
+        obj.defines = defines
+        obj.terminator = terminator
+        obj.side_effects = side_effects
+        return obj
+
+    #        valor  texto     arity  defines terminator side_effects
+    LABEL  = 0,  "label",    0,  False, False, False
+    GOTO   = 1,  "goto",     0,  False, True,  False
+    IFGOTO = 2,  "ifgoto",   1,  False, True,  False
+    PARAM  = 3,  "param",    1,  False, False, True
+    CALL   = 4,  "call",     2,  True,  False, True
+    RET    = 5,  "ret",      1,  False, True,  True
+    PRINT  = 6,  "print",    1,  False, False, True
+    COPY   = 7,  ":=",       1,  True,  False, False
+    ADD    = 8,  "+",        2,  True,  False, False
+    SUB    = 9,  "-",        2,  True,  False, False
+    MUL    = 10, "*",        2,  True,  False, False
+    DIV    = 11, "/",        2,  True,  False, False
+    MOD    = 12, "%",        2,  True,  False, False
+    CONCAT = 13, "concat",   2,  True,  False, False
+    EQ     = 14, "==",       2,  True,  False, False
+    NE     = 15, "!=",       2,  True,  False, False
+    LT     = 16, "<",        2,  True,  False, False
+    LE     = 17, "<=",       2,  True,  False, False
+    GT     = 18, ">",        2,  True,  False, False
+    GE     = 19, ">=",       2,  True,  False, False
+
+    @classmethod
+    def parse(cls, text: str) -> "Op":
+        try:
+            return _OP_BY_TEXT[text]
+        except KeyError:
+            raise ValueError(f"opcode TAC desconocido: {text!r}") from None
+
+    def __str__(self) -> str:
+        return self.text
+
+
+OPS: tuple[Op, ...] = tuple(Op)   # OPS[i] is Op(i), sin pasar por el lookup del Enum
+_OP_BY_TEXT: dict[str, Op] = {op.text: op for op in Op}
+
+
+def _fmt_binary(op, a, b, dst):
+    return f"{op.text} {a}, {b} -> {dst}"
+
+_FORMATS = [_fmt_binary] * len(Op)
+_FORMATS[Op.LABEL] = lambda op, a, b, dst: f"{dst}:"
+_FORMATS[Op.GOTO] = lambda op, a, b, dst: f"goto {dst}"
+_FORMATS[Op.IFGOTO] = lambda op, a, b, dst: f"if {a} goto {dst}"
+_FORMATS[Op.PARAM] = lambda op, a, b, dst: f"param {a}"
+_FORMATS[Op.CALL] = lambda op, a, b, dst: f"call {a}, nargs={b}" + (f" -> {dst}" if dst is not None else "")
+_FORMATS[Op.RET] = lambda op, a, b, dst: f"ret {a}" if a is not None else "ret"
+_FORMATS[Op.PRINT] = lambda op, a, b, dst: f"print {a}"
+_FORMATS[Op.COPY] = lambda op, a, b, dst: f"{dst} := {a}"
+
+
+def format_quad(op: Op, a: Optional[Operand], b: Optional[Operand], dst: Optional[Operand]) -> str:
+    """Forma textual de una instrucción (la misma para todas las representaciones)."""
+    return _FORMATS[op](op, a, b, dst)
+
 @dataclass
 class Quadruple:
-    op: str
+    op: Op
     a: Optional[Operand] = None
     b: Optional[Operand] = None
     dst: Optional[Operand] = None
 
     def __repr__(self) -> str:
-        if self.op == "label":
-            return f"{self.dst}:"
-        if self.op == "goto":
-            return f"goto {self.dst}"
-        if self.op == "ifgoto":
-            return f"if {self.a} goto {self.dst}"
-        if self.op == "param":
-            return f"param {self.a}"
-        if self.op == "call":
-            return f"call {self.a}, nargs={self.b} -> {self.dst}"
-        if self.op == "ret":
-            return f"ret {self.a}"
-        if self.op == "print":
-            return f"print {self.a}"
-        if self.op == ":=":
-            return f"{self.dst} := {self.a}"
-        return f"{self.op} {self.a}, {self.b} -> {self.dst}"
+        return format_quad(self.op, self.a, self.b, self.dst)
 
 @dataclass
 class TACProgram:
     code: List[Quadruple] = field(default_factory=list)
+    pool: OperandPool = field(default_factory=OperandPool, repr=False, compare=False)
 
-    def emit(self, op: str, a: Optional[Operand] = None, b: Optional[Operand] = None, dst: Optional[Operand] = None) -> Quadruple:
-        q = Quadruple(op, a, b, dst)
+    def __post_init__(self) -> None:
+        # el código recibido puede traer operandos de otro pool o sueltos
+        intern = self._intern
+        for i, q in enumerate(self.code):
+            a, b, dst = intern(q.a), intern(q.b), intern(q.dst)
+            if a is not q.a or b is not q.b or dst is not q.dst:
+                self.code[i] = Quadruple(q.op, a, b, dst)
+
+    def _intern(self, o: Optional[Operand]) -> Optional[Operand]:
+        return o if o is None else self.pool.intern(o)
+
+    def emit(self, op: Op | str, a: Optional[Operand] = None, b: Optional[Operand] = None, dst: Optional[Operand] = None) -> Quadruple:
+        intern = self._intern
+        q = Quadruple(op if type(op) is Op else Op.parse(op), intern(a), intern(b), intern(dst))
         self.code.append(q)
         return q
 
     def label(self, lbl: Label) -> Quadruple:
-        return self.emit("label", dst=lbl)
+        return self.emit(Op.LABEL, dst=lbl)
 
     def __iter__(self):
         return iter(self.code)
@@ -86,4 +243,77 @@ class TACProgram:
         return len(self.code)
 
     def dump(self) -> str:
-        return "\n".join(repr(q) for q in self.code)
\ No newline at end of file
+        return "\n".join(repr(q) for q in self.code)
+
+
+class ColumnarTACProgram:
+    """
+    TACProgram guardado por columnas: cuatro array('i') paralelos (op, a, b,
+    dst) con el Op y los ids de los operandos en self.pool (0 = sin
+    operando). Cada instrucción ocupa 16 bytes y cada operando distinto se
+    guarda una sola vez.
+
+    Misma API que TACProgram (emit/label/__iter__/__len__/dump); emit
+    devuelve el índice de la instrucción. __iter__ y __getitem__ arman
+    Quadruples al vuelo; las pasadas que solo miran opcodes u operandos
+    pueden recorrer columns() sin crear objetos:
+
+        ops, a, b, dst = prog.columns()
+        saltos = [i for i, op in enumerate(ops) if op == Op.GOTO]
+
+    columns() devuelve memoryviews sobre los arrays (sin copiar); mientras
+    haya una viva no se puede emitir (los arrays no pueden crecer).
+    """
+    def __init__(self) -> None:
+        self.ops = array("i")
+        self.a = array("i")
+        self.b = array("i")
+        self.dst = array("i")
+        self.pool = OperandPool()
+        self.operands = self.pool.operands
+
+    def operand_id(self, o: Optional[Operand]) -> int:
+        return self.pool.id(o)
+
+    def emit(self, op: Op | str, a: Optional[Operand] = None, b: Optional[Operand] = None,
+             dst: Optional[Operand] = None) -> int:
+        self.ops.append(op if type(op) is Op else Op.parse(op))
+        self.a.append(self.operand_id(a))
+        self.b.append(self.operand_id(b))
+        self.dst.append(self.operand_id(dst))
+        return len(self.ops) - 1
+
+    def label(self, lbl: Label) -> int:
+        return self.emit(Op.LABEL, dst=lbl)
+
+    def columns(self) -> tuple[memoryview, memoryview, memoryview, memoryview]:
+        return memoryview(self.ops), memoryview(self.a), memoryview(self.b), memoryview(self.dst)
+
+    def __getitem__(self, i: int) -> Quadruple:
+        operands = self.operands
+        return Quadruple(OPS[self.ops[i]], operands[self.a[i]],
+                         operands[self.b[i]], operands[self.dst[i]])
+
+    def __iter__(self) -> Iterator[Quadruple]:
+        operands = self.operands
+        for op, a, b, dst in zip(self.ops, self.a, self.b, self.dst):
+            yield Quadruple(OPS[op], operands[a], operands[b], operands[dst])
+
+    def __len__(self) -> int:
+        return len(self.ops)
+
+    def dump(self) -> str:
+        operands = self.operands
+        return "\n".join(_FORMATS[op](OPS[op], operands[a], operands[b], operands[dst])
+                         for op, a, b, dst in zip(self.ops, self.a, self.b, self.dst))
+
+    @classmethod
+    def from_program(cls, program: TACProgram) -> "ColumnarTACProgram":
+        out = cls()
+        for q in program:
+            out.emit(q.op, q.a, q.b, q.dst)
+        return out
+
+    def to_program(self) -> TACProgram:
+        return TACProgram(list(self), self.pool)
+
@@ -0,0 +1,67 @@
+"""
+Destinos para el TAC emitido por partes.
+
+Con un sink, TACBuilder no guarda el programa entero: acumula el código
+hasta que termina una función de nivel superior (o el programa), recicla
+sus temporales y le entrega ese trozo al sink como un TACProgram. La
+memoria queda acotada por la función más grande.
+
+    TACBuilder(sink=TextSink(f))          # texto de dump(), línea por línea
+    TACBuilder(sink=ProgramSink())        # todo en un TACProgram (como sin sink)
+    TACBuilder(sink=GeneratorSink(gen))   # gen.send(trozo) por cada trozo
+
+La concatenación de los trozos es exactamente el programa que se habría
+emitido sin sink (mismo dump()).
+"""
+from __future__ import annotations
+from typing import Generator, TextIO
+from .tac_ir import TACProgram, ColumnarTACProgram
+
+
+class TACSink:
+    """Recibe los trozos de TAC en orden; close() se llama al final del programa."""
+    def write(self, chunk: TACProgram) -> None:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+class ProgramSink(TACSink):
+    """Junta los trozos en un programa en memoria (por defecto un TACProgram)."""
+    def __init__(self, program: TACProgram | ColumnarTACProgram | None = None) -> None:
+        self.program = program if program is not None else TACProgram()
+
+    def write(self, chunk: TACProgram) -> None:
+        for q in chunk.code:
+            self.program.emit(q.op, q.a, q.b, q.dst)
+
+
+class TextSink(TACSink):
+    """
+    Escribe cada instrucción como la imprime dump(), una por línea: el
+    archivo queda igual a print(programa.dump()).
+    """
+    def __init__(self, fp: TextIO) -> None:
+        self.fp = fp
+
+    def write(self, chunk: TACProgram) -> None:
+        if chunk.code:
+            self.fp.write(chunk.dump())
+            self.fp.write("\n")
+
+    def close(self) -> None:
+        self.fp.flush()
+
+
+class GeneratorSink(TACSink):
+    """Envía cada trozo a un generador consumidor (ya arrancado aquí con next)."""
+    def __init__(self, gen: Generator[None, TACProgram, None]) -> None:
+        self.gen = gen
+        next(gen)
+
+    def write(self, chunk: TACProgram) -> None:
+        self.gen.send(chunk)
+
+    def close(self) -> None:
+        self.gen.close()
@@ -1,25 +1,22 @@
 from __future__ import annotations
-from dataclasses import dataclass, field
-from typing import List
-from .tac_ir import Temp
+from dataclasses import dataclass
+from typing import Optional
+from .tac_ir import Temp, OperandPool
 
 @dataclass
 class TempAllocator:
+    """
+    Crea un temporal nuevo por valor; el reciclaje lo hace después
+    liveness.rename_temps sobre el TAC terminado.
+    """
     prefix: str = "t"
     _counter: int = 0
-    _free_list: List[str] = field(default_factory=list)
+    pool: Optional[OperandPool] = None   # si se da, devuelve las instancias del pool
 
     def new(self) -> Temp:
-        if self._free_list:
-            return Temp(self._free_list.pop())
         name = f"{self.prefix}{self._counter}"
         self._counter += 1
-        return Temp(name)
-
-    def free(self, temp: Temp) -> None:
-        if temp.name not in self._free_list:
-            self._free_list.append(temp.name)
+        return self.pool.temp(name) if self.pool is not None else Temp(name)
 
     def reset(self) -> None:
         self._counter = 0
-        self._free_list.clear()
\ No newline at end of file
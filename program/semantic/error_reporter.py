@@ -1,6 +1,8 @@
 # program/semantic/error_reporter.py
 
-from dataclasses import dataclass
+import json
+from dataclasses import dataclass, asdict
+from typing import Callable, Optional, TextIO
 
 @dataclass
 class SemanticError:
@@ -8,37 +10,95 @@ class SemanticError:
     col: int
     code: str
     msg: str
+    symbol: Optional[str] = None   # nombre involucrado (para colapsar duplicados)
 
     def __str__(self):
         return f"[{self.line}:{self.col}] {self.code}: {self.msg}"
 
 
+class ErrorLimitReached(Exception):
+    """La lanza ErrorReporter al llegar a max_errors; el TypeChecker la atrapa y corta."""
+
+
+def text_sink(fp: TextIO) -> Callable[[SemanticError], None]:
+    """Sink que escribe cada error en una línea de texto (p. ej. sys.stdout)."""
+    def sink(e: SemanticError):
+        fp.write(f"    {e}\n")
+        fp.flush()
+    return sink
+
+
+def jsonl_sink(fp: TextIO) -> Callable[[SemanticError], None]:
+    """Sink que escribe cada error como un objeto JSON por línea."""
+    def sink(e: SemanticError):
+        fp.write(json.dumps(asdict(e), ensure_ascii=False) + "\n")
+    return sink
+
+
 class ErrorReporter:
     """
     Recolector simple de errores semánticos.
     Cada error incluye: línea, columna, código y mensaje.
+
+    Opcionalmente:
+    - sink: se llama con cada error en cuanto se registra (streaming);
+    - keep=False: no guarda la lista (solo cuenta), para usar con un sink;
+    - dedupe: colapsa los errores repetidos con el mismo (código, símbolo);
+    - max_errors: al registrar ese número de errores lanza ErrorLimitReached
+      y el chequeo se detiene.
     """
 
-    def __init__(self):
+    def __init__(self, sink: Callable[[SemanticError], None] | None = None, keep: bool = True,
+                 dedupe: bool = False, max_errors: int | None = None):
         self.errors: list[SemanticError] = []
+        self.sink = sink
+        self.keep = keep
+        self.dedupe = dedupe
+        self.max_errors = max_errors
+        self.suppressed = 0          # duplicados colapsados
+        self.aborted = False         # se alcanzó max_errors
+        self._count = 0
+        self._seen: set[tuple[str, str]] = set()
 
-    def report(self, line: int, col: int, code: str, msg: str):
+    def report(self, line: int, col: int, code: str, msg: str, symbol: str | None = None):
         """
         Registra un error con su posición, código y mensaje.
         """
-        self.errors.append(SemanticError(line, col, code, msg))
+        self.add(SemanticError(line, col, code, msg, symbol))
+
+    def add(self, e: SemanticError):
+        """Registra un SemanticError ya construido (p. ej. uno reutilizado)."""
+        if self.aborted:
+            raise ErrorLimitReached()
+        if self.dedupe and e.symbol is not None:
+            key = (e.code, e.symbol)
+            if key in self._seen:
+                self.suppressed += 1
+                return
+            self._seen.add(key)
+        self._count += 1
+        if self.keep:
+            self.errors.append(e)
+        if self.sink is not None:
+            self.sink(e)
+        if self.max_errors is not None and self._count >= self.max_errors:
+            self.aborted = True
+            raise ErrorLimitReached()
 
     def has_errors(self) -> bool:
         """True si se registraron errores."""
-        return len(self.errors) > 0
+        return self._count > 0
 
     def count(self) -> int:
         """Número de errores registrados."""
-        return len(self.errors)
+        return self._count
 
     def clear(self):
         """Limpia la lista de errores."""
         self.errors.clear()
+        self._seen.clear()
+        self._count = self.suppressed = 0
+        self.aborted = False
 
     def __iter__(self):
         return iter(self.errors)
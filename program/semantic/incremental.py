@@ -0,0 +1,177 @@
+"""
+Rechequeo incremental por unidad de nivel superior.
+
+Las unidades son las funciones y clases del nivel superior. De cada una se
+guarda entre compilaciones:
+
+- el hash de su texto (desde su inicio hasta la siguiente sentencia de
+  nivel superior) junto con la columna donde empieza;
+- la firma de cada símbolo global que su cuerpo consultó, tal como estaba
+  en la primera consulta (ScopeStack.on_global_read), incluyendo los
+  nombres que no se encontraron;
+- sus errores, las globales que su cuerpo deja inicializadas y, en las
+  clases, los campos y métodos.
+
+En la siguiente compilación, si el hash y todas esas firmas coinciden, no
+se recorre el cuerpo: se reponen sus errores (desplazados si la unidad
+cambió de línea), sus efectos y sus miembros. El resto de sentencias de
+nivel superior y las firmas de las funciones se chequean siempre.
+
+Los cuerpos reutilizados no se vuelven a anotar (IdentifierExpr.addr) y
+no se genera TAC: para eso está el TypeChecker normal.
+"""
+from __future__ import annotations
+import hashlib
+from dataclasses import dataclass, replace
+from itertools import accumulate
+from program.frontend import nodes as N
+from program.semantic.error_reporter import ErrorReporter, SemanticError
+from program.semantic.symbols import VarSymbol, ClassSymbol
+from program.semantic.type_checker import TypeChecker
+
+
+def _signature(sym, table: dict) -> tuple | None:
+    """
+    Lo que un cuerpo puede observar de un símbolo global. De una clase, sus
+    miembros y los de toda su cadena de bases (resueltas en 'table'): un
+    acceso obj.x consulta el layout aplanado.
+    """
+    if sym is None:
+        return None
+    if isinstance(sym, ClassSymbol):
+        chain, seen = [], set()
+        while isinstance(sym, ClassSymbol) and sym.name not in seen:
+            seen.add(sym.name)
+            chain.append((sym.name, sym.base,
+                          tuple((n, f.type, f.is_const) for n, f in sym.fields.items()),
+                          tuple((n, m.type) for n, m in sym.methods.items())))
+            sym = table.get(sym.base) if sym.base else None
+        return ("class", tuple(chain))
+    if isinstance(sym, VarSymbol):
+        return (sym.category, sym.type, sym.is_initialized)
+    return (sym.category, sym.type)
+
+
+@dataclass
+class _Unit:
+    digest: bytes
+    line: int                       # línea de inicio cuando se guardaron los errores
+    deps: dict[str, tuple | None]   # nombre global -> firma en la primera consulta
+    errors: list[SemanticError]
+    effects: tuple[str, ...]        # globales que el cuerpo deja inicializadas
+    members: tuple | None = None    # (fields, methods) si es una clase
+
+
+class _IncrementalPass(TypeChecker):
+    def __init__(self, reporter: ErrorReporter, source: str, cache: dict):
+        super().__init__(reporter)
+        self._source = source
+        self._line_starts = [0, *accumulate(len(l) + 1 for l in source.split("\n"))]
+        self._cache = cache
+        self.units: dict[tuple, _Unit] = {}
+        self.rechecked: list[str] = []
+
+    def _program_body(self, node: N.Program):
+        body = node.body
+        seen: dict[tuple, int] = {}
+        for i, stmt in enumerate(body):
+            if isinstance(stmt, (N.FunctionDeclaration, N.ClassDeclaration)):
+                end = self._offset(body[i + 1]) if i + 1 < len(body) else len(self._source)
+                key = (type(stmt).__name__, stmt.name)
+                seen[key] = seen.get(key, -1) + 1
+                self._unit(stmt, key + (seen[key],), self._source[self._offset(stmt):end])
+            else:
+                self.visit(stmt)
+
+    def _offset(self, node) -> int:
+        return self._line_starts[node.line - 1] + node.col
+
+    def _unit(self, node, key: tuple, text: str) -> None:
+        is_class = isinstance(node, N.ClassDeclaration)
+        sym = self._declare_class(node) if is_class else self._declare_function(node)
+        digest = hashlib.blake2b(f"{node.col}:{text}".encode(), digest_size=16).digest()
+
+        unit = self._cache.get(key)
+        if unit is not None and unit.digest == digest and self._deps_hold(unit.deps):
+            self._replay(unit, node, sym)
+        else:
+            if is_class:
+                unit = self._record(node, digest, lambda: self._check_class_body(node, sym))
+                unit.members = (sym.fields, sym.methods)
+            else:
+                unit = self._record(node, digest, lambda: self._check_function_body(node, sym))
+            self.rechecked.append(node.name)
+        self.units[key] = unit
+
+    def _deps_hold(self, deps: dict) -> bool:
+        table = self.scopes.stack[0].symbols
+        return all(_signature(table.get(name), table) == sig for name, sig in deps.items())
+
+    def _record(self, node, digest: bytes, check) -> _Unit:
+        deps: dict[str, tuple | None] = {}
+        table = self.scopes.stack[0].symbols
+
+        def read(name, sym):
+            if name != node.name and name not in deps:
+                deps[name] = _signature(sym, table)
+
+        # Los errores del cuerpo se juntan aparte para guardarlos completos
+        # (sin colapsar duplicados) y luego pasan al reporter real
+        reporter, self.reporter = self.reporter, ErrorReporter()
+        self.scopes.on_global_read = read
+        try:
+            check()
+        finally:
+            self.scopes.on_global_read = None
+            errors, self.reporter = self.reporter.errors, reporter
+
+        effects = tuple(
+            name for name, sig in deps.items()
+            if isinstance(table.get(name), VarSymbol) and _signature(table[name], table) != sig
+        )
+        for e in errors:
+            reporter.add(e)
+        return _Unit(digest, node.line, deps, errors, effects)
+
+    def _replay(self, unit: _Unit, node, sym) -> None:
+        delta = node.line - unit.line
+        if delta:
+            # los errores sin posición (línea 0) no se desplazan
+            unit.errors = [replace(e, line=e.line + delta) if e.line else e for e in unit.errors]
+            unit.line = node.line
+        for e in unit.errors:
+            self.reporter.add(e)
+
+        table = self.scopes.stack[0].symbols
+        for name in unit.effects:
+            table[name].is_initialized = True
+        if unit.members is not None:
+            sym.fields, sym.methods = unit.members
+            self._class_layout(sym)
+
+
+class IncrementalChecker:
+    """
+    Chequeo de tipos que reutiliza, de una compilación a la siguiente, los
+    cuerpos de funciones y clases de nivel superior que no cambiaron.
+
+        inc = IncrementalChecker()
+        checker = inc.check(program, source, reporter)   # todo
+        checker = inc.check(program2, source2, reporter2)  # solo lo que cambió
+
+    'program' es el AST de 'source' (frontend.lowering). Devuelve el
+    TypeChecker con los scopes resultantes.
+    """
+    def __init__(self):
+        self._cache: dict[tuple, _Unit] = {}
+        self.last_rechecked: list[str] = []   # unidades recorridas en el último check
+
+    def check(self, program: N.Program, source: str, reporter: ErrorReporter) -> TypeChecker:
+        checker = _IncrementalPass(reporter, source, self._cache)
+        checker.visit(program)
+        self._cache = checker.units
+        self.last_rechecked = checker.rechecked
+        return checker
+
+    def clear(self) -> None:
+        self._cache.clear()
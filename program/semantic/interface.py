@@ -0,0 +1,189 @@
+"""
+Archivos de interfaz (.cpsi): el scope global de un programa ya chequeado,
+serializado para cargarlo en otra compilación sin volver a analizar el
+fuente.
+
+Formato:
+    MAGIC (4 bytes) | versión del formato, del compilador y de marshal
+    (struct '<HHB') | sha256 del fuente (32 bytes) | payload (marshal)
+
+El payload es (tipos, símbolos) con datos planos: cada tipo distinto se
+guarda una sola vez y los símbolos lo referencian por índice; al cargar,
+los tipos se reconstruyen por la metaclase de internado, así quedan
+idénticos (is) a los del resto de la compilación.
+
+Subir COMPILER_VERSION cuando cambie lo que el TypeChecker deja en los
+símbolos: las interfaces viejas se consideran vencidas.
+"""
+from __future__ import annotations
+import hashlib
+import marshal
+import os
+import struct
+from program.semantic.scopes import Scope
+from program.semantic.symbols import Symbol, VarSymbol, ParamSymbol, FuncSymbol, ClassSymbol
+from program.semantic.typesys import Type, ArrayType, FunctionType, ClassType
+
+MAGIC = b"CPSI"
+FORMAT_VERSION = 1
+COMPILER_VERSION = 1
+_HEADER = struct.Struct("<4sHHB32s")
+
+# etiquetas del payload
+_T_NAMED, _T_ARRAY, _T_FN, _T_CLASS = range(4)
+_S_VAR, _S_FUNC, _S_CLASS = range(3)
+
+
+class StaleInterface(Exception):
+    """La interfaz no sirve: otro fuente, otra versión o archivo dañado."""
+
+
+def source_digest(source: str) -> bytes:
+    return hashlib.sha256(source.encode("utf-8")).digest()
+
+
+# ---------- escritura ----------
+
+class _Encoder:
+    def __init__(self):
+        self.types: list[tuple] = []
+        self._index: dict[int, int] = {}   # id(tipo) -> índice (los tipos están internados)
+
+    def type(self, t: Type | None) -> int:
+        if t is None:
+            return -1
+        i = self._index.get(id(t))
+        if i is not None:
+            return i
+        if isinstance(t, ArrayType):
+            entry = (_T_ARRAY, t.name, self.type(t.elem), t.dims)
+        elif isinstance(t, FunctionType):
+            entry = (_T_FN, t.name, tuple(self.type(p) for p in t.params), self.type(t.ret))
+        elif isinstance(t, ClassType):
+            entry = (_T_CLASS, t.name)
+        else:
+            entry = (_T_NAMED, t.name)
+        i = self._index[id(t)] = len(self.types)
+        self.types.append(entry)
+        return i
+
+    def var(self, s: VarSymbol) -> tuple:
+        return (_S_VAR, s.name, self.type(s.type), s.is_const, s.is_initialized, s.line, s.col)
+
+    def func(self, s: FuncSymbol) -> tuple:
+        params = tuple((p.name, self.type(p.type), p.line, p.col) for p in s.params)
+        nested = tuple(self.func(n) for n in getattr(s, "nested", {}).values())
+        return (_S_FUNC, s.name, self.type(s.type), params, nested, s.line, s.col)
+
+    def symbol(self, s: Symbol) -> tuple:
+        if isinstance(s, ClassSymbol):
+            return (_S_CLASS, s.name, self.type(s.type), s.base,
+                    tuple(self.var(f) for f in s.fields.values()),
+                    tuple(self.func(m) for m in s.methods.values()), s.line, s.col)
+        if isinstance(s, FuncSymbol):
+            return self.func(s)
+        return self.var(s)
+
+
+def dump_interface(scope: Scope, source: str, skip: int = 0) -> bytes:
+    """
+    Serializa los símbolos de 'scope' (el global) del programa 'source'.
+    Los primeros 'skip' slots (los instalados de bibliotecas) no son del
+    programa y no se guardan.
+    """
+    enc = _Encoder()
+    symbols = tuple(enc.symbol(s) for s in scope.slots[skip:])
+    header = _HEADER.pack(MAGIC, FORMAT_VERSION, COMPILER_VERSION, marshal.version,
+                          source_digest(source))
+    return header + marshal.dumps((tuple(enc.types), symbols))
+
+
+def write_interface(path: str, scope: Scope, source: str, skip: int = 0) -> None:
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(dump_interface(scope, source, skip))
+    os.replace(tmp, path)
+
+
+# ---------- lectura ----------
+
+def _decode_types(entries) -> list[Type]:
+    types: list[Type] = []
+    for e in entries:   # cada tipo solo referencia tipos anteriores
+        tag = e[0]
+        if tag == _T_ARRAY:
+            t = ArrayType(name=e[1], elem=types[e[2]] if e[2] >= 0 else None, dims=e[3])
+        elif tag == _T_FN:
+            t = FunctionType(name=e[1], params=tuple(types[i] for i in e[2]), ret=types[e[3]])
+        elif tag == _T_CLASS:
+            t = ClassType(e[1])
+        else:
+            t = Type(e[1])
+        types.append(t)
+    return types
+
+
+def _decode_var(e, types) -> VarSymbol:
+    _, name, t, is_const, is_init, line, col = e
+    return VarSymbol(name, types[t], is_const=is_const, is_initialized=is_init, line=line, col=col)
+
+
+def _decode_func(e, types) -> FuncSymbol:
+    _, name, t, params, nested, line, col = e
+    sym = FuncSymbol(name, types[t],
+                     params=[ParamSymbol(pn, types[pt], i, line=pl, col=pc)
+                             for i, (pn, pt, pl, pc) in enumerate(params)],
+                     line=line, col=col)
+    if nested:
+        sym.nested = {n[1]: _decode_func(n, types) for n in nested}
+    return sym
+
+
+def load_interface(data: bytes, source: str | None = None) -> list[Symbol]:
+    """
+    Símbolos globales guardados en 'data'. Si se pasa el fuente, verifica
+    que sea el mismo con el que se generó. Lanza StaleInterface si no sirve.
+    """
+    if len(data) < _HEADER.size:
+        raise StaleInterface("archivo de interfaz truncado")
+    magic, fmt, compiler, marshal_v, digest = _HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise StaleInterface("no es un archivo de interfaz")
+    if (fmt, compiler, marshal_v) != (FORMAT_VERSION, COMPILER_VERSION, marshal.version):
+        raise StaleInterface("interfaz generada por otra versión del compilador")
+    if source is not None and digest != source_digest(source):
+        raise StaleInterface("el fuente cambió desde que se generó la interfaz")
+    try:
+        type_entries, entries = marshal.loads(data[_HEADER.size:])
+    except (EOFError, ValueError, TypeError) as exc:
+        raise StaleInterface(f"interfaz dañada: {exc}") from None
+
+    types = _decode_types(type_entries)
+    symbols: list[Symbol] = []
+    for e in entries:
+        if e[0] == _S_CLASS:
+            _, name, t, base, fields, methods, line, col = e
+            csym = ClassSymbol(name, types[t], line=line, col=col)
+            csym.base = base
+            csym.fields = {f[1]: _decode_var(f, types) for f in fields}
+            csym.methods = {m[1]: _decode_func(m, types) for m in methods}
+            symbols.append(csym)
+        elif e[0] == _S_FUNC:
+            symbols.append(_decode_func(e, types))
+        else:
+            symbols.append(_decode_var(e, types))
+    return symbols
+
+
+def read_interface(path: str, source: str | None = None) -> list[Symbol]:
+    with open(path, "rb") as f:
+        return load_interface(f.read(), source)
+
+
+def install(checker, symbols: list[Symbol]) -> None:
+    """Define 'symbols' en el scope global del checker, antes de visitar el programa."""
+    g = checker.scopes.stack[0]
+    for sym in symbols:
+        if isinstance(sym, FuncSymbol):
+            sym.closure_scope = g
+        checker.define_symbol(sym)
@@ -0,0 +1,67 @@
+"""
+Layout aplanado de clases: campos y métodos propios + heredados.
+
+Los campos heredados conservan el offset que tienen en la base y los
+propios se agregan al final; cada método ocupa un slot (tipo vtable) y una
+redefinición reutiliza el slot del método de la base. Así los offsets y
+slots son estables a lo largo de la jerarquía y sirven para operandos
+Addr(obj, offset) en el IR.
+"""
+from __future__ import annotations
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+from program.semantic.symbols import Symbol, VarSymbol, FuncSymbol, ClassSymbol
+
+WORD_SIZE = 4   # bytes por campo
+
+
+@dataclass
+class ClassLayout:
+    fields: Dict[str, VarSymbol] = field(default_factory=dict)
+    offsets: Dict[str, int] = field(default_factory=dict)        # campo -> offset en bytes
+    methods: Dict[str, FuncSymbol] = field(default_factory=dict)
+    method_slots: Dict[str, int] = field(default_factory=dict)   # método -> índice en vtable
+    vtable: List[FuncSymbol] = field(default_factory=list)
+    members: Dict[str, Symbol] = field(default_factory=dict)     # campos y métodos (como en un acceso obj.x)
+    size: int = 0
+    # Nombre de una base (directa o indirecta) que no se pudo resolver al construirlo
+    missing_base: Optional[str] = None
+
+    def field_offset(self, name: str) -> Optional[int]:
+        return self.offsets.get(name)
+
+    def method_slot(self, name: str) -> Optional[int]:
+        return self.method_slots.get(name)
+
+
+def build_layout(csym: ClassSymbol, base: Optional[ClassLayout] = None,
+                 missing_base: Optional[str] = None) -> ClassLayout:
+    """Layout de 'csym' sobre el de su base (None si no tiene o no se resolvió)."""
+    lay = ClassLayout(missing_base=missing_base)
+    if base is not None:
+        lay.fields.update(base.fields)
+        lay.offsets.update(base.offsets)
+        lay.methods.update(base.methods)
+        lay.method_slots.update(base.method_slots)
+        lay.vtable.extend(base.vtable)
+        lay.members.update(base.members)
+        lay.size = base.size
+        lay.missing_base = lay.missing_base or base.missing_base
+
+    for name, m in csym.methods.items():
+        slot = lay.method_slots.get(name)
+        if slot is None:
+            lay.method_slots[name] = len(lay.vtable)
+            lay.vtable.append(m)
+        else:
+            lay.vtable[slot] = m          # redefinición: mismo slot
+        lay.methods[name] = m
+        lay.members[name] = m
+
+    for name, f in csym.fields.items():
+        if name not in lay.offsets:
+            lay.offsets[name] = lay.size
+            lay.size += WORD_SIZE
+        lay.fields[name] = f
+        lay.members[name] = f             # en la misma clase un campo tapa a un método
+    return lay
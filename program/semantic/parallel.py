@@ -0,0 +1,174 @@
+"""
+Chequeo de tipos en paralelo por función.
+
+1. Pasada de declaraciones (proceso principal): recorre las sentencias de
+   nivel superior con el TypeChecker normal, salvo que de cada función de
+   nivel superior solo declara la firma. Por cada una anota cuántos
+   símbolos globales eran visibles, cuáles variables globales seguían sin
+   inicializar y en qué posición de la lista de errores irían los de su
+   cuerpo.
+2. Los cuerpos se chequean en un ProcessPoolExecutor. Cada worker recibe
+   una sola vez los símbolos globales (initializer) y reconstruye para
+   cada cuerpo el entorno que habría visto el chequeo secuencial.
+3. Los SemanticError de cada cuerpo se intercalan en su posición, así la
+   lista queda en el mismo orden que con el chequeo secuencial.
+
+Si un cuerpo inicializa una variable global que estaba sin inicializar,
+el resultado del resto del programa depende de ese efecto y se vuelve a
+chequear todo en secuencia, de modo que el resultado es siempre idéntico.
+"""
+from __future__ import annotations
+import copy
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from program.frontend import nodes as N
+from program.frontend.lowering import lower_program
+from program.semantic.error_reporter import ErrorReporter, ErrorLimitReached
+from program.semantic.symbols import VarSymbol, FuncSymbol, ClassSymbol
+from program.semantic.type_checker import TypeChecker
+
+
+@dataclass
+class _BodyJob:
+    node: N.FunctionDeclaration
+    func_sym: FuncSymbol
+    visible: int            # símbolos globales visibles (prefijo de global.slots)
+    uninit: tuple           # slots de variables globales sin inicializar en ese punto
+    error_pos: int          # posición de sus errores entre los de la pasada de declaraciones
+
+
+class _DeclarationPass(TypeChecker):
+    """TypeChecker que deja pendientes los cuerpos de las funciones de nivel superior."""
+    def __init__(self, reporter: ErrorReporter):
+        super().__init__(reporter)
+        self.program: N.Program | None = None
+        self.jobs: list[_BodyJob] = []
+        self._pending: list[VarSymbol] = []
+        self._seen = 0
+
+    def visitProgram(self, node: N.Program):
+        if not isinstance(node, N.Program):
+            node = lower_program(node)   # árbol de ANTLR -> AST
+        self.program = node
+        return super().visitProgram(node)
+
+    def _program_body(self, node: N.Program):
+        for stmt in node.body:
+            if isinstance(stmt, N.FunctionDeclaration):
+                func_sym = self._declare_function(stmt)
+                self.jobs.append(_BodyJob(stmt, func_sym, len(self.scopes.stack[0].slots),
+                                          self._uninitialized(), self.reporter.count()))
+            else:
+                self.visit(stmt)
+
+    def _uninitialized(self) -> tuple:
+        g = self.scopes.stack[0]
+        for sym in g.slots[self._seen:]:
+            if isinstance(sym, VarSymbol) and not sym.is_initialized:
+                self._pending.append(sym)
+        self._seen = len(g.slots)
+        self._pending = [s for s in self._pending if not s.is_initialized]
+        return tuple(s.slot for s in self._pending)
+
+
+def _portable(sym):
+    """Copia del símbolo que se puede mandar a un worker (sin scopes ni layouts)."""
+    if isinstance(sym, FuncSymbol) and sym.closure_scope is not None:
+        sym = copy.copy(sym)
+        sym.closure_scope = None
+    elif isinstance(sym, ClassSymbol) and sym.layout is not None:
+        sym = copy.copy(sym)
+        sym.layout = None
+    return sym
+
+
+# ---------- lado del worker ----------
+
+_ENV: list = []                  # símbolos globales (copias del worker)
+_checker: TypeChecker | None = None
+_defined = 0                     # cuántos de _ENV están definidos en el global de _checker
+_prev_uninit: tuple = ()
+
+
+def _init_worker(env: list) -> None:
+    global _ENV, _checker, _defined, _prev_uninit
+    _ENV, _checker, _defined, _prev_uninit = env, None, 0, ()
+
+
+def _check_body(payload):
+    """Chequea un cuerpo; devuelve (errores, cuerpo anotado, ¿inicializó una global?)."""
+    global _checker, _defined, _prev_uninit
+    node, func_sym, visible, uninit = payload
+
+    if _checker is None or _defined > visible:
+        # Los jobs llegan en orden de fuente; solo se reconstruye si se retrocede
+        _checker, _defined = TypeChecker(ErrorReporter()), 0
+        for sym in _ENV:
+            if isinstance(sym, ClassSymbol):
+                sym.layout = None
+    g = _checker.scopes.stack[0]
+    for sym in _ENV[_defined:visible]:
+        if isinstance(sym, FuncSymbol):
+            sym.closure_scope = g
+        _checker.scopes.define(sym, g)
+    _defined = visible
+
+    # Estado de inicialización de las globales en el punto de la declaración
+    for slot in _prev_uninit:
+        _ENV[slot].is_initialized = True
+    for slot in uninit:
+        _ENV[slot].is_initialized = False
+    _prev_uninit = uninit
+
+    reporter = ErrorReporter()
+    _checker.reporter = reporter
+    func_sym.closure_scope = g
+    _checker._check_function_body(node, func_sym)
+    initialized_global = any(_ENV[slot].is_initialized for slot in uninit)
+    return reporter.errors, node.body, initialized_global
+
+
+# ---------- proceso principal ----------
+
+def check_program_parallel(tree, reporter: ErrorReporter, workers: int) -> TypeChecker:
+    """
+    Chequea el programa (AST o árbol de ANTLR) repartiendo los cuerpos de
+    las funciones de nivel superior entre 'workers' procesos. Devuelve el
+    TypeChecker con los scopes resultantes, como si se hubiera llamado
+    TypeChecker(reporter).visit(tree).
+    """
+    # La pasada de declaraciones junta sus errores aparte: al 'reporter' (que
+    # puede tener sink, dedupe o límite) llegan ya intercalados y en orden.
+    decl = _DeclarationPass(ErrorReporter())
+    decl.visit(tree)
+    jobs = decl.jobs
+
+    results = []
+    if jobs:
+        env = [_portable(s) for s in decl.scopes.stack[0].slots]
+        payloads = [(j.node, _portable(j.func_sym), j.visible, j.uninit) for j in jobs]
+        chunksize = max(1, len(payloads) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(env,)) as pool:
+            results = list(pool.map(_check_body, payloads, chunksize=chunksize))
+
+    if any(initialized for _, _, initialized in results):
+        checker = TypeChecker(reporter)
+        checker.visit(decl.program)
+        return checker
+
+    merged, prev = [], 0
+    own = decl.reporter.errors
+    for job, (errors, body, _) in zip(jobs, results):
+        merged.extend(own[prev:job.error_pos])
+        merged.extend(errors)
+        prev = job.error_pos
+        job.node.body = body      # cuerpo con las direcciones (addr) que anotó el worker
+    merged.extend(own[prev:])
+
+    decl.reporter = reporter
+    try:
+        for e in merged:
+            reporter.add(e)
+    except ErrorLimitReached:
+        pass
+    return decl
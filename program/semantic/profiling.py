@@ -0,0 +1,104 @@
+"""
+Perfilado opcional del TypeChecker por método visitor.
+
+VisitorProfile.attach(checker) tapa cada visit* del checker con un atributo
+de instancia que mide llamadas, tiempo acumulado y tiempo propio (sin los
+visitors anidados), y envuelve ScopeStack.lookup para contar búsquedas y
+los pasos que habría dado una búsqueda por la cadena de padres.
+
+Sin attach() el checker no cambia: el despacho (Node.accept -> getattr)
+llega directo a los métodos de la clase. detach() quita los envoltorios.
+"""
+from __future__ import annotations
+import json
+import time
+
+
+class VisitorProfile:
+    def __init__(self):
+        # nombre -> [llamadas, tiempo acumulado, tiempo propio, recursión activa]
+        self.stats: dict[str, list] = {}
+        self.lookups = 0        # llamadas a ScopeStack.lookup (incluye resolve)
+        self.lookup_misses = 0  # nombres no encontrados
+        self.chain_steps = 0    # scopes que recorrería Scope.resolve hasta encontrarlo
+        self._children: list[float] = []   # tiempo de los hijos del visitor en curso
+        self._attached: list[tuple[object, str]] = []
+
+    # ---------- instalación ----------
+
+    def attach(self, checker) -> None:
+        for name in dir(type(checker)):
+            if name.startswith("visit") and name != "visit" and callable(getattr(checker, name)):
+                setattr(checker, name, self._timed(name, getattr(checker, name)))
+                self._attached.append((checker, name))
+        checker._dispatch.clear()
+        scopes = checker.scopes
+        scopes.lookup = self._counted_lookup(scopes, scopes.lookup)
+        self._attached.append((scopes, "lookup"))
+
+    def detach(self) -> None:
+        for obj, name in self._attached:
+            delattr(obj, name)
+            if name != "lookup":
+                obj._dispatch.clear()
+        self._attached.clear()
+
+    def _timed(self, name: str, fn):
+        stats = self.stats.setdefault(name, [0, 0.0, 0.0, 0])
+        children = self._children
+        clock = time.perf_counter
+
+        def timed(*args):
+            stats[3] += 1
+            children.append(0.0)
+            t0 = clock()
+            try:
+                return fn(*args)
+            finally:
+                dt = clock() - t0
+                stats[3] -= 1
+                stats[0] += 1
+                stats[2] += dt - children.pop()
+                if not stats[3]:
+                    stats[1] += dt   # en recursión solo cuenta la llamada externa
+                if children:
+                    children[-1] += dt
+        return timed
+
+    def _counted_lookup(self, scopes, fn):
+        def lookup(name):
+            found = fn(name)
+            self.lookups += 1
+            if found is None:
+                self.lookup_misses += 1
+                self.chain_steps += len(scopes.stack)
+            else:
+                self.chain_steps += len(scopes.stack) - found[1][0]
+            return found
+        return lookup
+
+    # ---------- reporte ----------
+
+    def rows(self) -> list[dict]:
+        """Filas por visitor, de mayor a menor tiempo propio."""
+        rows = [
+            {"visitor": name, "calls": s[0], "cum_ms": s[1] * 1000, "self_ms": s[2] * 1000}
+            for name, s in self.stats.items() if s[0]
+        ]
+        rows.sort(key=lambda r: r["self_ms"], reverse=True)
+        return rows
+
+    def to_json(self) -> str:
+        return json.dumps({
+            "visitors": self.rows(),
+            "lookups": {"calls": self.lookups, "misses": self.lookup_misses,
+                        "chain_steps": self.chain_steps},
+        }, indent=2)
+
+    def table(self) -> str:
+        lines = [f"{'visitor':<28}{'llamadas':>10}{'acum (ms)':>12}{'propio (ms)':>13}"]
+        for r in self.rows():
+            lines.append(f"{r['visitor']:<28}{r['calls']:>10}{r['cum_ms']:>12.3f}{r['self_ms']:>13.3f}")
+        lines.append(f"búsquedas: {self.lookups}  no encontradas: {self.lookup_misses}  "
+                     f"pasos por la cadena de scopes: {self.chain_steps}")
+        return "\n".join(lines)
@@ -1,25 +1,40 @@
 from __future__ import annotations
+from bisect import insort
 from dataclasses import dataclass, field
-from typing import Dict, Optional, Iterable
+from typing import Callable, Dict, List, Optional, Iterable, Tuple
 from program.semantic.symbols import Symbol
 
+# Dirección de un símbolo visible: (profundidad del scope en la pila, slot)
+Address = Tuple[int, int]
+
 @dataclass
 class Scope:
-    """Ámbito semántico: mantiene un mapa nombre->símbolo y referencia al padre."""
+    """
+    Ámbito semántico: mantiene un mapa nombre->símbolo y referencia al padre.
+    El padre se fija al crearlo y no se reasigna: la cadena de un scope
+    capturado por una closure (FuncSymbol.closure_scope) no cambia después,
+    así que se puede compartir entre chequeos, cachés o procesos.
+    Además guarda los símbolos en orden de declaración (slots): el símbolo
+    definido en i-ésimo lugar queda en slots[i] y sym.slot == i.
+    """
     kind: str  # 'global' | 'class' | 'function' | 'block'
     parent: Optional['Scope'] = None
     symbols: Dict[str, Symbol] = field(default_factory=dict)
     owner: Symbol | None = None   
-
+    slots: List[Symbol] = field(default_factory=list)
 
     def define(self, sym: Symbol) -> bool:
         """
         Intenta registrar 'sym' en este scope.
         Retorna False si el nombre ya existe en ESTE scope (redeclaración).
+        Si el scope está apilado, definir por ScopeStack.define para que la
+        pila lo vea.
         """
         if sym.name in self.symbols:
             return False
         self.symbols[sym.name] = sym
+        sym.slot = len(self.slots)
+        self.slots.append(sym)
         return True
 
     def resolve(self, name: str) -> Optional[Symbol]:
@@ -67,9 +82,80 @@ class ClassScope(Scope):
 class ScopeStack:
     """
     Pila de scopes para usar desde el TypeChecker.
+
+    Mantiene una tabla nombre -> [(profundidad, símbolo), ...] con los
+    símbolos visibles ordenados por profundidad, así resolve()/lookup()
+    cuestan un acceso a diccionario sin importar cuántos scopes haya
+    apilados. La tabla se actualiza al apilar/desapilar y al definir por
+    define(). La profundidad de cada scope apilado se guarda aquí y no en el
+    Scope: un scope capturado puede estar a la vez en varias pilas (un
+    scope va una sola vez en cada pila).
     """
     def __init__(self, root: Optional[Scope] = None):
-        self.stack: list[Scope] = [root] if root else []
+        self.stack: list[Scope] = []
+        self._visible: Dict[str, List[Tuple[int, Symbol]]] = {}
+        self._depths: Dict[int, int] = {}   # id(scope) -> profundidad en esta pila
+        # Si no es None, se llama como on_global_read(name, sym) en cada
+        # búsqueda que cae en el scope global o no encuentra nada (sym=None)
+        self.on_global_read: Optional[Callable[[str, Optional[Symbol]], None]] = None
+        if root:
+            self._enter(root)
+
+    def _enter(self, scope: Scope) -> None:
+        if id(scope) in self._depths:
+            raise RuntimeError(f"El scope {scope.kind} ya está apilado.")
+        depth = len(self.stack)
+        self.stack.append(scope)
+        self._depths[id(scope)] = depth
+        for sym in scope.slots:
+            self._bind(depth, sym)
+
+    def _bind(self, depth: int, sym: Symbol) -> None:
+        entries = self._visible.setdefault(sym.name, [])
+        if not entries or entries[-1][0] <= depth:
+            entries.append((depth, sym))
+        else:
+            insort(entries, (depth, sym), key=lambda e: e[0])
+
+    def _unbind(self, depth: int, name: str) -> None:
+        entries = self._visible[name]
+        for i in range(len(entries) - 1, -1, -1):
+            if entries[i][0] == depth:
+                del entries[i]
+                break
+        if not entries:
+            del self._visible[name]
+
+    def lookup(self, name: str) -> Optional[tuple[Symbol, Address]]:
+        """Símbolo visible más interno para 'name' y su dirección (profundidad, slot)."""
+        entries = self._visible.get(name)
+        if not entries:
+            if self.on_global_read is not None:
+                self.on_global_read(name, None)
+            return None
+        depth, sym = entries[-1]
+        if depth == 0 and self.on_global_read is not None:
+            self.on_global_read(name, sym)
+        return sym, (depth, sym.slot)
+
+    def resolve(self, name: str) -> Optional[Symbol]:
+        found = self.lookup(name)
+        return found[0] if found else None
+
+    def at(self, addr: Address) -> Symbol:
+        """Símbolo en una dirección devuelta por lookup()."""
+        depth, slot = addr
+        return self.stack[depth].slots[slot]
+
+    def define(self, sym: Symbol, scope: Optional[Scope] = None) -> bool:
+        """Define 'sym' en 'scope' (por defecto el actual); si está apilado, queda visible."""
+        scope = self.current if scope is None else scope
+        if not scope.define(sym):
+            return False
+        depth = self._depths.get(id(scope))
+        if depth is not None:
+            self._bind(depth, sym)
+        return True
 
     @property
     def current(self) -> Scope:
@@ -90,43 +176,33 @@ class ScopeStack:
             s = ClassScope(parent, class_name="<anon>")  # type: ignore[arg-type]
         else:
             s = Scope(kind, parent)
-        self.stack.append(s)
+        self._enter(s)
         return s
     
-    def push_child(self, child: Scope) -> Scope:
-        """Permite reutilizar un Scope preconstruido como hijo del actual, evitando ciclos."""
-        # Si ya es el current, no lo dupliques
-        if self.stack and child is self.current:
-            return child
-
-        new_parent = self.current if self.stack else None
-        # Evitar ciclo directo: parent == child
-        if child is new_parent:
-            return child
-
-        child.parent = self.current if self.stack else None
-        self.stack.append(child)
-        return child
-
     def push_function(self, return_type, name: str | None = None) -> FunctionScope:
         # Usa el padre ANTES de apilar para evitar ciclos o mirar al scope equivocado
         parent = self.current if self.stack else None
         fs = FunctionScope(parent, return_type, name)
-        self.stack.append(fs)
-        fs.owner = parent.resolve(name) if (name and parent) else None
+        fs.owner = self.resolve(name) if (name and parent) else None
+        self._enter(fs)
         return fs
 
     def push_class(self, class_name: str) -> ClassScope:
         parent = self.current if self.stack else None
         cs = ClassScope(parent, class_name)
-        self.stack.append(cs)
-        cs.owner = parent.resolve(class_name) if parent else None
+        cs.owner = self.resolve(class_name) if parent else None
+        self._enter(cs)
         return cs
 
     def pop(self) -> Scope:
         if not self.stack:
             raise RuntimeError("Pop en ScopeStack vacío.")
-        return self.stack.pop()
+        depth = len(self.stack) - 1
+        scope = self.stack.pop()
+        for sym in scope.slots:
+            self._unbind(depth, sym.name)
+        del self._depths[id(scope)]
+        return scope
 
     def depth(self) -> int:
         return len(self.stack)
@@ -4,6 +4,8 @@ from typing import Dict, Tuple, Optional, TYPE_CHECKING
 from .typesys import Type, FunctionType
 if TYPE_CHECKING:
     from .scopes import Scope
+    from .layout import ClassLayout
+    from program.ir.tac_ir import Label
 
 @dataclass
 class Symbol:
@@ -12,6 +14,7 @@ class Symbol:
     category: str = "unknown"   # variable, const, param, func, class
     line: int = 0               # línea de declaración
     col: int = 0                # columna de declaración
+    slot: int = -1              # índice en Scope.slots del scope que lo define
 
 @dataclass
 class VarSymbol(Symbol):
@@ -35,16 +38,19 @@ class FuncSymbol(Symbol):
     type: FunctionType
     params: Tuple[ParamSymbol, ...] = field(default_factory=tuple)
     closure_scope: Optional['Scope'] = None
+    label: Optional['Label'] = None   # etiqueta de entrada en el TAC (la fija el TypeChecker)
 
     def __init__(self, name, type, params=(), line=0, col=0, closure_scope=None):
         super().__init__(name, type, category="function", line=line, col=col)
         self.params = tuple(params)
         self.closure_scope = closure_scope
+        self.label = None
 
 @dataclass
 class ClassSymbol(Symbol):
     fields: Dict[str, VarSymbol] = field(default_factory=dict)
     methods: Dict[str, FuncSymbol] = field(default_factory=dict)
     base: str | None = None
+    layout: Optional['ClassLayout'] = None   # lo arma el TypeChecker al cerrar la clase
     def __init__(self, name, type, line=0, col=0):
         super().__init__(name, type, category="class", line=line, col=col)
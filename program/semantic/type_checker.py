@@ -3,174 +3,269 @@ from program.semantic.scopes import GlobalScope, ScopeStack
 from program.semantic.symbols import VarSymbol, FuncSymbol, ClassSymbol, ParamSymbol
 from program.semantic.typesys import (
     Type, INTEGER, STRING, BOOLEAN, VOID, NULL,
-    ArrayType,   
+    ArrayType,
     can_assign, arithmetic_type, logical_type, comparison_type,
-    make_array, plus_type, arith_type, relational_type, equality_type, is_array,
+    make_array, binary_type, is_array,
     element_type,
 )
 
-from program.semantic.error_reporter import ErrorReporter
-from program.CompiscriptVisitor import CompiscriptVisitor
-from program.CompiscriptParser import CompiscriptParser
+from program.semantic.error_reporter import ErrorReporter, ErrorLimitReached
+from program.semantic.layout import ClassLayout, build_layout
+from program.semantic.profiling import VisitorProfile
+from program.frontend import nodes as N
+from program.frontend.lowering import lower_program
+from program.ir.tac_builder import TACBuilder, ExprResult
 from contextlib import contextmanager
 
-class TypeChecker(CompiscriptVisitor):
-    def __init__(self, reporter: ErrorReporter):
+# Resultado de una expresión sin TAC: solo aparece con el programa ya marcado
+# incompleto (builder.unsupported), que no se imprime ni se guarda
+_NO_VALUE = ExprResult(None, is_temp=False)
+
+class TypeChecker(N.NodeVisitor):
+    """
+    Chequeo de tipos sobre el AST compacto (frontend/nodes.py).
+    visit() también acepta el árbol de ANTLR de un programa completo:
+    visitProgram lo baja al AST antes de recorrerlo.
+
+    Si recibe un TACBuilder, genera el TAC en el mismo recorrido (modo
+    fusionado): cada visitor de expresión deja su operando en self._res y
+    los de sentencias llaman a los helpers gen_* del builder, usando los
+    tipos recién calculados (p. ej. '+' con strings -> concat). La emisión
+    se apaga en cuanto el reporter tiene errores. Clases, objetos, arreglos,
+    foreach y try/catch todavía no generan TAC: al encontrarlos se anotan en
+    builder.unsupported y la emisión se detiene (el TAC queda incompleto).
+
+    Con o sin builder se recorre el árbol en el mismo orden: los visitors de
+    sentencias arman callbacks que el builder llama en ese orden, o que se
+    llaman directamente si no se emite.
+    """
+    def __init__(self, reporter: ErrorReporter, builder: TACBuilder | None = None,
+                 profile: VisitorProfile | None = None):
         super().__init__()
         self.reporter = reporter
         self.scopes = ScopeStack()
         self.scopes.push("global")   # GLOBAL AQUI
         self._current_class: str | None = None
+        self._building_layouts: set[str] = set()
+        self._open_classes: list[ClassSymbol] = []   # clases cuya declaración se está recorriendo
+        self.builder = builder
+        self._res: ExprResult | None = None   # operando de la última expresión visitada
+        self._no_emit = 0                      # >0 dentro de construcciones sin TAC
+        if profile is not None:
+            profile.attach(self)   # sin profile el despacho no pasa por envoltorios
+
+    @property
+    def _lowering(self) -> bool:
+        """Se está generando TAC para este punto (aunque ya haya quedado incompleto)."""
+        return (self.builder is not None and not self._no_emit
+                and not self.reporter.has_errors())
+
+    @property
+    def emitting(self) -> bool:
+        return self._lowering and self.builder.complete
+
+    def _unsupported(self, node, what: str) -> None:
+        """'what' no tiene TAC: el programa emitido queda incompleto."""
+        if self._lowering:
+            self.builder.mark_unsupported(node.line, node.col, what)
+
+    def _take(self) -> ExprResult:
+        """Operando de la última expresión visitada (y lo consume)."""
+        res, self._res = self._res, None
+        return res if res is not None else _NO_VALUE
+
+    def _value(self, node) -> tuple[Type, ExprResult]:
+        self._res = None
+        t = self.visit(node) or VOID
+        if self._res is None and self.emitting:
+            # ningún visitor de expresión debe llegar aquí sin operando
+            self._unsupported(node, f"expresión {type(node).__name__}")
+        return t, self._take()
+
+    @contextmanager
+    def _suppress_emit(self):
+        self._no_emit += 1
+        try:
+            yield
+        finally:
+            self._no_emit -= 1
 
     def define_symbol(self, sym):
         if not self.scopes.stack:
             self.scopes.push("global")
-        if not self.scopes.current.define(sym):
+        if not self.scopes.define(sym):
             self.reporter.report(0, 0, "E_REDECL", f"Redeclaración de {sym.name}")
 
-    def resolve_symbol(self, name, line=0, col=0):
+    def resolve_symbol(self, name, line=0, col=0, site=None):
+        """
+        Resuelve 'name' en los scopes visibles. Si se pasa el nodo del uso
+        (site), le deja la dirección (profundidad, slot) del símbolo en
+        site.addr para las fases siguientes.
+        """
         if name in ("integer", "string", "boolean", "void"):
             return None
 
-        sym = self.scopes.current.resolve(name)
-        if sym is None:
-            self.reporter.report(line, col, "E_UNDEF", f"Símbolo no definido: {name}")
+        found = self.scopes.lookup(name)
+        if found is None:
+            self.reporter.report(line, col, "E_UNDEF", f"Símbolo no definido: {name}", symbol=name)
+            return None
+        sym, addr = found
+        if site is not None:
+            site.addr = addr
         return sym
 
-    def visitProgram(self, ctx: CompiscriptParser.ProgramContext):
-        for stmt in ctx.statement():
-            self.visit(stmt)
+    def visitProgram(self, node: N.Program):
+        if not isinstance(node, N.Program):
+            node = lower_program(node)   # árbol de ANTLR -> AST
+        try:
+            self._program_body(node)
+        except ErrorLimitReached:
+            # el reporter llegó a max_errors: se corta el chequeo y se
+            # desapilan los scopes que quedaron abiertos
+            while len(self.scopes.stack) > 1:
+                self.scopes.pop()
+        if self.builder is not None:
+            self.builder.finish()   # recicla temporales y cierra el sink, si hay
         return None
 
-    def visitVariableDeclaration(self, ctx: CompiscriptParser.VariableDeclarationContext):
-        name = ctx.Identifier().getText()
-        vtype = self.visit(ctx.typeAnnotation().type_()) if ctx.typeAnnotation() else VOID
+    def _program_body(self, node: N.Program):
+        for stmt in node.body:
+            self.visit(stmt)
+
+    def visitVariableDeclaration(self, node: N.VariableDeclaration):
+        name = node.name
+        vtype = self.visit(node.type) if node.type else VOID
         sym = VarSymbol(
             name, vtype,
             is_const=False,
             is_initialized=False,
-            line=ctx.start.line,
-            col=ctx.start.column
+            line=node.line,
+            col=node.col
         )
 
-        if ctx.initializer():
-            init_t = self.visit(ctx.initializer().expression()) or VOID
+        if node.init is not None:
+            init_t, init_res = self._value(node.init)
             if not can_assign(vtype, init_t):
-                self.reporter.report(ctx.start.line, ctx.start.column, "E_ASSIGN",
+                self.reporter.report(node.line, node.col, "E_ASSIGN",
                                     f"No se puede asignar {init_t} a {vtype}")
             else:
-                sym.is_initialized = True   
+                sym.is_initialized = True
+                if self.emitting:
+                    self.builder._assign(self.builder.pool.var(name), init_res)
 
         self.define_symbol(sym)
         return None
 
 
-    def visitConstantDeclaration(self, ctx: CompiscriptParser.ConstantDeclarationContext):
-        name = ctx.Identifier().getText()
-        vtype = self.visit(ctx.typeAnnotation().type_()) if ctx.typeAnnotation() else VOID
-        init_t = self.visit(ctx.expression())
+    def visitConstantDeclaration(self, node: N.ConstantDeclaration):
+        name = node.name
+        vtype = self.visit(node.type) if node.type else VOID
+        init_t, init_res = self._value(node.value)
         sym = VarSymbol(
             name, vtype,
             is_const=True,
             is_initialized=True,
-            line=ctx.start.line,
-            col=ctx.start.column
+            line=node.line,
+            col=node.col
         )
 
         if not can_assign(vtype, init_t):
-            self.reporter.report(ctx.start.line, ctx.start.column, "E_ASSIGN",
+            self.reporter.report(node.line, node.col, "E_ASSIGN",
                                 f"No se puede asignar {init_t} a {vtype}")
+        elif self.emitting:
+            self.builder._assign(self.builder.pool.var(name), init_res)
         self.define_symbol(sym)
         return None
 
 
-    def visitAssignment(self, ctx: CompiscriptParser.AssignmentContext):
-        exprs = ctx.expression()
-
+    def visitAssignment(self, node: N.Assignment):
         # asignación de propiedad ->  <expr> '.' Identifier '=' <expr> ';'
-        if isinstance(exprs, list) and len(exprs) == 2:
-            obj_t = self.visit(exprs[0]) or VOID
-            value_t = self.visit(exprs[1]) or VOID
-            prop_name = ctx.Identifier().getText()
+        if node.obj is not None:
+            self._unsupported(node, "asignación a propiedad")
+            obj_t = self.visit(node.obj) or VOID
+            value_t = self.visit(node.value) or VOID
+            prop_name = node.name
 
             # Debe ser un objeto con tipo de clase conocido
             if not isinstance(obj_t, Type):
-                self.reporter.report(ctx.start.line, ctx.start.column, "E_ASSIGN",
+                self.reporter.report(node.line, node.col, "E_ASSIGN",
                                     f"No se puede asignar propiedad '{prop_name}' en {obj_t}")
                 return VOID
 
-            # Resolver la clase y buscar el campo (con herencia)
-            class_sym = self.resolve_symbol(obj_t.name, ctx.start.line, ctx.start.column)
-            while isinstance(class_sym, ClassSymbol):
-                field = class_sym.fields.get(prop_name) if hasattr(class_sym, "fields") else None
+            # Resolver la clase y buscar el campo (con herencia, en el layout aplanado)
+            class_sym = self.resolve_symbol(obj_t.name, node.line, node.col)
+            if isinstance(class_sym, ClassSymbol):
+                field = self._member(class_sym, "fields", prop_name, node)
                 if field:
                     # const field no reasignable
                     if getattr(field, "is_const", False):
-                        self.reporter.report(ctx.start.line, ctx.start.column, "E_CONST",
+                        self.reporter.report(node.line, node.col, "E_CONST",
                                             f"No se puede asignar a la constante de clase '{prop_name}'")
                         return field.type
                     # Verificar asignabilidad
                     if not can_assign(field.type, value_t):
-                        self.reporter.report(ctx.start.line, ctx.start.column, "E_ASSIGN",
+                        self.reporter.report(node.line, node.col, "E_ASSIGN",
                                             f"No se puede asignar {value_t} a campo {field.type}")
                     return field.type
-                # subir a la base si hay herencia
-                if hasattr(class_sym, "base") and class_sym.base:
-                    class_sym = self.resolve_symbol(class_sym.base, ctx.start.line, ctx.start.column)
-                else:
-                    break
 
             # Campo no existe en la jerarquía
-            self.reporter.report(ctx.start.line, ctx.start.column, "E_ASSIGN",
+            self.reporter.report(node.line, node.col, "E_ASSIGN",
                                 f"Campo '{prop_name}' no definido en {obj_t.name}")
             return VOID
 
         # asignación simple ->  Identifier '=' <expr> ';'
         else:
-            name = ctx.Identifier().getText()
-            sym = self.resolve_symbol(name, ctx.start.line, ctx.start.column)
+            name = node.name
+            sym = self.resolve_symbol(name, node.line, node.col, site=node)
             target_t = (sym.type if sym else VOID) or VOID
 
             # const variable no reasignable
             if isinstance(sym, VarSymbol) and sym.is_const:
-                self.reporter.report(ctx.start.line, ctx.start.column, "E_CONST",
+                self.reporter.report(node.line, node.col, "E_CONST",
                                     f"No se puede asignar a la constante '{name}'")
             else:
-                expr_node = exprs[0] if isinstance(exprs, list) else exprs
-                value_t = self.visit(expr_node) or VOID
+                value_t, value_res = self._value(node.value)
 
                 if not can_assign(target_t, value_t):
-                    self.reporter.report(ctx.start.line, ctx.start.column, "E_ASSIGN",
+                    self.reporter.report(node.line, node.col, "E_ASSIGN",
                                         f"No se puede asignar {value_t} a {target_t}")
                 else:
                     # NUEVO: marcar inicializada la variable
                     if isinstance(sym, VarSymbol):
                         sym.is_initialized = True
+                    if self.emitting:
+                        self.builder._assign(self.builder.pool.var(name), value_res)
             return target_t
 
 
-    def visitFunctionDeclaration(self, ctx: CompiscriptParser.FunctionDeclarationContext):
-        name = ctx.Identifier().getText()
-        ret_type = self.visit(ctx.type_()) if ctx.type_() else VOID
+    def visitFunctionDeclaration(self, node: N.FunctionDeclaration):
+        func_sym = self._declare_function(node)
+        self._check_function_body(node, func_sym)
+        return None
+
+    def _declare_function(self, node: N.FunctionDeclaration) -> FuncSymbol:
+        """Firma de la función: la define en el scope actual (sin recorrer el cuerpo)."""
+        name = node.name
+        ret_type = self.visit(node.ret) if node.ret else VOID
 
         params = []
-        if ctx.parameters():
-            for i, p in enumerate(ctx.parameters().parameter()):
-                pname = p.Identifier().getText()
-                ptype = self.visit(p.type_()) if p.type_() else VOID
-                param_sym = ParamSymbol(
-                    pname, ptype, i,
-                    line=p.start.line, col=p.start.column
-                )
-                params.append(param_sym)
+        for i, p in enumerate(node.params):
+            ptype = self.visit(p.type) if p.type else VOID
+            param_sym = ParamSymbol(
+                p.name, ptype, i,
+                line=p.line, col=p.col
+            )
+            params.append(param_sym)
 
         func_type = make_fn([p.type for p in params], ret_type)
         func_sym = FuncSymbol(
             name, type=func_type, params=tuple(params),
-            line=ctx.start.line, col=ctx.start.column,
+            line=node.line, col=node.col,
             closure_scope=self.scopes.current
         )
         self.define_symbol(func_sym)
+        if self.emitting:
+            func_sym.label = self.builder.func_label(name)
 
         parent_scope = self.scopes.current
         if hasattr(parent_scope, "func_name") and parent_scope.func_name:
@@ -179,357 +274,418 @@ class TypeChecker(CompiscriptVisitor):
                 if not hasattr(parent_sym, "nested"):
                     parent_sym.nested = {}
                 parent_sym.nested[name] = func_sym
+        return func_sym
 
+    def _check_function_body(self, node: N.FunctionDeclaration, func_sym: FuncSymbol) -> None:
+        name = node.name
+        ret_type = func_sym.type.ret
         self.scopes.push_function(ret_type, name)
-        for psym in params:
+        for psym in func_sym.params:
             self.define_symbol(psym)
 
+        emit = self.emitting
+        if emit:
+            L_skip = self.builder.gen_func_begin(self._entry(func_sym))
+
         returns = []
         has_terminated = False
         with self._block():
-            for stmt in ctx.block().statement():
+            for stmt in node.body.body:
                 if has_terminated:
                     self.reporter.report(
-                        stmt.start.line, stmt.start.column, "E_DEADCODE",
+                        stmt.line, stmt.col, "E_DEADCODE",
                         "Código muerto: esta instrucción nunca se ejecutará"
                     )
                 r = self.visit(stmt)
-                if stmt.returnStatement():
+                if isinstance(stmt, N.ReturnStatement):
                     returns.append(r or VOID)
                     has_terminated = True
 
         self.scopes.pop()
 
+        if emit:
+            self.builder.gen_func_end(L_skip, needs_ret=not has_terminated)
+
         if not returns and ret_type != VOID:
-            self.reporter.report(ctx.start.line, ctx.start.column, "E_RETURN",
+            self.reporter.report(node.line, node.col, "E_RETURN",
                                 f"Función {name} sin return pero declarada {ret_type}")
 
         for rt in returns:
             if not can_assign(ret_type, rt):
-                self.reporter.report(ctx.start.line, ctx.start.column, "E_RETURN",
+                self.reporter.report(node.line, node.col, "E_RETURN",
                                     f"Return {rt} incompatible con {ret_type}")
 
-        return None
-
-    def visitReturnStatement(self, ctx):
+    def visitReturnStatement(self, node: N.ReturnStatement):
         # Validar que estemos dentro de una función
         if not self.scopes.inside("function"):
-            self.reporter.report(ctx.start.line, ctx.start.column, "E_RETURN", "`return` fuera de una función.")
+            self.reporter.report(node.line, node.col, "E_RETURN", "`return` fuera de una función.")
             # Evaluar expresión para no romper el recorrido
-            if ctx.expression() is not None:
-                self.visit(ctx.expression())
+            if node.value is not None:
+                self.visit(node.value)
             return VOID
 
         # Evaluar el tipo retornado y regresarlo (visitFunctionDeclaration lo recolecta)
         ret_t = VOID
-        if ctx.expression() is not None:
-            ret_t = self.visit(ctx.expression()) or VOID
+        ret_res = None
+        if node.value is not None:
+            ret_t, ret_res = self._value(node.value)
+        if self.emitting:
+            self.builder.gen_stmt_return(ret_res)
         return ret_t
 
-    def visitAdditiveExpr(self, ctx: CompiscriptParser.AdditiveExprContext):
+    def visitAdditiveExpr(self, node: N.AdditiveExpr):
         # patrón: term (('+'|'-') term)*
-        t = self.visit(ctx.multiplicativeExpr(0)) or VOID
-        n = len(ctx.multiplicativeExpr())
-        # operadores están en posiciones impares de getChildren()
-        # o puedes contar: hay n-1 operadores
-        child_i = 1  # primer operador está en child 1
-        for i in range(1, n):
-            op = ctx.getChild(child_i).getText()  # '+' o '-'
-            right_t = self.visit(ctx.multiplicativeExpr(i)) or VOID
-            if op == "+":
-                t2 = plus_type(t, right_t)
-            else:
-                t2 = arith_type(t, right_t)
-            if t2 is None:
-                self.reporter.report(ctx.start.line, ctx.start.column, "E_ARITH",
+        operands = node.operands
+        t, res = self._value(operands[0])
+        for i in range(1, len(operands)):
+            op = node.ops[i - 1]  # '+' o '-'
+            right_t, right_res = self._value(operands[i])
+            t2 = binary_type(op, t, right_t)
+            if isinstance(t2, str):
+                self.reporter.report(node.line, node.col, t2,
                                     f"Operación inválida: {t} {op} {right_t}")
                 return VOID
+            if self.emitting:
+                if t2 == STRING:
+                    res = self.builder.gen_expr_concat(res, right_res)
+                else:
+                    res = self.builder._binop(op, res, right_res)
             t = t2
-            child_i += 2
+        self._res = res
         return t
 
-    def visitMultiplicativeExpr(self, ctx: CompiscriptParser.MultiplicativeExprContext):
+    def visitMultiplicativeExpr(self, node: N.MultiplicativeExpr):
         # patrón: factor (('*'|'/'|'%') factor)*
-        t = self.visit(ctx.unaryExpr(0)) or VOID
-        n = len(ctx.unaryExpr())
-        child_i = 1
-        for i in range(1, n):
-            op = ctx.getChild(child_i).getText()
-            right_t = self.visit(ctx.unaryExpr(i)) or VOID
-            t2 = arith_type(t, right_t)
-            if t2 is None:
-                self.reporter.report(ctx.start.line, ctx.start.column, "E_ARITH",
+        operands = node.operands
+        t, res = self._value(operands[0])
+        for i in range(1, len(operands)):
+            op = node.ops[i - 1]
+            right_t, right_res = self._value(operands[i])
+            t2 = binary_type(op, t, right_t)
+            if isinstance(t2, str):
+                self.reporter.report(node.line, node.col, t2,
                                     f"Operación inválida: {t} {op} {right_t}")
                 return VOID
+            if self.emitting:
+                res = self.builder._binop(op, res, right_res)
             t = t2
-            child_i += 2
+        self._res = res
         return t
 
-    def visitRelationalExpr(self, ctx: CompiscriptParser.RelationalExprContext):
+    def visitRelationalExpr(self, node: N.RelationalExpr):
         # patrón: additive (('<'|'<='|'>'|'>=') additive)*
-        if ctx.additiveExpr():
-            t = self.visit(ctx.additiveExpr(0)) or VOID
-            n = len(ctx.additiveExpr())
-            child_i = 1
-            for i in range(1, n):
-                op = ctx.getChild(child_i).getText()
-                right_t = self.visit(ctx.additiveExpr(i)) or VOID
-                t2 = relational_type(t, right_t)
-                if t2 is None:
-                    self.reporter.report(ctx.start.line, ctx.start.column, "E_REL",
-                                        f"Operación relacional inválida: {t} {op} {right_t}")
-                    return VOID
-                t = t2  # sigue siendo BOOLEAN si llegó aquí
-                child_i += 2
-            return t
-        return VOID
+        operands = node.operands
+        t, res = self._value(operands[0])
+        for i in range(1, len(operands)):
+            op = node.ops[i - 1]
+            right_t, right_res = self._value(operands[i])
+            t2 = binary_type(op, t, right_t)
+            if isinstance(t2, str):
+                self.reporter.report(node.line, node.col, t2,
+                                    f"Operación relacional inválida: {t} {op} {right_t}")
+                return VOID
+            if self.emitting:
+                res = self.builder.gen_expr_rel(op, res, right_res)
+            t = t2  # sigue siendo BOOLEAN si llegó aquí
+        self._res = res
+        return t
 
-    def visitEqualityExpr(self, ctx: CompiscriptParser.EqualityExprContext):
+    def visitEqualityExpr(self, node: N.EqualityExpr):
         # patrón: relational (('=='|'!=') relational)*
-        if ctx.relationalExpr():
-            t = self.visit(ctx.relationalExpr(0)) or VOID
-            n = len(ctx.relationalExpr())
-            child_i = 1
-            for i in range(1, n):
-                op = ctx.getChild(child_i).getText()
-                right_t = self.visit(ctx.relationalExpr(i)) or VOID
-                t2 = equality_type(t, right_t)
-                if t2 is None:
-                    self.reporter.report(ctx.start.line, ctx.start.column, "E_EQ",
-                                        f"Comparación inválida: {t} {op} {right_t}")
-                    return VOID
-                t = t2  # BOOLEAN
-                child_i += 2
-            return t
-        return VOID
+        operands = node.operands
+        t, res = self._value(operands[0])
+        for i in range(1, len(operands)):
+            op = node.ops[i - 1]
+            right_t, right_res = self._value(operands[i])
+            t2 = binary_type(op, t, right_t)
+            if isinstance(t2, str):
+                self.reporter.report(node.line, node.col, t2,
+                                    f"Comparación inválida: {t} {op} {right_t}")
+                return VOID
+            if self.emitting:
+                res = self.builder.gen_expr_rel(op, res, right_res)
+            t = t2  # BOOLEAN
+        self._res = res
+        return t
 
-    def visitLogicalAndExpr(self, ctx: CompiscriptParser.LogicalAndExprContext):
-        if ctx.equalityExpr():
-            t = self.visit(ctx.equalityExpr(0)) or VOID
-            for e in ctx.equalityExpr()[1:]:
-                right_t = self.visit(e) or VOID
-                t2 = logical_type(t, right_t)  # ya valida boolean && boolean
-                if t2 is None:
-                    self.reporter.report(ctx.start.line, ctx.start.column, "E_LOGIC",
-                                        f"Operación lógica inválida: {t} && {right_t}")
-                    return VOID
-                t = t2
-            return t
-        return VOID
+    def _short_circuit(self, kind: str, left: ExprResult, e):
+        """
+        Visita el operando derecho de && / || (kind: 'and' | 'or'). Si se está
+        emitiendo, lo hace dentro del callback de gen_expr_and/or para que su
+        código quede después del salto del operando izquierdo.
+        """
+        if not self.emitting:
+            return self.visit(e) or VOID, left
+        right_t = VOID
+        def rhs():
+            nonlocal right_t
+            right_t, right_res = self._value(e)
+            return right_res
+        res = getattr(self.builder, f"gen_expr_{kind}")(left, rhs)
+        return right_t, res
+
+    def visitLogicalAndExpr(self, node: N.LogicalAndExpr):
+        t, res = self._value(node.operands[0])
+        for e in node.operands[1:]:
+            right_t, res = self._short_circuit("and", res, e)
+            t2 = binary_type("&&", t, right_t)  # ya valida boolean && boolean
+            if isinstance(t2, str):
+                self.reporter.report(node.line, node.col, t2,
+                                    f"Operación lógica inválida: {t} && {right_t}")
+                return VOID
+            t = t2
+        self._res = res
+        return t
 
-    def visitLogicalOrExpr(self, ctx: CompiscriptParser.LogicalOrExprContext):
-        if ctx.logicalAndExpr():
-            t = self.visit(ctx.logicalAndExpr(0)) or VOID
-            for e in ctx.logicalAndExpr()[1:]:
-                right_t = self.visit(e) or VOID
-                t = logical_type(t, right_t) or VOID
-            return t
-        return VOID
+    def visitLogicalOrExpr(self, node: N.LogicalOrExpr):
+        t, res = self._value(node.operands[0])
+        for e in node.operands[1:]:
+            right_t, res = self._short_circuit("or", res, e)
+            t = logical_type(t, right_t) or VOID
+        self._res = res
+        return t
 
-    def visitCallExpr(self, ctx: CompiscriptParser.CallExprContext):
-        # Recolectar tipos de argumentos
+    def visitCallExpr(self, node: N.CallExpr, lhs: N.LeftHandSide):
+        # Recolectar tipos de argumentos (y sus operandos, si se emite TAC)
         args = []
-        if ctx.arguments():
-            for e in ctx.arguments().expression():
-                arg_t = self.visit(e) or VOID
-                args.append(arg_t)
-
-        # Verificar contexto (la llamada siempre cuelga de LeftHandSide)
-        lhs_ctx = ctx.parentCtx
-        if not isinstance(lhs_ctx, CompiscriptParser.LeftHandSideContext):
-            self.reporter.report(ctx.start.line, ctx.start.column, "E_CALL", "Contexto inválido en llamada")
-            return VOID
+        arg_vals = []
+        for e in node.args:
+            arg_t, arg_res = self._value(e)
+            args.append(arg_t)
+            arg_vals.append(arg_res)
 
         # Nombre base (para llamadas del estilo: foo(...))
-        base_name = None
-        if lhs_ctx.primaryAtom() and lhs_ctx.primaryAtom().Identifier():
-            base_name = lhs_ctx.primaryAtom().Identifier().getText()
+        base_name = _atom_name(lhs.atom)
 
+        suffixes = lhs.suffixes
         # llamada simple:  Identifier '(' args ')'    (no hay más suffixes)
-        if len(lhs_ctx.suffixOp()) == 1 and lhs_ctx.suffixOp(0) == ctx and base_name is not None:
-            sym = self.resolve_symbol(base_name, ctx.start.line, ctx.start.column)
+        if len(suffixes) == 1 and suffixes[0] is node and base_name is not None:
+            sym = self.resolve_symbol(base_name, node.line, node.col)
             if not sym or not isinstance(sym, FuncSymbol):
-                self.reporter.report(ctx.start.line, ctx.start.column, "E_CALL",
+                self.reporter.report(node.line, node.col, "E_CALL",
                                     f"{base_name} no es una función")
                 return VOID
 
-            # Si la función captura un scope
-            pushed = False
-            if sym.closure_scope and sym.closure_scope is not self.scopes.current:
-                self.scopes.push_child(sym.closure_scope)
-                pushed = True
-
-            # Chequeo de aridad y tipos
+            # Chequeo de aridad y tipos. Los tipos de los parámetros ya están
+            # resueltos en el FuncSymbol: no hace falta entrar al scope capturado.
             if len(args) != len(sym.params):
-                self.reporter.report(ctx.start.line, ctx.start.column, "E_CALL",
+                self.reporter.report(node.line, node.col, "E_CALL",
                                     f"Número incorrecto de argumentos en {base_name}")
             else:
                 for i, (arg_t, param) in enumerate(zip(args, sym.params)):
                     if not can_assign(param.type, arg_t):
-                        self.reporter.report(ctx.start.line, ctx.start.column, "E_CALL",
+                        self.reporter.report(node.line, node.col, "E_CALL",
                                             f"Argumento {i} incompatible: {arg_t}, se esperaba {param.type}")
 
-            # Desapilar solo si apilamos antes
-            if pushed:
-                self.scopes.pop()
-
-            return sym.type.ret if isinstance(sym.type, FunctionType) else sym.type
+            ret_t = sym.type.ret if isinstance(sym.type, FunctionType) else sym.type
+            if self.emitting:
+                self._res = self.builder.gen_expr_call(self._entry(sym), arg_vals, has_value=ret_t != VOID)
+            return ret_t
 
         # llamada con acceso previo:  obj . method '(' args ')'  (último suffix es la llamada)
-        if len(lhs_ctx.suffixOp()) >= 2 and lhs_ctx.suffixOp()[-1] == ctx:
-            prev_suffix = lhs_ctx.suffixOp()[-2]
-            if isinstance(prev_suffix, CompiscriptParser.PropertyAccessExprContext):
-                method_name = prev_suffix.Identifier().getText()
-                obj_name = lhs_ctx.primaryAtom().getText()
-                obj_sym = self.resolve_symbol(obj_name, ctx.start.line, ctx.start.column)
+        if len(suffixes) >= 2 and suffixes[-1] is node:
+            prev_suffix = suffixes[-2]
+            if isinstance(prev_suffix, N.PropertyAccessExpr):
+                self._unsupported(node, "llamada a método")
+                method_name = prev_suffix.name
+                obj_name = _atom_text(lhs.atom)
+                obj_sym = self.resolve_symbol(obj_name, node.line, node.col)
 
                 if not obj_sym or not isinstance(obj_sym.type, Type):
-                    self.reporter.report(ctx.start.line, ctx.start.column, "E_CALL",
+                    self.reporter.report(node.line, node.col, "E_CALL",
                                         f"{obj_name} no es un objeto válido")
                     return VOID
 
-                class_sym = self.resolve_symbol(obj_sym.type.name, ctx.start.line, ctx.start.column)
+                class_sym = self.resolve_symbol(obj_sym.type.name, node.line, node.col)
                 if not isinstance(class_sym, ClassSymbol):
-                    self.reporter.report(ctx.start.line, ctx.start.column, "E_CALL",
+                    self.reporter.report(node.line, node.col, "E_CALL",
                                         f"{obj_sym.type.name} no es una clase válida")
                     return VOID
 
-                # Buscar método en la jerarquía (herencia)
-                method = None
-                cur_class = class_sym
-                while isinstance(cur_class, ClassSymbol):
-                    method = cur_class.methods.get(method_name)
-                    if method:
-                        break
-                    if hasattr(cur_class, "base") and cur_class.base:
-                        cur_class = self.resolve_symbol(cur_class.base, ctx.start.line, ctx.start.column)
-                    else:
-                        cur_class = None
+                # Buscar método en la jerarquía (herencia, en el layout aplanado)
+                method = self._member(class_sym, "methods", method_name, node)
 
                 if not method:
-                    self.reporter.report(ctx.start.line, ctx.start.column, "E_CALL",
+                    self.reporter.report(node.line, node.col, "E_CALL",
                                         f"Método {method_name} no definido en {obj_sym.type.name}")
                     return VOID
 
                 # Chequeo de aridad y tipos
                 if len(args) != len(method.params):
-                    self.reporter.report(ctx.start.line, ctx.start.column, "E_CALL",
+                    self.reporter.report(node.line, node.col, "E_CALL",
                                         f"Número incorrecto de argumentos en {obj_sym.type.name}.{method_name}")
                 else:
                     for i, (arg_t, param) in enumerate(zip(args, method.params)):
                         if not can_assign(param.type, arg_t):
-                            self.reporter.report(ctx.start.line, ctx.start.column, "E_CALL",
+                            self.reporter.report(node.line, node.col, "E_CALL",
                                                 f"Argumento {i} incompatible en {obj_sym.type.name}.{method_name}: {arg_t} esperado {param.type}")
 
                 return method.type.ret if isinstance(method.type, FunctionType) else method.type
 
         # Si ninguna forma reconocida matcheó
-        self.reporter.report(ctx.start.line, ctx.start.column, "E_CALL",
+        self.reporter.report(node.line, node.col, "E_CALL",
                             f"Llamada inválida{f' en {base_name}' if base_name else ''}")
         return VOID
 
 
-    def visitIdentifierExpr(self, ctx: CompiscriptParser.IdentifierExprContext):
-        name = ctx.Identifier().getText()
+    def visitIdentifierExpr(self, node: N.IdentifierExpr):
+        name = node.name
 
         if name == "integer": return INTEGER
         if name == "string": return STRING
         if name == "boolean": return BOOLEAN
         if name == "void": return VOID
 
-        sym = self.resolve_symbol(name, ctx.start.line, ctx.start.column)
+        sym = self.resolve_symbol(name, node.line, node.col, site=node)
+        if self.emitting:
+            self._res = self.builder.gen_expr_var(name)
         if sym:
             if isinstance(sym, VarSymbol):
                 # uso antes de inicializar
                 if not sym.is_initialized and not sym.is_const:
-                    self.reporter.report(ctx.start.line, ctx.start.column, "E_UNINIT",
-                                        f"Variable '{name}' usada antes de ser inicializada")
+                    self.reporter.report(node.line, node.col, "E_UNINIT",
+                                        f"Variable '{name}' usada antes de ser inicializada",
+                                        symbol=name)
                 return sym.type
             if isinstance(sym, FuncSymbol):
-                return sym.type  
+                return sym.type
             if isinstance(sym, ClassSymbol):
                 return sym.type
 
         return VOID
 
-    def visitClassDeclaration(self, ctx: CompiscriptParser.ClassDeclarationContext):
-        name = ctx.Identifier(0).getText()
+    def visitClassDeclaration(self, node: N.ClassDeclaration):
+        csym = self._declare_class(node)
+        self._check_class_body(node, csym)
+        return None
+
+    def _declare_class(self, node: N.ClassDeclaration) -> ClassSymbol:
+        """Define el símbolo de la clase (todavía sin miembros)."""
+        name = node.name
         csym = ClassSymbol(name, type=Type(name),
-                        line=ctx.start.line, col=ctx.start.column)
+                        line=node.line, col=node.col)
         csym.fields = {}
         csym.methods = {}
-        if ctx.Identifier(1):
-            csym.base = ctx.Identifier(1).getText()
-        else:
-            csym.base = None
-        
+        csym.base = node.base
+
         self.define_symbol(csym)
+        return csym
 
+    def _check_class_body(self, node: N.ClassDeclaration, csym: ClassSymbol) -> None:
+        name = node.name
         prev = self._current_class
         self._current_class = name
         self.scopes.push_class(name)
 
-        for member in ctx.classMember():
-            if member.functionDeclaration():
-                fname = member.functionDeclaration().Identifier().getText()
-                ret_type = self.visit(member.functionDeclaration().type_()) if member.functionDeclaration().type_() else VOID
-                
+        self._open_classes.append(csym)
+        with self._suppress_emit():
+            self._class_members(node, csym)
+        self._open_classes.pop()
+
+        self.scopes.pop()
+        self._current_class = prev
+        self._class_layout(csym)
+
+    def _class_layout(self, csym: ClassSymbol) -> ClassLayout:
+        """
+        Layout aplanado de la clase, guardado en el símbolo. Si la base (o una
+        base de la base) todavía no estaba declarada, se vuelve a armar en la
+        siguiente consulta. Dentro de la propia declaración (p. ej. `this.x` en
+        un método) también se guarda: _class_members lo descarta al agregar
+        cada miembro. No se guardan layouts de otras clases armados mientras
+        hay una clase abierta, por si heredan de ella.
+        """
+        lay = csym.layout
+        if lay is not None and lay.missing_base is None:
+            return lay
+        base_lay, missing = None, None
+        if csym.base:
+            base_sym = self.scopes.resolve(csym.base)
+            if isinstance(base_sym, ClassSymbol) and csym.base not in self._building_layouts:
+                self._building_layouts.add(csym.name)
+                try:
+                    base_lay = self._class_layout(base_sym)
+                finally:
+                    self._building_layouts.discard(csym.name)
+            else:
+                missing = csym.base
+        lay = build_layout(csym, base_lay, missing)
+        if all(c is csym for c in self._open_classes):
+            csym.layout = lay
+        return lay
+
+    def _member(self, csym: ClassSymbol, table: str, name: str, node):
+        """
+        Busca 'name' en una tabla del layout ('fields' | 'methods' | 'members').
+        Si no está y la jerarquía tiene una base sin resolver, la resuelve
+        para reportar E_UNDEF en el uso, como al recorrer la herencia.
+        """
+        lay = self._class_layout(csym)
+        member = getattr(lay, table).get(name)
+        if member is None and lay.missing_base is not None:
+            self.resolve_symbol(lay.missing_base, node.line, node.col)
+        return member
+
+    def _class_members(self, node: N.ClassDeclaration, csym: ClassSymbol):
+        for member in node.members:
+            if isinstance(member, N.FunctionDeclaration):
+                fname = member.name
+                ret_type = self.visit(member.ret) if member.ret else VOID
+
                 params = []
-                if member.functionDeclaration().parameters():
-                    for i, p in enumerate(member.functionDeclaration().parameters().parameter()):
-                        pname = p.Identifier().getText()
-                        ptype = self.visit(p.type_()) if p.type_() else VOID
-                        params.append(ParamSymbol(pname, ptype, i,
-                                                line=p.start.line, col=p.start.column))
-                
+                for i, p in enumerate(member.params):
+                    ptype = self.visit(p.type) if p.type else VOID
+                    params.append(ParamSymbol(p.name, ptype, i,
+                                            line=p.line, col=p.col))
+
                 func_type = make_fn([p.type for p in params], ret_type)
                 fsym = FuncSymbol(fname, type=func_type, params=tuple(params),
-                                line=member.start.line, col=member.start.column)
+                                line=member.line, col=member.col)
                 csym.methods[fname] = fsym
+                csym.layout = None
 
                 self.scopes.push_function(ret_type, fname)
                 for psym in params:
                     self.define_symbol(psym)
-                self.visit(member.functionDeclaration().block())
+                self.visit(member.body)
                 self.scopes.pop()
 
-            elif member.variableDeclaration():
-                vname = member.variableDeclaration().Identifier().getText()
-                vtype = self.visit(member.variableDeclaration().typeAnnotation().type_()) if member.variableDeclaration().typeAnnotation() else VOID
+            elif isinstance(member, N.VariableDeclaration):
+                vname = member.name
+                vtype = self.visit(member.type) if member.type else VOID
                 vsym = VarSymbol(vname, vtype, is_const=False, is_initialized=False,
-                                line=member.start.line, col=member.start.column)
+                                line=member.line, col=member.col)
                 csym.fields[vname] = vsym
+                csym.layout = None
                 self.define_symbol(vsym)
 
-            elif member.constantDeclaration():
-                cname = member.constantDeclaration().Identifier().getText()
-                ctype = self.visit(member.constantDeclaration().typeAnnotation().type_()) if member.constantDeclaration().typeAnnotation() else VOID
+            elif isinstance(member, N.ConstantDeclaration):
+                cname = member.name
+                ctype = self.visit(member.type) if member.type else VOID
                 csym.fields[cname] = VarSymbol(cname, ctype, is_const=True, is_initialized=True,
-                                            line=member.start.line, col=member.start.column)
+                                            line=member.line, col=member.col)
+                csym.layout = None
                 self.define_symbol(csym.fields[cname])
 
-        self.scopes.pop()
-        self._current_class = prev
-        return None
-
-    def visitLiteralExpr(self, ctx: CompiscriptParser.LiteralExprContext):
-        txt = ctx.getText()
-
-        if ctx.arrayLiteral():
-            return self.visit(ctx.arrayLiteral())
-        if txt == "null":
+    def visitLiteralExpr(self, node: N.LiteralExpr):
+        kind = node.kind
+        if self.emitting:
+            self._res = ExprResult(self.builder.pool.const(node.value), is_temp=False)
+        if kind == N.LIT_NULL:
             return NULL
-        if txt in ("true", "false"):
+        if kind == N.LIT_BOOLEAN:
             return BOOLEAN
-        if txt.isdigit():
+        if kind == N.LIT_INTEGER:
             return INTEGER
-        if txt.startswith('"') and txt.endswith('"'):
+        if kind == N.LIT_STRING:
             return STRING
-        
+
         return VOID
 
-    def visitArrayLiteral(self, ctx: CompiscriptParser.ArrayLiteralContext):
-        elems = [self.visit(e) for e in ctx.expression()]
+    def visitArrayLiteral(self, node: N.ArrayLiteral):
+        self._unsupported(node, "literal de arreglo")
+        elems = [self.visit(e) or VOID for e in node.elements]
+        self._res = None
 
         if not elems:
             return make_array(VOID, 1)
@@ -543,59 +699,54 @@ class TypeChecker(CompiscriptVisitor):
 
         for t in elems[1:]:
             if not (can_assign(elem_type, t) and can_assign(t, elem_type)):
-                self.reporter.report(ctx.start.line, ctx.start.column, "E_ARRAY_ELEM",
+                self.reporter.report(node.line, node.col, "E_ARRAY_ELEM",
                                     f"Tipos incompatibles en arreglo: {elem_type} y {t}")
         return make_array(elem_type, 1)
 
-    def visitThisExpr(self, ctx: CompiscriptParser.ThisExprContext):
+    def visitThisExpr(self, node: N.ThisExpr):
         if not self._current_class:
-            self.reporter.report(ctx.start.line, ctx.start.column, "E_THIS",
+            self.reporter.report(node.line, node.col, "E_THIS",
                                 "Uso de 'this' fuera de una clase")
             return VOID
         return Type(self._current_class)
 
-    def visitNewExpr(self, ctx: CompiscriptParser.NewExprContext):
-        class_name = ctx.Identifier().getText()
+    def visitNewExpr(self, node: N.NewExpr):
+        self._unsupported(node, "new")
+        class_name = node.class_name
 
-        sym = self.resolve_symbol(class_name, ctx.start.line, ctx.start.column)
+        sym = self.resolve_symbol(class_name, node.line, node.col)
         if not sym or not isinstance(sym, ClassSymbol):
-            self.reporter.report(ctx.start.line, ctx.start.column, "E_NEW",
+            self.reporter.report(node.line, node.col, "E_NEW",
                                 f"Clase no definida: {class_name}")
             return VOID
 
         args = []
-        if ctx.arguments():
-            for e in ctx.arguments().expression():
-                args.append(self.visit(e) or VOID)
+        for e in node.args:
+            args.append(self.visit(e) or VOID)
+        self._res = None
 
-        ctor = sym.methods.get("constructor")
-        if not ctor and hasattr(sym, "base") and sym.base:
-            base_sym = self.resolve_symbol(sym.base, ctx.start.line, ctx.start.column)
-            if isinstance(base_sym, ClassSymbol):
-                ctor = base_sym.methods.get("constructor")
+        ctor = self._member(sym, "methods", "constructor", node)   # propio o heredado
 
         if ctor and isinstance(ctor.type, FunctionType):
             if len(args) != len(ctor.params):
-                self.reporter.report(ctx.start.line, ctx.start.column, "E_NEW",
+                self.reporter.report(node.line, node.col, "E_NEW",
                                     f"Número incorrecto de argumentos al construir {class_name}")
             else:
                 for i, (arg_t, param) in enumerate(zip(args, ctor.params)):
                     if not can_assign(param.type, arg_t):
-                        self.reporter.report(ctx.start.line, ctx.start.column, "E_NEW",
+                        self.reporter.report(node.line, node.col, "E_NEW",
                                             f"Argumento {i} incompatible en constructor de {class_name}: {arg_t}, se esperaba {param.type}")
         else:
             if args:
-                self.reporter.report(ctx.start.line, ctx.start.column, "E_NEW",
+                self.reporter.report(node.line, node.col, "E_NEW",
                                     f"Clase {class_name} no tiene constructor que reciba argumentos")
 
         return Type(class_name)
 
-    def visitType(self, ctx: CompiscriptParser.TypeContext):
-        base_txt = ctx.baseType().getText()
+    def visitTypeRef(self, node: N.TypeRef):
+        base_txt = node.name
 
-        if ctx.baseType().Identifier():
-            elem = Type(ctx.baseType().Identifier().getText())
-        elif base_txt == "integer":
+        if base_txt == "integer":
             elem = INTEGER
         elif base_txt == "string":
             elem = STRING
@@ -604,256 +755,274 @@ class TypeChecker(CompiscriptVisitor):
         elif base_txt == "void":
             elem = VOID
         else:
-            elem = VOID
+            elem = Type(base_txt)
 
-        children = list(ctx.getChildren())
-        dims = (len(children) - 1) // 2
+        dims = node.dims
         tipo_final = make_array(elem, dims) if dims > 0 else elem
         return tipo_final
 
-    def visitIfStatement(self, ctx: CompiscriptParser.IfStatementContext):
-        cond_t = self.visit(ctx.expression()) or VOID
+    def visitIfStatement(self, node: N.IfStatement):
+        cond_t, cond = self._value(node.cond)
         if cond_t != BOOLEAN:
-            self.reporter.report(ctx.start.line, ctx.start.column, "E_IF",
+            self.reporter.report(node.line, node.col, "E_IF",
                                 f"Condición de if debe ser boolean, no {cond_t}")
 
-        # then
-        self.visit(ctx.block(0))  # crea BlockScope vía visitBlock
-
-        # else (opcional)
-        if ctx.block(1):
-            self.visit(ctx.block(1))  # crea BlockScope
+        then = lambda b: self.visit(node.then)  # crea BlockScope vía visitBlock
+        orelse = (lambda b: self.visit(node.orelse)) if node.orelse is not None else None
+        if self.emitting:
+            self.builder.gen_stmt_if(cond, then, orelse)
+        else:
+            self._run(then, orelse)
         return None
 
-
-    def visitWhileStatement(self, ctx: CompiscriptParser.WhileStatementContext):
-        cond_t = self.visit(ctx.expression()) or VOID
-        if cond_t != BOOLEAN:
-            self.reporter.report(ctx.start.line, ctx.start.column, "E_WHILE",
-                                f"Condición de while debe ser boolean, no {cond_t}")
-        self.scopes.push("loop")
-        self.visit(ctx.block())  # BlockScope dentro del loop
-        self.scopes.pop()
+    def visitWhileStatement(self, node: N.WhileStatement):
+        cond = lambda b: self._cond(node.cond, node, "E_WHILE", "while")
+        body = lambda b: self._loop_body(node.body)
+        if self.emitting:
+            self.builder.gen_stmt_while(cond, body)
+        else:
+            self._run(cond, body)
         return None
 
-
-    def visitDoWhileStatement(self, ctx: CompiscriptParser.DoWhileStatementContext):
-        self.scopes.push("loop")
-        self.visit(ctx.block())  # BlockScope dentro del loop
-        self.scopes.pop()
-
-        cond_t = self.visit(ctx.expression()) or VOID
-        if cond_t != BOOLEAN:
-            self.reporter.report(ctx.start.line, ctx.start.column, "E_DOWHILE",
-                                f"Condición de do-while debe ser boolean, no {cond_t}")
+    def visitDoWhileStatement(self, node: N.DoWhileStatement):
+        body = lambda b: self._loop_body(node.body)
+        cond = lambda b: self._cond(node.cond, node, "E_DOWHILE", "do-while")
+        if self.emitting:
+            self.builder.gen_stmt_do_while(body, cond)
+        else:
+            self._run(body, cond)
         return None
 
-
-    def visitForStatement(self, ctx: CompiscriptParser.ForStatementContext):
+    def visitForStatement(self, node: N.ForStatement):
         self.scopes.push("loop")
 
-        if ctx.variableDeclaration():
-            self.visit(ctx.variableDeclaration())
-        elif ctx.assignment():
-            self.visit(ctx.assignment())
-
-        if ctx.expression(0):
-            cond_t = self.visit(ctx.expression(0)) or VOID
-            if cond_t != BOOLEAN:
-                self.reporter.report(ctx.start.line, ctx.start.column, "E_FOR",
-                                    f"Condición de for debe ser boolean, no {cond_t}")
-
-        if ctx.expression(1):
-            self.visit(ctx.expression(1))
-
-        self.visit(ctx.block())  # BlockScope dentro del loop
+        def cond(b):
+            if node.cond is None:
+                return ExprResult(b.pool.const(1), is_temp=False) if b is not None else None
+            return self._cond(node.cond, node, "E_FOR", "for")
+
+        def step(b):
+            _, res = self._value(node.step)
+            if b is not None:
+                b.gen_stmt_expr(res)
+
+        init = (lambda b: self.visit(node.init)) if node.init is not None else None
+        body = lambda b: self.visit(node.body)  # BlockScope dentro del loop
+        step = step if node.step is not None else None
+        if self.emitting:
+            self.builder.gen_stmt_for(init, cond, step, body)
+        else:
+            self._run(init, cond, step, body)
         self.scopes.pop()
         return None
 
-    def visitForeachStatement(self, ctx: CompiscriptParser.ForeachStatementContext):
-        iter_t = self.visit(ctx.expression()) or VOID
+    def visitForeachStatement(self, node: N.ForeachStatement):
+        self._unsupported(node, "foreach")
+        iter_t = self.visit(node.iterable) or VOID
         if not is_array(iter_t):
-            self.reporter.report(ctx.start.line, ctx.start.column, "E_FOREACH",
+            self.reporter.report(node.line, node.col, "E_FOREACH",
                                 f"foreach requiere un arreglo, no {iter_t}")
             elem_t = VOID
         else:
             elem_t = element_type(iter_t) or VOID
 
-        var_name = ctx.Identifier().getText()
+        var_name = node.name
         sym = VarSymbol(var_name, elem_t, is_const=False, is_initialized=True,
-                        line=ctx.start.line, col=ctx.start.column)
+                        line=node.line, col=node.col)
         self.define_symbol(sym)
 
         self.scopes.push("loop")
-        self.visit(ctx.block())
+        self.visit(node.body)
         self.scopes.pop()
         return None
 
-    def visitSwitchStatement(self, ctx: CompiscriptParser.SwitchStatementContext):
-        control_t = self.visit(ctx.expression())
+    def visitSwitchStatement(self, node: N.SwitchStatement):
+        control_t, control = self._value(node.subject)
         self.scopes.push("switch")
 
-        for case in ctx.switchCase():
-            case_t = self.visit(case.expression())
-            if not can_assign(control_t, case_t):
-                self.reporter.report(ctx.start.line, ctx.start.column, "E_SWITCH",
-                                    f"case {case_t} incompatible con switch {control_t}")
-            self.check_block_statements(case.statement(), ctx)
-
-        if ctx.defaultCase():
-            self.check_block_statements(ctx.defaultCase().statement(), ctx)
-
+        # gen_stmt_switch compara contra constantes: solo cases literales
+        literal = all(isinstance(c.value, N.LiteralExpr) for c in node.cases)
+        if not literal:
+            self._unsupported(node, "switch con case no literal")
+
+        def case_cb(case):
+            def cb(b):
+                case_t = self.visit(case.value) or VOID
+                if not can_assign(control_t, case_t):
+                    self.reporter.report(node.line, node.col, "E_SWITCH",
+                                        f"case {case_t} incompatible con switch {control_t}")
+                self.check_block_statements(case.body, node)
+            return cb
+
+        cases = [(case.value.value if literal else None, case_cb(case)) for case in node.cases]
+        default = node.default
+        default_cb = (lambda b: self.check_block_statements(default, node)) if default is not None else None
+        if self.emitting:
+            self.builder.gen_stmt_switch(control, cases, default_cb)
+        else:
+            self._run(*(cb for _, cb in cases), default_cb)
         self.scopes.pop()
         return None
 
 
-    def visitBreakStatement(self, ctx: CompiscriptParser.BreakStatementContext):
+    def visitBreakStatement(self, node: N.BreakStatement):
         if not self.scopes.inside("loop") and not self.scopes.inside("switch"):
-            self.reporter.report(ctx.start.line, ctx.start.column, "E_BREAK",
+            self.reporter.report(node.line, node.col, "E_BREAK",
                                 "break solo se permite en bucles o switch")
+        elif self.emitting:
+            self.builder.gen_stmt_break()
         return None
 
-    def visitContinueStatement(self, ctx: CompiscriptParser.ContinueStatementContext):
+    def visitContinueStatement(self, node: N.ContinueStatement):
         if not self.scopes.inside("loop"):
-            self.reporter.report(ctx.start.line, ctx.start.column, "E_CONTINUE",
+            self.reporter.report(node.line, node.col, "E_CONTINUE",
                                 "continue solo se permite en bucles")
+        elif self.emitting:
+            self.builder.gen_stmt_continue()
         return None
 
-    def visitTryCatchStatement(self, ctx: CompiscriptParser.TryCatchStatementContext):
-        self.visit(ctx.block(0))  
+    def visitTryCatchStatement(self, node: N.TryCatchStatement):
+        self._unsupported(node, "try/catch")
+        self.visit(node.body)
 
         self.scopes.push("catch")
-        err_name = ctx.Identifier().getText()
+        err_name = node.name
         self.define_symbol(VarSymbol(err_name, STRING, is_const=False, is_initialized=True,
-                                    line=ctx.start.line, col=ctx.start.column))
-        self.visit(ctx.block(1))  
+                                    line=node.line, col=node.col))
+        self.visit(node.handler)
         self.scopes.pop()
         return None
 
+    def visitExpressionStatement(self, node: N.ExpressionStatement):
+        _, res = self._value(node.expr)
+        if self.emitting:
+            self.builder.gen_stmt_expr(res)
+        return None
+
+    def visitPrintStatement(self, node: N.PrintStatement):
+        _, res = self._value(node.expr)
+        if self.emitting:
+            self.builder.gen_stmt_print(res)
+        return None
+
 
-    def visitIndexExpr(self, ctx: CompiscriptParser.IndexExprContext):
-        lhs_ctx = ctx.parentCtx.primaryAtom()
-        if lhs_ctx and lhs_ctx.Identifier():
-            arr_name = lhs_ctx.Identifier().getText()
-            arr_sym = self.resolve_symbol(arr_name, ctx.start.line, ctx.start.column)
+    def visitIndexExpr(self, node: N.IndexExpr, lhs: N.LeftHandSide):
+        arr_name = _atom_name(lhs.atom)
+        if arr_name is not None:
+            arr_sym = self.resolve_symbol(arr_name, node.line, node.col)
             arr_t = arr_sym.type if arr_sym else VOID
         else:
             arr_t = VOID
 
-        idx_t = self.visit(ctx.expression()) or VOID
+        self._unsupported(node, "acceso a índice")
+        idx_t = self.visit(node.index) or VOID
         if idx_t != INTEGER:
-            self.reporter.report(ctx.start.line, ctx.start.column, "E_INDEX",
+            self.reporter.report(node.line, node.col, "E_INDEX",
                                 f"Índice debe ser integer, no {idx_t}")
 
         if not is_array(arr_t):
-            self.reporter.report(ctx.start.line, ctx.start.column, "E_INDEX",
+            self.reporter.report(node.line, node.col, "E_INDEX",
                                 f"El objeto {arr_t} no es indexable")
             return VOID
 
+        self._res = None
         elem_t = element_type(arr_t) or VOID
         return elem_t
 
-    def visitUnaryExpr(self, ctx: CompiscriptParser.UnaryExprContext):
-        if ctx.getChildCount() == 2:  
-            op = ctx.getChild(0).getText()
-            t = self.visit(ctx.unaryExpr()) or VOID
+    def visitUnaryExpr(self, node: N.UnaryExpr):
+        # Operadores seguidos (- - x, !!b): se baja en un loop hasta el operando
+        # y se aplican de adentro hacia afuera, sin un visit por operador
+        chain = [node]
+        while isinstance(chain[-1].operand, N.UnaryExpr):
+            chain.append(chain[-1].operand)
+        t, res = self._value(chain[-1].operand)
+        for u in reversed(chain):
+            op = u.op
             if op == "-" and t != INTEGER:
-                self.reporter.report(ctx.start.line, ctx.start.column, "E_UNARY",
+                self.reporter.report(u.line, u.col, "E_UNARY",
                                     f"Operador '-' solo válido para integer, no {t}")
-                return VOID
+                t, res = VOID, None
+                continue
             if op == "!" and t != BOOLEAN:
-                self.reporter.report(ctx.start.line, ctx.start.column, "E_UNARY",
+                self.reporter.report(u.line, u.col, "E_UNARY",
                                     f"Operador '!' solo válido para boolean, no {t}")
-                return VOID
-            return t
-        else:
-            return self.visit(ctx.primaryExpr()) or VOID
+                t, res = VOID, None
+                continue
+            if self.emitting:
+                res = self.builder.gen_expr_neg(res) if op == "-" else self.builder.gen_expr_not(res)
+        if t is not VOID:
+            self._res = res
+        return t
 
-    def visitPropertyAccessExpr(self, ctx: CompiscriptParser.PropertyAccessExprContext):
-        lhs_ctx = ctx.parentCtx
-        obj_t = VOID
-        if isinstance(lhs_ctx, CompiscriptParser.LeftHandSideContext):
-            if lhs_ctx.primaryAtom():
-                obj_t = self.visit(lhs_ctx.primaryAtom()) or VOID
+    def visitPropertyAccessExpr(self, node: N.PropertyAccessExpr, lhs: N.LeftHandSide):
+        suffixes = lhs.suffixes
+        i = suffixes.index(node)
+        if not (i + 1 < len(suffixes) and isinstance(suffixes[i + 1], N.CallExpr)):
+            self._unsupported(node, "acceso a propiedad")   # obj.m(...) lo anota la llamada
+        obj_t = self.visit(lhs.atom) or VOID
+        self._res = None
 
-        prop_name = ctx.Identifier().getText()
+        prop_name = node.name
 
         if isinstance(obj_t, Type):
-            class_sym = self.resolve_symbol(obj_t.name, ctx.start.line, ctx.start.column)
-            while isinstance(class_sym, ClassSymbol):   
-                if prop_name in class_sym.fields:
-                    return class_sym.fields[prop_name].type
-                if prop_name in class_sym.methods:
-                    return class_sym.methods[prop_name].type
-                if hasattr(class_sym, "base") and class_sym.base:
-                    class_sym = self.resolve_symbol(class_sym.base, ctx.start.line, ctx.start.column)
-                else:
-                    break
+            class_sym = self.resolve_symbol(obj_t.name, node.line, node.col)
+            if isinstance(class_sym, ClassSymbol):
+                member = self._member(class_sym, "members", prop_name, node)
+                if member:
+                    return member.type
         return VOID
 
-    def visitLeftHandSide(self, ctx: CompiscriptParser.LeftHandSideContext):
-        t = self.visit(ctx.primaryAtom()) or VOID
-        for suffix in ctx.suffixOp():
-            res = self.visit(suffix)
+    def visitLeftHandSide(self, node: N.LeftHandSide):
+        # Los sufijos (llamada, índice, propiedad) dependen del átomo y de su
+        # posición en la cadena, por eso reciben también el LeftHandSide.
+        t = self.visit(node.atom) or VOID
+        for suffix in node.suffixes:
+            res = getattr(self, suffix._visit)(suffix, node)
             t = res
+        if not (len(node.suffixes) == 1 and isinstance(node.suffixes[0], N.CallExpr)):
+            self._res = None   # solo las llamadas simples f(...) generan TAC
         return t
 
-    def visitExpression(self, ctx: CompiscriptParser.ExpressionContext):
-        return self.visit(ctx.assignmentExpr()) or VOID
-
-    def visitAssignmentExpr(self, ctx: CompiscriptParser.AssignmentExprContext):
-        if ctx.getChildCount() == 3 and ctx.getChild(1).getText() == "=":
-            # Intentar detectar si lhs es un identificador simple para chequear const
-            lhs = ctx.leftHandSide()
-            lhs_id = None
-            if lhs and lhs.primaryAtom() and lhs.primaryAtom().Identifier():
-                lhs_id = lhs.primaryAtom().Identifier().getText()
-            lhs_t = self.visit(lhs) or VOID
-            rhs_t = self.visit(ctx.assignmentExpr()) or VOID
-
-            # const en asignación expresiva
-            if lhs_id is not None:
-                sym = self.resolve_symbol(lhs_id, ctx.start.line, ctx.start.column)
-                if isinstance(sym, VarSymbol) and sym.is_const:
-                    self.reporter.report(ctx.start.line, ctx.start.column, "E_CONST",
-                                        f"No se puede asignar a la constante '{lhs_id}'")
-                else:
-                    if isinstance(sym, VarSymbol):
-                        sym.is_initialized = True
-
-            if not can_assign(lhs_t, rhs_t):
-                self.reporter.report(ctx.start.line, ctx.start.column, "E_ASSIGN",
-                                    f"No se puede asignar {rhs_t} a {lhs_t}")
-            return lhs_t
-        else:
-            return self.visit(ctx.conditionalExpr()) or VOID
-
-    def visitConditionalExpr(self, ctx: CompiscriptParser.ConditionalExprContext):
-        if ctx.getChildCount() == 5:  
-            cond_t = self.visit(ctx.logicalOrExpr()) or VOID
-            if cond_t != BOOLEAN:
-                self.reporter.report(ctx.start.line, ctx.start.column, "E_TERNARY",
-                                     f"Condición de operador ternario debe ser boolean, no {cond_t}")
-            then_t = self.visit(ctx.expression(0)) or VOID
-            else_t = self.visit(ctx.expression(1)) or VOID
-            if can_assign(then_t, else_t):
-                return then_t
-            if can_assign(else_t, then_t):
-                return else_t
-            return VOID
+    def visitAssignExpr(self, node: N.AssignExpr):
+        # Como expresión, `a = b` solo recorre ambos lados y toma el tipo del valor.
+        if isinstance(node.target, N.IdentifierExpr):
+            self.visit(node.target)
         else:
-            return self.visit(ctx.logicalOrExpr()) or VOID
-
-    def visitPrimaryExpr(self, ctx: CompiscriptParser.PrimaryExprContext):
-        if ctx.literalExpr():
-            return self.visit(ctx.literalExpr()) or VOID
-        if ctx.leftHandSide():
-            return self.visit(ctx.leftHandSide()) or VOID
-        if ctx.expression():
-            return self.visit(ctx.expression()) or VOID
-        return VOID
-    
-    def check_block_statements(self, stmts, ctx):
+            self._unsupported(node, "asignación a elemento de arreglo")
+            with self._suppress_emit():   # el destino no es una lectura
+                self.visit(node.target)
+        t, res = self._value(node.value)
+        if self.emitting and isinstance(node.target, N.IdentifierExpr):
+            dst = self.builder.pool.var(node.target.name)
+            self.builder._assign(dst, res)
+            res = ExprResult(dst, is_temp=False)
+        self._res = res
+        return t
+
+    def visitPropertyAssignExpr(self, node: N.PropertyAssignExpr):
+        self._unsupported(node, "asignación a propiedad")
+        with self._suppress_emit():   # el destino no es una lectura
+            self.visit(node.target)
+        t = self.visit(node.value) or VOID
+        self._res = None
+        return t
+
+    def visitTernaryExpr(self, node: N.TernaryExpr):
+        # Se recorren las tres partes; el tipo resultante es el de la rama else.
+        _, cond = self._value(node.cond)
+        if not self.emitting:
+            self.visit(node.then)
+            return self.visit(node.orelse) or VOID
+        out_t = VOID
+        def orelse():
+            nonlocal out_t
+            out_t, res = self._value(node.orelse)
+            return res
+        self._res = self.builder.gen_expr_ternary(
+            cond, lambda: self._value(node.then)[1], orelse)
+        return out_t
+
+    def check_block_statements(self, stmts, node):
         """
         Recorre un bloque y marca código muerto:
         - después de return
@@ -864,14 +1033,40 @@ class TypeChecker(CompiscriptVisitor):
         for stmt in stmts:
             if has_terminated:
                 self.reporter.report(
-                    stmt.start.line, stmt.start.column, "E_DEADCODE",
+                    stmt.line, stmt.col, "E_DEADCODE",
                     "Código muerto: esta instrucción nunca se ejecutará"
                 )
             result = self.visit(stmt)
 
-            if stmt.returnStatement() or stmt.breakStatement() or stmt.continueStatement():
+            if isinstance(stmt, (N.ReturnStatement, N.BreakStatement, N.ContinueStatement)):
                 has_terminated = True
 
+    def _cond(self, expr, node, code: str, what: str) -> ExprResult:
+        """Condición de un bucle: la chequea como boolean y devuelve su operando."""
+        cond_t, cond = self._value(expr)
+        if cond_t != BOOLEAN:
+            self.reporter.report(node.line, node.col, code,
+                                f"Condición de {what} debe ser boolean, no {cond_t}")
+        return cond
+
+    @staticmethod
+    def _run(*callbacks) -> None:
+        """Sin builder: llama los callbacks de una sentencia en orden (None = no hay)."""
+        for cb in callbacks:
+            if cb is not None:
+                cb(None)
+
+    def _entry(self, sym: FuncSymbol):
+        """Etiqueta de entrada de la función; si se declaró sin emitir, la recibe en el primer uso."""
+        if sym.label is None:
+            sym.label = self.builder.func_label(sym.name)
+        return sym.label
+
+    def _loop_body(self, body: N.Block) -> None:
+        self.scopes.push("loop")
+        self.visit(body)  # BlockScope dentro del loop
+        self.scopes.pop()
+
     @contextmanager
     def _block(self):
         """Crea un scope de bloque { ... }."""
@@ -881,9 +1076,9 @@ class TypeChecker(CompiscriptVisitor):
         finally:
             self.scopes.pop()
 
-    def visitBlock(self, ctx):
+    def visitBlock(self, node: N.Block):
         with self._block():
-            self.check_block_statements(ctx.statement(), ctx)
+            self.check_block_statements(node.body, node)
         return VOID
 
     @contextmanager
@@ -893,4 +1088,22 @@ class TypeChecker(CompiscriptVisitor):
         try:
             yield
         finally:
-            self.scopes.pop()
\ No newline at end of file
+            self.scopes.pop()
+
+
+def _atom_name(atom) -> str | None:
+    """Identificador del átomo de un LeftHandSide (la clase en `new C(...)`; None para 'this')."""
+    if isinstance(atom, N.IdentifierExpr):
+        return atom.name
+    if isinstance(atom, N.NewExpr):
+        return atom.class_name
+    return None
+
+
+def _atom_text(atom) -> str:
+    """Texto fuente del átomo de un LeftHandSide (identificador, 'this' o `new ...`)."""
+    if isinstance(atom, N.IdentifierExpr):
+        return atom.name
+    if isinstance(atom, N.ThisExpr):
+        return "this"
+    return atom.text
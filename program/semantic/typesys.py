@@ -1,6 +1,7 @@
 from __future__ import annotations
 from dataclasses import dataclass
 from typing import Optional, Tuple
+from weakref import WeakValueDictionary
 
 
 T_INTEGER = "integer"
@@ -9,34 +10,94 @@ T_BOOLEAN = "boolean"
 T_NULL    = "null"
 T_VOID    = "void"
 
+# Clases de tipo (Type.kind) para las tablas de operadores
+K_INTEGER  = "integer"
+K_STRING   = "string"
+K_BOOLEAN  = "boolean"
+K_NULL     = "null"
+K_VOID     = "void"
+K_ARRAY    = "array"
+K_CLASS    = "class"      # ClassType
+K_NAMED    = "named"      # Type(nombre) no primitivo (así se representan las clases en el TypeChecker)
+K_FUNCTION = "function"
+KINDS = (K_INTEGER, K_STRING, K_BOOLEAN, K_NULL, K_VOID, K_ARRAY, K_CLASS, K_NAMED, K_FUNCTION)
+_PRIMITIVE_KINDS = {T_INTEGER: K_INTEGER, T_STRING: K_STRING, T_BOOLEAN: K_BOOLEAN,
+                    T_NULL: K_NULL, T_VOID: K_VOID}
 
-@dataclass(frozen=True)
-class Type:
+
+# Tabla de internado: (clase, campos...) -> única instancia de ese tipo.
+# Débil para que los tipos de clase de compilaciones anteriores (IDE) se liberen.
+_TYPES: "WeakValueDictionary[tuple, Type]" = WeakValueDictionary()
+
+
+class _Interned(type):
+    """
+    Metaclase de los tipos: construir un tipo devuelve la instancia ya
+    internada si existe uno igual, así cada tipo distinto existe una sola
+    vez y la igualdad/hash son por identidad (eq=False en los dataclasses).
+    """
+    def __call__(cls, *args, **kwargs):
+        key = (cls,) + cls._key(args, kwargs)
+        cached = _TYPES.get(key)
+        if cached is not None:
+            return cached
+        t = super().__call__(*args, **kwargs)
+        _TYPES[key] = t
+        return t
+
+
+@dataclass(frozen=True, eq=False)
+class Type(metaclass=_Interned):
     name: str
+    _KIND = K_NAMED
+
+    def __post_init__(self) -> None:
+        # kind no es campo del dataclass: no entra en la clave de internado
+        kind = type(self)._KIND
+        if kind == K_NAMED:
+            kind = _PRIMITIVE_KINDS.get(self.name, K_NAMED)
+        object.__setattr__(self, "kind", kind)
+
     def __str__(self) -> str: return self.name
     def is_primitive(self) -> bool:
         return self.name in {T_INTEGER, T_STRING, T_BOOLEAN, T_NULL, T_VOID}
 
-@dataclass(frozen=True)
+    def _fields(self) -> tuple:
+        return tuple(getattr(self, f) for f in self.__dataclass_fields__)
+
+    @classmethod
+    def _key(cls, args: tuple, kwargs: dict) -> tuple:
+        # Los _fields() que tendría el tipo, sacados de los argumentos sin
+        # construirlo; si faltan o sobran, el constructor da el TypeError
+        rest = list(cls.__dataclass_fields__.values())[len(args):]
+        return tuple(args) + tuple(kwargs.get(f.name, f.default) for f in rest)
+
+    def __reduce__(self):
+        # pickle/copy reconstruyen pasando por la metaclase (y el internado)
+        return (type(self), self._fields())
+
+@dataclass(frozen=True, eq=False)
 class ArrayType(Type):
     elem: Type | None = None
     dims: int = 1
+    _KIND = K_ARRAY
     def __str__(self) -> str:
         if self.elem is None:
             return "[]"
         return f"{self.elem}{'[]'*self.dims}"
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, eq=False)
 class FunctionType(Type):
     params: Tuple[Type, ...] = ()
     ret: Type = Type(T_VOID)
+    _KIND = K_FUNCTION
     def __str__(self) -> str:
         args = ", ".join(str(p) for p in self.params)
         return f"({args}) -> {self.ret}"
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, eq=False)
 class ClassType(Type):
-    pass
+    _KIND = K_CLASS
 
 
 INTEGER = Type(T_INTEGER)
@@ -55,15 +116,30 @@ def is_string(t: Type) -> bool:  return t.name == T_STRING
 def equal_types(a: Optional[Type], b: Optional[Type]) -> bool:
     if a is None or b is None:
         return False
+    if a is b:   # tipos internados
+        return True
     if isinstance(a, ArrayType) and isinstance(b, ArrayType):
         return a.dims == b.dims and equal_types(a.elem, b.elem)
     return a.name == b.name
 
+# Atajos para no reconstruir el tipo en cada anotación/llamada
+_ARRAYS: "WeakValueDictionary[tuple, ArrayType]" = WeakValueDictionary()
+_FNS: "WeakValueDictionary[tuple, FunctionType]" = WeakValueDictionary()
+
 def make_array(elem: Type, dims: int = 1) -> ArrayType:
-    return ArrayType(name=f"{elem.name}{'[]'*dims}", elem=elem, dims=dims)
+    t = _ARRAYS.get((elem, dims))
+    if t is None:
+        t = ArrayType(name=f"{elem.name}{'[]'*dims}", elem=elem, dims=dims)
+        _ARRAYS[(elem, dims)] = t
+    return t
 
 def make_fn(params: list[Type], ret: Type) -> FunctionType:
-    return FunctionType(name="function", params=tuple(params), ret=ret)
+    key = (tuple(params), ret)
+    t = _FNS.get(key)
+    if t is None:
+        t = FunctionType(name="function", params=key[0], ret=ret)
+        _FNS[key] = t
+    return t
 
 
 def can_assign(dst: Optional[Type], src: Optional[Type]) -> bool:
@@ -97,7 +173,7 @@ def arithmetic_type(lhs: Type, rhs: Type) -> Optional[Type]:
         return STRING
     return None
 
-def logical_type(lhs: Type, rhs: Type) -> Optional[Type]:
+def _logical_rule(lhs: Type, rhs: Type) -> Optional[Type]:
     if is_boolean(lhs) and is_boolean(rhs):
         return BOOLEAN
     return None
@@ -116,7 +192,13 @@ def is_array(t: Type) -> bool:
 def element_type(t: Type) -> Optional[Type]:
     return t.elem if isinstance(t, ArrayType) else None
 
-def plus_type(lhs: Type, rhs: Type) -> Optional[Type]:
+# ------------------------------------------------------------------
+# Reglas de tipado de operadores binarios. Son la especificación: a
+# partir de ellas se construye _OP_TABLE al importar el módulo, y las
+# funciones públicas (plus_type, arith_type, ...) consultan la tabla.
+# ------------------------------------------------------------------
+
+def _plus_rule(lhs: Type, rhs: Type) -> Optional[Type]:
     """
     Reglas SOLO para '+':
       - integer + integer -> integer
@@ -131,7 +213,7 @@ def plus_type(lhs: Type, rhs: Type) -> Optional[Type]:
         return STRING
     return None
 
-def arith_type(lhs: Type, rhs: Type) -> Optional[Type]:
+def _arith_rule(lhs: Type, rhs: Type) -> Optional[Type]:
     """
     Reglas para '-', '*', '/', '%': solo integer con integer.
     """
@@ -139,7 +221,7 @@ def arith_type(lhs: Type, rhs: Type) -> Optional[Type]:
         return INTEGER
     return None
 
-def relational_type(lhs: Type, rhs: Type) -> Optional[Type]:
+def _relational_rule(lhs: Type, rhs: Type) -> Optional[Type]:
     """
     Reglas para '<', '<=', '>', '>=': solo numéricos.
     """
@@ -147,7 +229,7 @@ def relational_type(lhs: Type, rhs: Type) -> Optional[Type]:
         return BOOLEAN
     return None
 
-def equality_type(lhs: Type, rhs: Type) -> Optional[Type]:
+def _equality_rule(lhs: Type, rhs: Type) -> Optional[Type]:
     """
     Reglas para '==' y '!=':
     - Tipos iguales -> boolean
@@ -164,4 +246,93 @@ def equality_type(lhs: Type, rhs: Type) -> Optional[Type]:
     # pero por claridad:
     if is_numeric(lhs) and is_numeric(rhs):
         return BOOLEAN
-    return None
\ No newline at end of file
+    return None
+
+
+_OP_RULES = {
+    "+": _plus_rule,
+    "-": _arith_rule, "*": _arith_rule, "/": _arith_rule, "%": _arith_rule,
+    "<": _relational_rule, "<=": _relational_rule, ">": _relational_rule, ">=": _relational_rule,
+    "==": _equality_rule, "!=": _equality_rule,
+    "&&": _logical_rule, "||": _logical_rule,
+}
+
+# Código de error que reporta el TypeChecker para cada operador
+OP_ERRORS = {
+    "+": "E_ARITH", "-": "E_ARITH", "*": "E_ARITH", "/": "E_ARITH", "%": "E_ARITH",
+    "<": "E_REL", "<=": "E_REL", ">": "E_REL", ">=": "E_REL",
+    "==": "E_EQ", "!=": "E_EQ",
+    "&&": "E_LOGIC", "||": "E_LOGIC",
+}
+
+# Tipos representativos de cada clase de tipo (varios donde el resultado
+# puede depender de algo más que la clase: elemento/dimensiones, nombre).
+KIND_SAMPLES = {
+    K_INTEGER: (INTEGER,),
+    K_STRING: (STRING,),
+    K_BOOLEAN: (BOOLEAN,),
+    K_NULL: (NULL,),
+    K_VOID: (VOID,),
+    K_ARRAY: (make_array(INTEGER), make_array(INTEGER, 2), make_array(STRING)),
+    K_CLASS: (ClassType("A"), ClassType("B")),
+    K_NAMED: (Type("A"), Type("B")),
+    K_FUNCTION: (make_fn([INTEGER], VOID), make_fn([], INTEGER)),
+}
+
+# Marca de la tabla: boolean si equal_types(lhs, rhs), error si no
+# (== / != entre referencias de la misma clase, p. ej. dos arreglos).
+_IF_EQUAL = object()
+
+
+def _build_op_table() -> dict:
+    table = {}
+    for op, rule in _OP_RULES.items():
+        for lk in KINDS:
+            for rk in KINDS:
+                results = {rule(l, r) for l in KIND_SAMPLES[lk] for r in KIND_SAMPLES[rk]}
+                if len(results) == 1:
+                    res = results.pop()
+                    table[(op, lk, rk)] = res if res is not None else OP_ERRORS[op]
+                else:
+                    assert results == {BOOLEAN, None} and rule is _equality_rule, (op, lk, rk)
+                    table[(op, lk, rk)] = _IF_EQUAL
+    return table
+
+
+_OP_TABLE = _build_op_table()
+
+
+def binary_type(op: str, lhs: Type, rhs: Type) -> Type | str:
+    """
+    Tipo resultante de `lhs op rhs`, o el código de error (str) si la
+    operación no es válida. Una consulta a _OP_TABLE por (op, kind, kind).
+    """
+    res = _OP_TABLE[(op, lhs.kind, rhs.kind)]
+    if res is _IF_EQUAL:
+        return BOOLEAN if equal_types(lhs, rhs) else OP_ERRORS[op]
+    return res
+
+
+def _typed(op: str, lhs: Type, rhs: Type) -> Optional[Type]:
+    res = binary_type(op, lhs, rhs)
+    return None if isinstance(res, str) else res
+
+def plus_type(lhs: Type, rhs: Type) -> Optional[Type]:
+    """'+': integer + integer -> integer; con algún string -> string (concatenación)."""
+    return _typed("+", lhs, rhs)
+
+def arith_type(lhs: Type, rhs: Type) -> Optional[Type]:
+    """'-', '*', '/', '%': solo integer con integer."""
+    return _typed("-", lhs, rhs)
+
+def relational_type(lhs: Type, rhs: Type) -> Optional[Type]:
+    """'<', '<=', '>', '>=': solo numéricos."""
+    return _typed("<", lhs, rhs)
+
+def equality_type(lhs: Type, rhs: Type) -> Optional[Type]:
+    """'==' y '!=': tipos iguales, o null con una referencia (arreglo, clase, string)."""
+    return _typed("==", lhs, rhs)
+
+def logical_type(lhs: Type, rhs: Type) -> Optional[Type]:
+    """'&&' y '||': boolean con boolean."""
+    return _typed("&&", lhs, rhs)
@@ -0,0 +1,53 @@
+import pytest
+from program.frontend import nodes as N
+from program.frontend.deep import run_deep
+from program.frontend.parsing import parse_source
+from program.frontend.lowering import lower_program
+from program.semantic.error_reporter import ErrorReporter
+from program.semantic.type_checker import TypeChecker
+
+
+def _compile(code):
+    rep = ErrorReporter()
+    TypeChecker(rep).visit(lower_program(parse_source(code).tree))
+    return [str(e) for e in rep]
+
+
+def test_deeply_nested_program_in_deep_mode():
+    d = 600
+    code = ("let a: integer = 1;\n"
+            "let x: integer = " + "(" * d + "a" + ")" * d + ";\n"
+            + "if (a > 0) {\n" * d + "a = a + true;\n" + "}\n" * d)
+    with pytest.raises(RecursionError):
+        _compile(code)
+    errors = run_deep(_compile, code)
+    assert errors[0] == f"[{d + 3}:4] E_ARITH: Operación inválida: integer + boolean"
+
+
+def test_unary_chain_is_checked_in_a_loop():
+    # 5000 operadores: sin loop superaría el límite de recursión por defecto
+    expr = N.IdentifierExpr("a", 1, 0)
+    for i in range(5000):
+        expr = N.UnaryExpr("-", expr, 1, 0)
+    bad = N.UnaryExpr("!", expr, 1, 0)
+    prog = N.Program((
+        N.VariableDeclaration("a", N.TypeRef("integer", 0), N.LiteralExpr(N.LIT_INTEGER, 1)),
+        N.PrintStatement(bad),
+    ))
+    rep = ErrorReporter()
+    TypeChecker(rep).visit(prog)
+    assert [e.code for e in rep] == ["E_UNARY"]
+
+
+def test_unary_chain_errors_match_nested_operators():
+    assert _compile("let b: boolean = true;\nprint(- - b);") == [
+        "[2:8] E_UNARY: Operador '-' solo válido para integer, no boolean",
+        "[2:6] E_UNARY: Operador '-' solo válido para integer, no void",
+    ]
+
+
+def test_run_deep_propagates_errors():
+    def boom():
+        raise ValueError("x")
+    with pytest.raises(ValueError):
+        run_deep(boom)
@@ -0,0 +1,74 @@
+import sys
+from program.frontend.parsing import parse_source
+from program.frontend.lowering import lower_program
+from program.frontend import nodes as N
+
+
+def lower(code: str) -> N.Program:
+    return lower_program(parse_source(code).tree)
+
+
+def test_nodes_have_no_dict():
+    prog = lower("let x: integer = 1 + 2;")
+    decl = prog.body[0]
+    assert isinstance(decl, N.VariableDeclaration)
+    assert not hasattr(decl, "__dict__")
+    assert not hasattr(decl.init, "__dict__")
+
+
+def test_identifiers_are_interned_and_positions_kept():
+    prog = lower("let cuenta: integer = 0;\n  cuenta = cuenta + 1;")
+    decl, assign = prog.body
+    assert decl.name is sys.intern("cuenta")
+    assert assign.name is decl.name
+    assert (decl.line, decl.col) == (1, 0)
+    assert (assign.line, assign.col) == (2, 2)
+    assert decl.type.name == "integer" and decl.type.dims == 0
+
+
+def test_precedence_chain_is_collapsed():
+    prog = lower("print(1 + 2 * 3 - 4);")
+    expr = prog.body[0].expr
+    # sin nodos intermedios de una sola rama (expression, primaryExpr, ...)
+    assert isinstance(expr, N.AdditiveExpr)
+    assert expr.ops == ("+", "-")
+    assert isinstance(expr.operands[0], N.LiteralExpr) and expr.operands[0].value == 1
+    assert isinstance(expr.operands[1], N.MultiplicativeExpr)
+    assert isinstance(lower("print((x));").body[0].expr, N.IdentifierExpr)
+
+
+def test_left_hand_side_suffixes():
+    prog = lower("print(obj.items[0].size());")
+    lhs = prog.body[0].expr
+    assert isinstance(lhs, N.LeftHandSide)
+    assert isinstance(lhs.atom, N.IdentifierExpr) and lhs.atom.name == "obj"
+    assert [type(s) for s in lhs.suffixes] == [
+        N.PropertyAccessExpr, N.IndexExpr, N.PropertyAccessExpr, N.CallExpr]
+
+
+def test_for_parts_and_literals():
+    prog = lower('for (;; i = i + 1) { print("a"); }')
+    loop = prog.body[0]
+    assert loop.init is None and loop.cond is None
+    assert isinstance(loop.step, N.AssignExpr)
+    lit = loop.body.body[0].expr
+    assert lit.kind == N.LIT_STRING and lit.value == "a"
+
+
+def test_wrappers_parens_unary_and_ternary_lower_directly():
+    expr = lower("print(((-(a)) ? !b : (c || d)));").body[0].expr
+    assert isinstance(expr, N.TernaryExpr)
+    assert isinstance(expr.cond, N.UnaryExpr) and isinstance(expr.cond.operand, N.IdentifierExpr)
+    assert isinstance(expr.then, N.UnaryExpr) and expr.then.op == "!"
+    assert isinstance(expr.orelse, N.LogicalOrExpr)
+
+
+def test_visitor_dispatch_table():
+    class Counter(N.NodeVisitor):
+        def visitProgram(self, node):
+            return [self.visit(s) for s in node.body]
+        def visitPrintStatement(self, node):
+            return type(node.expr).__name__
+    v = Counter()
+    assert v.visit(lower("print(1); print(x);")) == ["LiteralExpr", "IdentifierExpr"]
+    assert v._dispatch[N.PrintStatement] == v.visitPrintStatement
@@ -0,0 +1,47 @@
+from antlr4.error.ErrorListener import ErrorListener
+from program.frontend.parsing import parse_source, PARSE_SLL, PARSE_SLL_LL, PARSE_LL
+
+
+class _Collect(ErrorListener):
+    def __init__(self):
+        self.msgs = []
+
+    def syntaxError(self, recognizer, offendingSymbol, line, column, msg, e):
+        self.msgs.append((line, column, msg))
+
+
+OK_CODE = """
+let x: integer = 1 + 2 * 3;
+function f(a: integer): integer { return a + x; }
+print(f(4));
+"""
+
+BAD_CODE = """
+let x: integer = ;
+print(x
+"""
+
+
+def test_valid_program_uses_sll():
+    res = parse_source(OK_CODE)
+    assert res.mode == PARSE_SLL
+    assert res.parser.getNumberOfSyntaxErrors() == 0
+    assert res.elapsed >= 0
+
+
+def test_force_ll():
+    res = parse_source(OK_CODE, force_ll=True)
+    assert res.mode == PARSE_LL
+    assert res.tree.toStringTree(recog=res.parser) == parse_source(OK_CODE).tree.toStringTree(recog=res.parser)
+
+
+def test_syntax_error_falls_back_to_ll_with_same_errors(capsys):
+    two_stage = parse_source(BAD_CODE)
+    err_two_stage = capsys.readouterr().err
+    ll = parse_source(BAD_CODE, force_ll=True)
+    err_ll = capsys.readouterr().err
+
+    assert two_stage.mode == PARSE_SLL_LL
+    assert two_stage.parser.getNumberOfSyntaxErrors() == ll.parser.getNumberOfSyntaxErrors() > 0
+    assert err_two_stage == err_ll
+    assert two_stage.tree.toStringTree(recog=two_stage.parser) == ll.tree.toStringTree(recog=ll.parser)
@@ -0,0 +1,111 @@
+import pytest
+from program.frontend.parsing import parse_source
+from program.frontend.lowering import lower_program
+from program.semantic.type_checker import TypeChecker
+from program.semantic.error_reporter import ErrorReporter
+from program.ir.tac_builder import TACBuilder
+from program.ir.tac_ir import TACProgram, ColumnarTACProgram, Quadruple, Op, Const, Var, Label
+from program.ir.cfg import build_cfg
+
+
+def emit(code, tac=None):
+    reporter, builder = ErrorReporter(), TACBuilder(tac)
+    TypeChecker(reporter, builder).visit(lower_program(parse_source(code).tree))
+    assert not reporter.has_errors()
+    return builder.tac
+
+
+LOOP = '''
+    function uno(): integer { return 1; }
+    let i: integer = 0;
+    while (i < 3) { i = i + uno(); }
+    print(i);
+'''
+
+
+def test_blocks_edges_and_labels():
+    cfg = build_cfg(emit(LOOP))
+    # B0 goto Lfunc_end | B1 uno: ret | B2 Lfunc_end: i := 0 | B3 Lwhile_start: ... ifgoto
+    # B4 goto Lwhile_end | B5 Lwhile_body: ... goto start | B6 Lwhile_end: print
+    assert len(cfg) == 7
+    start, body, end = (cfg.by_label[cfg.pool.label(n)] for n in ("Lwhile_start1", "Lwhile_body2", "Lwhile_end3"))
+    assert cfg.succ[start] == [body, start + 1]
+    assert cfg.succ[body] == [start]
+    assert sorted(cfg.pred[start]) == [2, body]
+    assert cfg.succ[1] == []                 # ret
+    assert cfg.entries == [0, cfg.by_label[cfg.pool.label("F_uno_0")]]
+    assert cfg.blocks[end].terminator is None
+    assert cfg.to_program().dump() == emit(LOOP).dump()
+
+
+def test_rpo_puts_dominators_first():
+    cfg = build_cfg(emit(LOOP, ColumnarTACProgram()))
+    num = cfg.rpo_number
+    start, body, end = (cfg.by_label[cfg.pool.label(n)] for n in ("Lwhile_start1", "Lwhile_body2", "Lwhile_end3"))
+    assert num[0] == 0
+    assert num[2] < num[start] < num[body]
+    assert num[start] < num[end]
+    assert all(n >= 0 for n in num)
+    assert sorted(cfg.rpo) == list(range(len(cfg)))
+
+
+def test_update_keeps_graph_in_sync():
+    p = TACProgram()
+    p.emit("ifgoto", Var("c"), None, Label("L0"))   # B0
+    p.emit("print", Const(1))                        # B1
+    p.emit("goto", None, None, Label("L1"))
+    p.label(Label("L0"))                             # B2
+    p.emit("print", Const(2))
+    p.label(Label("L1"))                             # B3
+    p.emit("ret")
+    cfg = build_cfg(p)
+    assert cfg.succ == [[2, 1], [3], [3], []]
+
+    # el bloque B2 pierde su label: el salto de B0 queda sin destino
+    cfg.blocks[2].code = cfg.blocks[2].code[1:]
+    cfg.update(2)
+    L0 = p.pool.label("L0")
+    assert L0 not in cfg.by_label
+    assert cfg.succ[0] == [1] and cfg.pred[2] == []
+    assert not cfg.reachable(2)
+
+    # B3 vuelve a definir L0 además de L1
+    cfg.blocks[3].code.insert(0, Quadruple(Op.LABEL, dst=L0))
+    cfg.update(3)
+    assert cfg.by_label[L0] == 3
+    assert cfg.succ[0] == [3, 1]
+    assert sorted(cfg.pred[3]) == [0, 1, 2]
+
+    cfg.clear_block(1)
+    assert cfg.succ[1] == [2] and cfg.blocks[1].code == []
+    assert cfg.rpo_number[2] >= 0
+
+
+def test_idom_follows_branches_and_loops():
+    cfg = build_cfg(emit(LOOP))
+    start, body, end = (cfg.by_label[cfg.pool.label(n)] for n in ("Lwhile_start1", "Lwhile_body2", "Lwhile_end3"))
+    idom = cfg.idom
+    assert idom[0] == -1 and idom[1] == -1       # entradas
+    assert idom[2] == 0
+    assert idom[start] == 2
+    # Lwhile_end se alcanza solo por el 'goto Lwhile_end' de la salida del ciclo
+    exit_, = (b for b in cfg.pred[end]
+              if cfg.blocks[b].terminator is not None and cfg.blocks[b].terminator.op is Op.GOTO)
+    assert idom[body] == start and idom[exit_] == start and idom[end] == exit_
+
+
+def test_label_defined_twice_is_rejected():
+    p = TACProgram()
+    p.label(Label("h"))
+    p.emit("ret", Const(1))
+    p.label(Label("h"))
+    p.emit("ret", Const(2))
+    with pytest.raises(ValueError):
+        build_cfg(p)
+
+    # update: el bloque B1 pasa a definir también h
+    p.code[2] = Quadruple(Op.LABEL, dst=p.pool.label("g"))
+    cfg = build_cfg(p)
+    cfg.blocks[1].code.insert(0, Quadruple(Op.LABEL, dst=p.pool.label("h")))
+    with pytest.raises(ValueError):
+        cfg.update(1)
@@ -0,0 +1,57 @@
+from program.frontend.parsing import parse_source
+from program.frontend.lowering import lower_program
+from program.semantic.type_checker import TypeChecker
+from program.semantic.error_reporter import ErrorReporter
+from program.ir.tac_builder import TACBuilder
+from program.ir.tac_ir import TACProgram, ColumnarTACProgram, Op, Const, Var, Label
+
+SRC = '''
+    function uno(): integer { return 1; }
+    let i: integer = 0;
+    let ok: boolean = true && i < 3;
+    while (i < 3) { i = i + uno(); if (i == 2) { break; } }
+    print("i=" + i);
+'''
+
+
+def emit_with(tac):
+    reporter = ErrorReporter()
+    builder = TACBuilder(tac)
+    TypeChecker(reporter, builder).visit(lower_program(parse_source(SRC).tree))
+    assert not reporter.has_errors()
+    return builder.tac
+
+
+def test_dump_matches_list_storage():
+    rows = emit_with(TACProgram())
+    cols = emit_with(ColumnarTACProgram())
+    assert len(cols) == len(rows)
+    assert cols.dump() == rows.dump()
+    assert [repr(q) for q in cols] == [repr(q) for q in rows.code]
+    assert cols.to_program().dump() == rows.dump()
+    assert ColumnarTACProgram.from_program(rows).dump() == rows.dump()
+
+
+def test_operands_shared_and_bool_consts_kept_apart():
+    p = ColumnarTACProgram()
+    assert p.emit(":=", Const(1), None, Var("x")) == 0
+    assert p.emit(":=", Const(True), None, Var("x")) == 1
+    assert p.a[0] != p.a[1]
+    assert p.dst[0] == p.dst[1]
+    assert p.dump() == "x := 1\nx := true"
+
+
+def test_columns_scan_without_quadruples():
+    p = ColumnarTACProgram()
+    p.label(Label("L0"))
+    p.emit("goto", None, None, Label("L0"))
+    p.emit("print", Const(2))
+    p.emit("goto", None, None, Label("L0"))
+    ops, a, b, dst = p.columns()
+    assert [i for i, op in enumerate(ops) if op == Op.GOTO] == [1, 3]
+    assert {p.operands[dst[i]] for i in (0, 1, 3)} == {p.pool.label("L0")}
+    assert b[2] == 0
+    for view in (ops, a, b, dst):
+        view.release()
+    p.emit("ret")
+    assert p[4].op is Op.RET
@@ -0,0 +1,96 @@
+from program.frontend.parsing import parse_source
+from program.frontend.lowering import lower_program
+from program.semantic.type_checker import TypeChecker
+from program.semantic.error_reporter import ErrorReporter
+from program.ir.tac_builder import TACBuilder
+from program.ir.tac_ir import TACProgram, ColumnarTACProgram, OperandPool, Op, Const, Var, Temp, Label
+from program.ir.cfg import build_cfg
+from program.ir.constprop import fold, propagate_constants
+from program.ir.optimize import optimize
+
+
+def emit(code, tac=None):
+    reporter, builder = ErrorReporter(), TACBuilder(tac)
+    TypeChecker(reporter, builder).visit(lower_program(parse_source(code).tree))
+    assert not reporter.has_errors()
+    return builder.tac
+
+
+def lines(program):
+    return [l.strip() for l in program.dump().splitlines()]
+
+
+def test_fold_integer_semantics():
+    pool = OperandPool()
+    assert fold(Op.ADD, 2, 3, pool) is pool.const(5)
+    assert fold(Op.DIV, -7, 2, pool) is pool.const(-3)      # trunca hacia cero
+    assert fold(Op.MOD, -7, 2, pool) is pool.const(-1)      # signo del dividendo
+    assert fold(Op.DIV, 1, 0, pool) is None
+    assert fold(Op.MUL, 2**30, 4, pool) is None        # desborda 32 bits
+    assert fold(Op.LT, 1, 2, pool) is pool.const(1)
+    assert fold(Op.EQ, True, True, pool) is pool.const(1)
+    assert fold(Op.EQ, "a", "a", pool) is None
+    assert fold(Op.CONCAT, "n=", 3, pool) is pool.const("n=3")
+    assert fold(Op.PRINT, 1, 2, pool) is None
+
+
+def test_propagates_through_straight_line_code():
+    out, stats = optimize(emit('''
+        let a: integer = 3 + 4;
+        let b: integer = a * 2;
+        let s: string = "b=" + b;
+        print(s);
+    '''), ("const",))
+    text = lines(out)
+    assert "b := 14" in text
+    assert 's := "b=14"' in text
+    assert 'print "b=14"' in text
+    assert stats["const"] > 0
+
+
+def test_constant_condition_becomes_goto():
+    p = TACProgram()
+    p.emit(Op.COPY, Const(1), None, Var("c"))
+    p.emit(Op.IFGOTO, Var("c"), None, Label("L0"))
+    p.emit(Op.PRINT, Const("no"))
+    p.label(Label("L0"))
+    p.emit(Op.PRINT, Const("si"))
+    cfg = build_cfg(p)
+    assert propagate_constants(cfg) == 1
+    assert cfg.blocks[0].terminator.op is Op.GOTO
+    assert not cfg.reachable(1)
+
+    p = TACProgram()
+    p.emit(Op.LT, Const(2), Const(1), Temp("t0"))
+    p.emit(Op.IFGOTO, Temp("t0"), None, Label("L0"))
+    p.emit(Op.PRINT, Const("si"))
+    p.label(Label("L0"))
+    cfg = build_cfg(p)
+    propagate_constants(cfg)
+    assert [q.op for q in cfg.blocks[0].code] == [Op.COPY]
+    assert cfg.succ[0] == [1]
+
+
+def test_loop_carried_and_call_clobbered_values_stay():
+    src = '''
+        function uno(): integer { return 1; }
+        let i: integer = 0;
+        let k: integer = 5;
+        while (i < 3) { i = i + 1; }
+        print(i);
+        print(k + 1);
+        uno();
+        print(k);
+    '''
+    text = lines(optimize(emit(src, ColumnarTACProgram()), ("const",))[0])
+    assert "print i" in text             # i cambia en el ciclo
+    assert "< i, 3 -> t0" in text
+    assert "print 6" in text             # k sigue constante hasta la llamada
+    assert text[-1] == "print k"         # una call puede cambiar globales
+
+
+def test_optimize_keeps_representation():
+    prog = emit("let a: integer = 1; print(a + 1);", ColumnarTACProgram())
+    out, _ = optimize(prog, ("const",))
+    assert isinstance(out, ColumnarTACProgram)
+    assert "print 2" in lines(out)
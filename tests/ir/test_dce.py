@@ -0,0 +1,78 @@
+from program.frontend.parsing import parse_source
+from program.frontend.lowering import lower_program
+from program.semantic.type_checker import TypeChecker
+from program.semantic.error_reporter import ErrorReporter
+from program.ir.tac_builder import TACBuilder
+from program.ir.tac_ir import TACProgram, ColumnarTACProgram, Op, Const, Var, Temp, Addr, Label
+from program.ir.cfg import build_cfg
+from program.ir.dce import eliminate_dead_code
+from program.ir.optimize import optimize
+
+
+def emit(code, tac=None):
+    reporter, builder = ErrorReporter(), TACBuilder(tac)
+    TypeChecker(reporter, builder).visit(lower_program(parse_source(code).tree))
+    assert not reporter.has_errors()
+    return builder.tac
+
+
+def lines(program):
+    return [l.strip() for l in program.dump().splitlines()]
+
+
+def test_removes_code_after_ret_and_uncalled_functions():
+    p = TACProgram()
+    p.emit(Op.GOTO, None, None, Label("Lend"))
+    p.label(Label("f"))
+    p.emit(Op.RET, Const(1))
+    p.emit(Op.PRINT, Const("muerto"))        # después de ret
+    p.label(Label("g"))                       # nadie llama a g
+    p.emit(Op.RET, Const(2))
+    p.label(Label("Lend"))
+    p.emit(Op.CALL, Label("f"), Const(0), Temp("t0"))
+    p.emit(Op.PRINT, Temp("t0"))
+    cfg = build_cfg(p)
+    assert eliminate_dead_code(cfg) == 3
+    assert lines(cfg.to_program()) == [
+        "goto Lend", "f:", "ret 1", "Lend:", "call f, nargs=0 -> t0", "print t0",
+    ]
+
+
+def test_goto_chains_are_threaded_and_jumps_to_next_dropped():
+    src = '''
+        let k: integer = 4;
+        if (k > 2) { print("big"); } else { print("small"); }
+        while (true) { print(k); break; }
+        print("fin");
+    '''
+    out, stats = optimize(emit(src))
+    text = lines(out)
+    assert not any(l.startswith("goto") or l.startswith("if") for l in text)
+    assert [l for l in text if l.startswith("print")] == ['print "big"', "print 4", 'print "fin"']
+    assert "k := 4" not in text                # k solo se usa en el principal y ya se propagó
+    assert stats["dce"] > 0
+
+
+def test_dead_stores_keep_side_effects_and_shared_vars():
+    src = '''
+        let g: integer = 1;
+        function f(): integer { let x: integer = g; let y: integer = 3; g = x + 1; return x; }
+        let z: integer = f();
+        let w: integer = z * 2;
+        print(g);
+    '''
+    text = lines(optimize(emit(src, ColumnarTACProgram()), ("dce",))[0])
+    assert "g := 1" in text                    # la lee f
+    assert "y := 3" not in text                # local de f sin uso
+    assert "call F_f_0, nargs=0 -> t0" in text     # call se queda aunque z no se use
+    assert not any(l.startswith("w :=") or l.startswith("*") for l in text)
+
+
+def test_stores_through_addr_stay():
+    p = TACProgram()
+    p.emit(Op.COPY, Const(0), None, Temp("t0"))
+    p.emit(Op.COPY, Const(7), None, Addr(Temp("t0"), 4))
+    p.emit(Op.COPY, Const(9), None, Var("muerta"))
+    cfg = build_cfg(p)
+    assert eliminate_dead_code(cfg) == 1
+    assert lines(cfg.to_program()) == ["t0 := 0", "&(t0+4) := 7"]
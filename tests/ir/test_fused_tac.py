@@ -0,0 +1,176 @@
+import textwrap
+from program.frontend.parsing import parse_source
+from program.frontend.lowering import lower_program
+from program.semantic.type_checker import TypeChecker
+from program.semantic.error_reporter import ErrorReporter
+from program.ir.tac_builder import TACBuilder
+from program.ir.optimize import optimize
+from tests.ir.util_tac import normalize_tac
+
+
+def check_and_emit(code: str):
+    reporter = ErrorReporter()
+    builder = TACBuilder()
+    TypeChecker(reporter, builder).visit(lower_program(parse_source(code).tree))
+    return reporter, builder.tac.dump()
+
+
+def test_plus_uses_checked_types():
+    rep, tac = check_and_emit('''
+        let n: integer = 1 + 2;
+        print("n=" + n);
+    ''')
+    assert not rep.has_errors()
+    assert normalize_tac(tac) == normalize_tac(textwrap.dedent('''
+        + 1, 2 -> t0
+        n := t0
+        concat "n=", n -> t0
+        print t0
+    '''))
+
+
+def test_while_break_and_call():
+    rep, tac = check_and_emit('''
+        function uno(): integer { return 1; }
+        let i: integer = 0;
+        while (i < 3) { i = i + uno(); if (i == 2) { break; } }
+    ''')
+    assert not rep.has_errors()
+    lines = normalize_tac(tac).splitlines()
+    assert lines[:4] == ["goto Lfunc_end0", "F_uno_0:", "ret 1", "Lfunc_end0:"]
+    assert "call F_uno_0, nargs=0 -> t0" in lines   # el t0 de la condición ya murió
+    assert "goto Lwhile_end3" in lines
+
+
+def test_switch_break_jumps_to_switch_end():
+    rep, tac = check_and_emit('''
+        let x: integer = 2;
+        switch (x) { case 1: print("uno"); break; default: print("otro"); }
+    ''')
+    assert not rep.has_errors()
+    lines = normalize_tac(tac).splitlines()
+    assert lines[lines.index('print "uno"') + 1] == "goto Lswitch_end0"
+
+
+def test_emission_stops_after_first_error():
+    rep, tac = check_and_emit('''
+        print(1);
+        let s: string = 5;
+        print(2);
+    ''')
+    assert rep.has_errors()
+    assert normalize_tac(tac) == "print 1"
+
+
+def test_same_diagnostics_with_and_without_builder():
+    code = '''
+        let a: integer = "x";
+        if (a) { print(b); }
+        while (true) { continue; }
+    '''
+    rep, _ = check_and_emit(code)
+    plain = ErrorReporter()
+    TypeChecker(plain).visit(lower_program(parse_source(code).tree))
+    assert [str(e) for e in rep] == [str(e) for e in plain]
+
+
+def unsupported(code: str):
+    reporter = ErrorReporter()
+    builder = TACBuilder()
+    TypeChecker(reporter, builder).visit(lower_program(parse_source(code).tree))
+    assert not reporter.has_errors(), [str(e) for e in reporter]
+    assert not builder.complete
+    return [what for _, _, what in builder.unsupported]
+
+
+CLASS = '''
+    class P {
+      let x: integer;
+      function get(): integer { return this.x; }
+    }
+    let p: P = new P();
+'''
+
+
+def test_array_literal_marks_tac_incomplete():
+    assert unsupported("let a: integer[] = [1, 2];") == ["literal de arreglo"]
+
+
+def test_index_read_marks_tac_incomplete():
+    assert "acceso a índice" in unsupported('''
+        let a: integer[] = [1, 2];
+        let k: integer = a[1] + 1;
+    ''')
+
+
+def test_index_store_marks_tac_incomplete():
+    assert "asignación a elemento de arreglo" in unsupported('''
+        let a: integer[] = [1, 2];
+        a[0] = 3;
+    ''')
+
+
+def test_new_marks_tac_incomplete():
+    assert unsupported(CLASS) == ["new"]
+
+
+def test_property_access_marks_tac_incomplete():
+    assert unsupported(CLASS + "print(p.x);")[1:] == ["acceso a propiedad"]
+
+
+def test_property_assignment_marks_tac_incomplete():
+    assert unsupported(CLASS + "p.x = 2;")[1:] == ["asignación a propiedad"]
+
+
+def test_method_call_marks_tac_incomplete():
+    assert unsupported(CLASS + "print(p.get());")[1:] == ["llamada a método"]
+
+
+def test_foreach_marks_tac_incomplete():
+    assert unsupported('''
+        let a: integer[] = [1, 2];
+        foreach (n in a) { print(n); }
+    ''') == ["literal de arreglo", "foreach"]
+
+
+def test_try_catch_marks_tac_incomplete():
+    assert unsupported('''
+        try { print(1); } catch (e) { print(e); }
+    ''') == ["try/catch"]
+
+
+def test_same_diagnostic_order_in_for_and_switch():
+    code = '''
+        let i: integer = 0;
+        for (i = 0; i < 3; i = i - "x") { let s: string = 1; }
+        switch (i) { case 1: let t: string = 2; case "b": print(i); }
+    '''
+    rep, _ = check_and_emit(code)
+    assert rep.count() == 4
+    plain = ErrorReporter()
+    TypeChecker(plain).visit(lower_program(parse_source(code).tree))
+    assert [str(e) for e in rep] == [str(e) for e in plain]
+
+
+def test_same_named_nested_functions_get_distinct_entries():
+    code = '''
+        function a(): integer { function h(): integer { return 1; } return h(); }
+        function b(): integer { function h(): integer { return 2; } return h(); }
+        function L1(): integer { return 3; }
+        if (true) { print(a()); }
+        print(b() + L1());
+    '''
+    rep, tac = check_and_emit(code)
+    assert not rep.has_errors()
+    lines = normalize_tac(tac).splitlines()
+    entries = [l for l in lines if l.endswith(":")]
+    assert len(entries) == len(set(entries))
+    assert "F_h_1:" in lines and "F_h_3:" in lines
+    # cada llamada va a la h de su función
+    assert lines[lines.index("F_h_1:") + 1] == "ret 1"
+    assert lines[lines.index("F_h_3:") + 1] == "ret 2"
+    assert "call F_h_1, nargs=0 -> t0" in lines and "call F_h_3, nargs=0 -> t0" in lines
+    builder = TACBuilder()
+    TypeChecker(ErrorReporter(), builder).visit(lower_program(parse_source(code).tree))
+    text = optimize(builder.tac)[0].dump()      # --opt no confunde las dos h
+    assert "ret 1" in text and "ret 2" in text
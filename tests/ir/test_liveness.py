@@ -0,0 +1,65 @@
+from program.ir.tac_ir import TACProgram, ColumnarTACProgram, Const, Var, Temp, Label
+from program.ir.liveness import live_ranges, rename_temps
+from tests.ir.test_fused_tac import check_and_emit
+from tests.ir.util_tac import normalize_tac
+
+
+def straight_line(p):
+    p.emit("+", Const(1), Const(2), Temp("t0"))
+    p.emit(":=", Temp("t0"), None, Var("x"))
+    p.emit("*", Var("x"), Const(3), Temp("t1"))
+    p.emit("+", Temp("t1"), Const(1), Temp("t2"))
+    p.emit("print", Temp("t2"))
+    return p
+
+
+def test_straight_line_reuses_dead_temps():
+    p = straight_line(TACProgram())
+    assert list(live_ranges(p).values()) == [(0, 1), (2, 3), (3, 4)]
+    assert rename_temps(p) == 2
+    assert p.dump() == "\n".join([
+        "+ 1, 2 -> t0", "x := t0", "* x, 3 -> t0", "+ t0, 1 -> t1", "print t1",
+    ])
+
+
+def test_columnar_storage_same_result():
+    rows, cols = straight_line(TACProgram()), straight_line(ColumnarTACProgram())
+    assert rename_temps(rows) == rename_temps(cols)
+    assert cols.dump() == rows.dump()
+
+
+def test_value_live_across_back_edge_spans_loop():
+    p = TACProgram()
+    p.emit(":=", Const(7), None, Temp("t0"))          # 0: vivo en todo el ciclo
+    p.label(Label("L0"))                              # 1
+    p.emit("<", Var("i"), Const(3), Temp("t1"))       # 2
+    p.emit("ifgoto", Temp("t1"), None, Label("L1"))   # 3
+    p.emit("print", Temp("t0"))                       # 4
+    p.emit("goto", None, None, Label("L0"))           # 5
+    p.label(Label("L1"))                              # 6
+    ranges = live_ranges(p)
+    assert ranges[p.pool.temp("t0")] == (0, 5)
+    assert ranges[p.pool.temp("t1")] == (2, 3)
+    assert rename_temps(p) == 2
+
+
+def test_checker_output_recycles_loop_condition():
+    rep, tac = check_and_emit('''
+        let i: integer = 0;
+        while (i < 3) { i = i + 1; }
+        print(i * 2 + 1);
+    ''')
+    assert not rep.has_errors()
+    assert normalize_tac(tac).splitlines()[2:] == [
+        "< i, 3 -> t0",
+        "if t0 goto Lwhile_body1",
+        "goto Lwhile_end2",
+        "Lwhile_body1:",
+        "+ i, 1 -> t0",
+        "i := t0",
+        "goto Lwhile_start0",
+        "Lwhile_end2:",
+        "* i, 2 -> t0",
+        "+ t0, 1 -> t1",
+        "print t1",
+    ]
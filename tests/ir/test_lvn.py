@@ -0,0 +1,88 @@
+from program.frontend.parsing import parse_source
+from program.frontend.lowering import lower_program
+from program.semantic.type_checker import TypeChecker
+from program.semantic.error_reporter import ErrorReporter
+from program.ir.tac_builder import TACBuilder
+from program.ir.tac_ir import TACProgram, ColumnarTACProgram, Op, Const, Var, Temp, Addr, Label
+from program.ir.cfg import build_cfg
+from program.ir.lvn import value_numbering, global_value_numbering
+from program.ir.optimize import optimize
+
+
+def emit(code, tac=None):
+    reporter, builder = ErrorReporter(), TACBuilder(tac)
+    TypeChecker(reporter, builder).visit(lower_program(parse_source(code).tree))
+    assert not reporter.has_errors()
+    return builder.tac
+
+
+def lines(program):
+    return [l.strip() for l in program.dump().splitlines()]
+
+
+def test_commutative_recomputation_becomes_copy():
+    p = TACProgram()
+    p.emit(Op.MUL, Var("a"), Var("b"), Temp("t0"))
+    p.emit(Op.MUL, Var("b"), Var("a"), Temp("t1"))
+    p.emit(Op.SUB, Var("a"), Var("b"), Temp("t2"))
+    p.emit(Op.SUB, Var("b"), Var("a"), Temp("t3"))     # no conmutativa
+    p.emit(Op.ADD, Temp("t1"), Temp("t3"), Temp("t4"))
+    cfg = build_cfg(p)
+    assert value_numbering(cfg) == 1
+    assert lines(cfg.to_program()) == [
+        "* a, b -> t0", "t1 := t0", "- a, b -> t2", "- b, a -> t3", "+ t1, t3 -> t4",
+    ]
+
+
+def test_redefinitions_stores_and_calls_invalidate():
+    p = TACProgram()
+    p.emit(Op.ADD, Var("a"), Const(1), Temp("t0"))
+    p.emit(Op.COPY, Const(5), None, Var("a"))           # a cambia
+    p.emit(Op.ADD, Var("a"), Const(1), Temp("t1"))
+    p.emit(Op.COPY, Addr(Var("v"), 0), None, Temp("t2"))
+    p.emit(Op.COPY, Const(0), None, Addr(Var("w"), 0))   # store: la memoria ya no se conoce
+    p.emit(Op.ADD, Addr(Var("v"), 0), Const(0), Temp("t3"))
+    p.emit(Op.ADD, Temp("t2"), Const(0), Temp("t4"))
+    p.emit(Op.MUL, Var("a"), Var("a"), Temp("t5"))
+    p.emit(Op.CALL, Label("f"), Const(0), None)         # puede cambiar a
+    p.emit(Op.MUL, Var("a"), Var("a"), Temp("t6"))
+    p.emit(Op.ADD, Var("c"), Const(1), Temp("t7"))
+    p.emit(Op.ADD, Var("c"), Const(1), Temp("t7"))      # t7 ya tiene ese valor
+    cfg = build_cfg(p)
+    assert value_numbering(cfg) == 1
+    ops = [q.op for q in cfg.to_program().code]
+    assert ops.count(Op.COPY) == 3 and len(ops) == 11
+
+
+def test_global_variant_uses_dominating_blocks():
+    src = '''
+        function uno(): integer { return 1; }
+        let a: integer = uno();
+        let b: integer = uno();
+        if (a * b < 10) { print(a * b); }
+        if (a * b < 10) { print(b); }
+        while (a < 3) { a = a + 1; print(a * b); }
+        print(a * b);
+    '''
+    local = lines(optimize(emit(src), ("lvn",))[0])
+    glob, stats = optimize(emit(src, ColumnarTACProgram()), ("gvn",))
+    text = lines(glob)
+    assert isinstance(glob, ColumnarTACProgram)
+    assert local.count("* a, b -> t0") == 5
+    assert text.count("* a, b -> t0") == 4          # la del print dentro del if ya no
+    assert text.count("< t0, 10 -> t1") == 1
+    assert stats["gvn"] == 2
+    cfg = build_cfg(emit(src))
+    assert global_value_numbering(cfg) == 2
+    assert lines(cfg.to_program()) == lines(optimize(emit(src), ("gvn",))[0])
+
+
+def test_default_pipeline_runs_lvn():
+    out, stats = optimize(emit('''
+        function uno(): integer { return 1; }
+        let a: integer = uno();
+        let x: integer = (a * a + 1) * (a * a + 1);
+        print(x);
+    '''))
+    assert list(stats) == ["const", "lvn", "dce"]
+    assert lines(out).count("* a, a -> t0") == 1
@@ -89,6 +89,7 @@ def test_switch(snapshot):
         [(1, case1), (2, case2)],
         default_cb=default
     )
+    tb.finish()
     snapshot.assert_match(tb.tac.dump(), "switch_example.tac")
 
 
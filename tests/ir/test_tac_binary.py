@@ -0,0 +1,75 @@
+import pytest
+from program.ir.tac_ir import TACProgram, ColumnarTACProgram, Op, Const, Var, Temp, Label, Addr
+from program.ir.tac_binary import (
+    dump_tac, load_tac, write_tac, read_tac, TACFormatError, _HEADER,
+)
+from program.frontend.parsing import parse_source
+from program.frontend.lowering import lower_program
+from program.semantic.type_checker import TypeChecker
+from program.semantic.error_reporter import ErrorReporter
+from program.ir.tac_builder import TACBuilder
+
+
+def sample(p):
+    p.emit(":=", Const("x"), None, Var("x"))
+    p.emit(":=", Const(1), None, Temp("t0"))
+    p.emit(":=", Const(True), None, Temp("t1"))
+    p.emit("+", Const(2**70), Const(1.5), Temp("t2"))
+    p.emit(":=", Const(None), None, Addr(Var("obj"), 8))
+    p.emit("concat", Const("ñandú \"q\""), Const(""), Temp("t3"))
+    p.emit("ifgoto", Temp("t1"), None, Label("L0"))
+    p.emit("call", Label("f"), Const(0), None)
+    p.label(Label("L0"))
+    p.emit("ret")
+    return p
+
+
+@pytest.mark.parametrize("storage", [TACProgram, ColumnarTACProgram])
+def test_round_trip_keeps_operand_kinds(storage):
+    src = sample(storage())
+    loaded = load_tac(dump_tac(src))
+    assert len(loaded) == len(src)
+    assert loaded.dump() == src.dump()
+    q = loaded[0]
+    assert type(q.a) is Const and q.a.value == "x" and type(q.dst) is Var
+    assert loaded[2].a.value is True
+    assert loaded[3].a.value == 2**70 and repr(loaded[4].dst) == "&(obj+8)"
+    assert [q.op for q in loaded][-2:] == [Op.LABEL, Op.RET]
+
+
+def test_mmap_file_and_columns(tmp_path):
+    src = sample(TACProgram())
+    path = str(tmp_path / "p.ctac")
+    write_tac(path, src)
+    with read_tac(path) as prog:
+        assert prog.dump() == src.dump()
+        ops, a, b, dst = prog.columns()
+        assert [i for i, op in enumerate(ops) if op == Op.LABEL] == [8]
+        copy = prog.to_columnar()
+        with pytest.raises(TypeError):
+            prog.emit("ret")
+    copy.emit("print", Const(1))
+    assert copy.dump() == src.dump() + "\nprint 1"
+
+
+def test_checker_output_round_trip():
+    reporter, builder = ErrorReporter(), TACBuilder()
+    TypeChecker(reporter, builder).visit(lower_program(parse_source('''
+        function uno(): integer { return 1; }
+        let s: string = "n=" + (uno() * 2);
+        while (uno() < 2) { print(s); }
+    ''').tree))
+    assert not reporter.has_errors()
+    assert load_tac(dump_tac(builder.tac)).dump() == builder.tac.dump()
+
+
+def test_rejects_bad_input():
+    data = dump_tac(sample(TACProgram()))
+    with pytest.raises(TACFormatError):
+        load_tac(b"NOPE" + data[4:])
+    with pytest.raises(TACFormatError):
+        load_tac(data[:-3])
+    header = bytearray(data)
+    _HEADER.pack_into(header, 0, b"CTAC", 99, *_HEADER.unpack_from(data)[2:])
+    with pytest.raises(TACFormatError):
+        load_tac(bytes(header))
@@ -1,5 +1,5 @@
 import unittest
-from program.ir.tac_ir import TACProgram, Const
+from program.ir.tac_ir import TACProgram, Op, Const, Var, Temp, Label, OperandPool
 from program.ir.temp_alloc import TempAllocator
 from program.ir.label_mgr import LabelManager
 
@@ -9,13 +9,22 @@ class TestTACCore(unittest.TestCase):
         p.emit('print', Const(1))
         self.assertIn('print 1', p.dump())
 
-    def test_temp_recycle(self):
+    def test_opcodes(self):
+        p = TACProgram()
+        p.emit('<=', Var('a'), Const(1), Temp('t0'))
+        p.emit(Op.IFGOTO, Temp('t0'), None, Label('L0'))
+        self.assertEqual([q.op for q in p], [Op.LE, Op.IFGOTO])
+        self.assertEqual(p.dump(), '<= a, 1 -> t0\nif t0 goto L0')
+        self.assertTrue(Op.IFGOTO.terminator and not Op.IFGOTO.defines)
+        self.assertTrue(Op.CALL.defines and Op.CALL.side_effects)
+        self.assertEqual((Op.COPY.arity, Op.ADD.arity, Op.GOTO.arity), (1, 2, 0))
+        self.assertEqual([Op.parse(op.text) for op in Op], list(Op))
+        with self.assertRaises(ValueError):
+            p.emit('**', Var('a'), Var('b'), Temp('t1'))
+
+    def test_temp_names_fresh(self):
         tmps = TempAllocator()
-        t0 = tmps.new()
-        t1 = tmps.new()
-        tmps.free(t0)
-        t2 = tmps.new()
-        self.assertEqual(t2.name, t0.name)
+        self.assertEqual([tmps.new().name for _ in range(3)], ['t0', 't1', 't2'])
 
     def test_labels_unique(self):
         ls = LabelManager()
@@ -23,5 +32,35 @@ class TestTACCore(unittest.TestCase):
         L1 = ls.new()
         self.assertNotEqual(L0.name, L1.name)
 
+    def test_pool_canonical_instances(self):
+        pool = OperandPool()
+        self.assertIs(pool.const(0), pool.const(0))
+        self.assertIsNot(pool.const(1), pool.const(True))
+        self.assertIs(pool.intern(Var('x')), pool.var('x'))
+        ids = [pool.id(o) for o in (pool.const(0), pool.const(1), pool.const(True), pool.var('x'))]
+        self.assertEqual(ids, [1, 2, 3, 4])
+        self.assertEqual(pool.id(Temp('t9')), 5)
+        self.assertIs(pool.operands[5], pool.temp('t9'))
+
+    def test_temps_from_pool(self):
+        pool = OperandPool()
+        tmps = TempAllocator(pool=pool)
+        self.assertIs(tmps.new(), pool.temp('t0'))
+
+    def test_void_call_and_bare_return_print_no_operand(self):
+        p = TACProgram()
+        p.emit('call', Label('F_p_0'), Const(0), None)
+        p.emit('ret')
+        self.assertEqual(p.dump(), "call F_p_0, nargs=0\nret")
+
+    def test_operands_compare_by_identity(self):
+        self.assertNotEqual(Var('x'), Var('x'))
+        p = TACProgram()
+        q = p.emit(':=', Const(1), None, Var('x'))
+        self.assertIs(q.a, p.pool.const(1))
+        self.assertIs(q.dst, p.pool.var('x'))
+        moved = TACProgram([q], OperandPool())   # código de otro pool se re-interna
+        self.assertIs(moved.code[0].dst, moved.pool.var('x'))
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
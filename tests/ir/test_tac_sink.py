@@ -0,0 +1,60 @@
+import io
+from program.frontend.parsing import parse_source
+from program.frontend.lowering import lower_program
+from program.semantic.type_checker import TypeChecker
+from program.semantic.error_reporter import ErrorReporter
+from program.ir.tac_builder import TACBuilder
+from program.ir.tac_ir import ColumnarTACProgram
+from program.ir.tac_sink import TextSink, ProgramSink, GeneratorSink
+
+SRC = '''
+    let total: integer = 1 + 2 * 3;
+    function uno(): integer { let k: integer = 4 * 5 + 1; return k - 20; }
+    function dos(): integer {
+        function tres(): integer { return 3; }
+        return uno() + tres() - 2;
+    }
+    let i: integer = 0;
+    while (i < dos()) { i = i + uno(); }
+    print("i=" + i);
+'''
+
+
+def emit(builder):
+    reporter = ErrorReporter()
+    TypeChecker(reporter, builder).visit(lower_program(parse_source(SRC).tree))
+    assert not reporter.has_errors()
+    return builder
+
+
+def test_text_sink_matches_dump():
+    whole = emit(TACBuilder())
+    out = io.StringIO()
+    streamed = emit(TACBuilder(sink=TextSink(out)))
+    assert out.getvalue() == whole.tac.dump() + "\n"
+    assert streamed.peak_temps == whole.peak_temps
+
+
+def test_program_sink_collects_same_program():
+    whole = emit(TACBuilder())
+    sink = ProgramSink(ColumnarTACProgram())
+    emit(TACBuilder(sink=sink))
+    assert sink.program.dump() == whole.tac.dump()
+
+
+def test_generator_gets_one_chunk_per_top_level_function():
+    chunks = []
+    def consumer():
+        try:
+            while True:
+                chunks.append((yield).dump())
+        except GeneratorExit:
+            chunks.append("fin")
+
+    builder = emit(TACBuilder(sink=GeneratorSink(consumer())))
+    assert chunks[-1] == "fin"
+    assert len(chunks) == 4   # hasta uno, hasta dos (con tres adentro), el resto, cierre
+    assert chunks[0].splitlines()[-1] == "Lfunc_end0:"
+    assert "F_tres_2:" in chunks[1] and "F_dos_1:" in chunks[1]
+    assert "\n".join(chunks[:-1]) == emit(TACBuilder()).tac.dump()
+    assert len(builder.tac) == 0   # el builder no retiene lo ya entregado
@@ -0,0 +1,55 @@
+import io
+import json
+from tests.semantic.util import compile_source
+from program.frontend.parsing import parse_source
+from program.frontend.lowering import lower_program
+from program.semantic.error_reporter import ErrorReporter, jsonl_sink
+from program.semantic.type_checker import TypeChecker
+from program.semantic.parallel import check_program_parallel
+
+CASCADE = """
+function f(): integer {
+  let a: integer = falta + 1;
+  let b: integer = falta + 2;
+  return falta;
+}
+let c: integer = falta;
+let d: string = 1;
+"""
+
+
+def _check(code, rep, workers=1):
+    prog = lower_program(parse_source(code).tree)
+    if workers > 1:
+        return check_program_parallel(prog, rep, workers)
+    checker = TypeChecker(rep)
+    checker.visit(prog)
+    return checker
+
+
+def test_dedupe_collapses_same_code_and_symbol():
+    full, _ = compile_source(CASCADE)
+    rep = ErrorReporter(dedupe=True)
+    _check(CASCADE, rep)
+    undef = [e for e in rep if e.code == "E_UNDEF"]
+    assert len(undef) == 1 and undef[0].symbol == "falta"
+    assert rep.suppressed == sum(e.code == "E_UNDEF" for e in full) - 1
+    assert any(e.code == "E_ASSIGN" for e in rep)
+
+
+def test_max_errors_stops_cleanly():
+    rep = ErrorReporter(max_errors=2)
+    checker = _check(CASCADE, rep)
+    assert rep.aborted and rep.count() == 2
+    assert len(checker.scopes.stack) == 1   # los scopes abiertos se desapilan
+
+
+def test_sink_streams_in_order_without_keeping():
+    full, _ = compile_source(CASCADE)
+    for workers in (1, 2):
+        out = io.StringIO()
+        rep = ErrorReporter(sink=jsonl_sink(out), keep=False)
+        _check(CASCADE, rep, workers)
+        lines = [json.loads(l) for l in out.getvalue().splitlines()]
+        assert [(d["line"], d["col"], d["code"]) for d in lines] == [(e.line, e.col, e.code) for e in full]
+        assert rep.errors == [] and rep.count() == full.count()
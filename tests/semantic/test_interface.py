@@ -0,0 +1,102 @@
+import contextlib
+import io
+import pytest
+from program.frontend.parsing import parse_source
+from program.frontend.lowering import lower_program
+from program.semantic.error_reporter import ErrorReporter
+from program.semantic.type_checker import TypeChecker
+from program.semantic.scopes import GlobalScope
+from program.semantic.table import print_scope
+from program.semantic.typesys import INTEGER, make_array, STRING
+from program.semantic import interface
+from program.semantic.interface import (
+    dump_interface, load_interface, install, StaleInterface, _HEADER,
+)
+
+LIB = """
+const LIMITE: integer = 10;
+let nombres: string[][] = [["a"], ["b"]];
+let pendiente: integer;
+class Base { var id: integer; function ident(): integer { return this.id; } }
+class Hijo : Base { function doble(k: integer, s: string): integer { return 2; } }
+function total(): integer { return LIMITE; }
+"""
+
+MAIN = """
+let h: Hijo = new Hijo();
+let x: integer = total() + h.ident();
+let s: string[] = nombres[0];
+let bad: boolean = total();
+pendiente = 1;
+"""
+
+
+def _check(code, preload=()):
+    rep = ErrorReporter()
+    checker = TypeChecker(rep)
+    install(checker, preload)
+    checker.visit(lower_program(parse_source(code).tree))
+    return rep, checker
+
+
+def _table(symbols):
+    g = GlobalScope()
+    for s in symbols:
+        g.define(s)
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        print_scope(g)
+    return out.getvalue()
+
+
+def test_round_trip_preserves_symbols_and_interned_types():
+    rep, checker = _check(LIB)
+    assert not rep.has_errors()
+    g = checker.scopes.stack[0]
+    loaded = load_interface(dump_interface(g, LIB), LIB)
+    assert _table(loaded) == _table(g.slots)
+
+    by_name = {s.name: s for s in loaded}
+    assert by_name["LIMITE"].type is INTEGER and by_name["LIMITE"].is_const
+    assert by_name["nombres"].type is make_array(STRING, 2)
+    assert not by_name["pendiente"].is_initialized
+    assert by_name["Hijo"].base == "Base"
+    doble = by_name["Hijo"].methods["doble"]
+    assert [p.name for p in doble.params] == ["k", "s"] and doble.params[1].index == 1
+
+
+def test_preloaded_interface_checks_like_the_concatenated_source():
+    _, lib_checker = _check(LIB)
+    data = dump_interface(lib_checker.scopes.stack[0], LIB)
+    rep, _ = _check(MAIN, load_interface(data, LIB))
+    full, _ = _check(LIB + MAIN)
+    offset = LIB.count("\n")
+    assert [(e.line + offset, e.col, e.code, e.msg) for e in rep] == \
+           [(e.line, e.col, e.code, e.msg) for e in full]
+
+
+def test_stale_interfaces_are_rejected(monkeypatch):
+    _, checker = _check(LIB)
+    data = dump_interface(checker.scopes.stack[0], LIB)
+    load_interface(data)   # sin fuente no se verifica el hash
+    with pytest.raises(StaleInterface):
+        load_interface(data, LIB + "\nlet otra: integer = 1;")
+    with pytest.raises(StaleInterface):
+        load_interface(b"XXXX" + data[4:], LIB)
+    with pytest.raises(StaleInterface):
+        load_interface(data[:_HEADER.size - 1], LIB)
+    monkeypatch.setattr(interface, "COMPILER_VERSION", interface.COMPILER_VERSION + 1)
+    with pytest.raises(StaleInterface):
+        load_interface(data, LIB)
+
+
+def test_interface_leaves_out_preloaded_library_symbols():
+    lib = load_interface(dump_interface(_check(LIB)[1].scopes.stack[0], LIB))
+    a_src = "function usa(): integer { return total(); }\n"
+    rep, a_checker = _check(a_src, lib)
+    assert not rep.has_errors()
+    a = load_interface(dump_interface(a_checker.scopes.stack[0], a_src, skip=len(lib)), a_src)
+    assert [s.name for s in a] == ["usa"]
+    # con L y A como bibliotecas no hay redeclaraciones
+    rep, _ = _check("let n: integer = usa();", lib + a)
+    assert not rep.has_errors(), [str(e) for e in rep]
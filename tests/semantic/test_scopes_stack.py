@@ -9,3 +9,31 @@ def test_stack_helpers_for_function_and_class():
     assert isinstance(cs, ClassScope)
     st.pop(); st.pop()
     assert st.current.kind == "global"
+
+def test_lookup_returns_depth_and_slot():
+    from program.semantic.symbols import VarSymbol
+    st = ScopeStack(GlobalScope())
+    st.define(VarSymbol("a", T.INTEGER))
+    st.define(VarSymbol("b", T.INTEGER))
+    st.push("block")
+    st.define(VarSymbol("a", T.STRING))   # sombra a la global
+    sym, addr = st.lookup("a")
+    assert addr == (1, 0) and sym.type == T.STRING
+    assert st.lookup("b")[1] == (0, 1)
+    assert st.at(addr) is sym
+    st.pop()
+    assert st.lookup("a")[1] == (0, 0)
+    assert st.lookup("nada") is None
+
+def test_captured_scope_in_two_stacks():
+    from program.semantic.symbols import VarSymbol
+    g = GlobalScope()
+    st = ScopeStack(g)
+    st.push("block")
+    other = ScopeStack(g)      # sigue apilado en st
+    other.define(VarSymbol("x", T.INTEGER))
+    assert other.lookup("x")[1] == (0, 0)
+    st.pop()
+    st.define(VarSymbol("y", T.INTEGER))
+    assert st.lookup("y")[1] == (0, 1)
+    assert ScopeStack(g).lookup("x")[1] == (0, 0)
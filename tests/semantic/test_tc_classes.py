@@ -27,4 +27,67 @@ def test_class_invalid_member_access_and_this_outside():
     a.nope;        // 'a' ni está declarado; además, campo inexistente si se declarara
     """
     rep, _ = compile_source(code_bad)
-    assert rep.has_errors(), "Errores de this fuera de clase y acceso inválido debían fallar"
\ No newline at end of file
+    assert rep.has_errors(), "Errores de this fuera de clase y acceso inválido debían fallar"
+
+
+def test_flattened_layout_offsets_and_method_slots():
+    from program.ir.tac_ir import Addr, Var
+    code = """
+    class A {
+      let a: integer;
+      let b: integer;
+      function get(): integer { return this.a; }
+      function name(): string { return "A"; }
+    }
+    class B : A {
+      let c: string;
+      function name(): string { return "B"; }
+      function extra(): integer { return this.b; }
+    }
+    let x: B = new B();
+    x.a = 3;
+    print(x.get());
+    """
+    rep, checker = compile_source(code)
+    assert not rep.has_errors(), [str(e) for e in rep]
+    a = checker.scopes.resolve("A").layout
+    b = checker.scopes.resolve("B").layout
+    # los campos heredados conservan su offset; los propios van al final
+    assert (b.field_offset("a"), b.field_offset("b"), b.field_offset("c")) == (0, 4, 8)
+    assert b.offsets["a"] == a.offsets["a"] and b.size == 12
+    # la redefinición reutiliza el slot de la base
+    assert b.method_slot("name") == a.method_slot("name") == 1
+    assert b.method_slot("extra") == 2
+    assert b.vtable[1] is b.methods["name"] is not a.methods["name"]
+    assert str(Addr(Var("x"), b.field_offset("c"))) == "&(x+8)"
+
+
+def test_base_declared_after_derived_and_missing_base():
+    code = """
+    class B : A { let c: integer; }
+    class A { let a: integer; }
+    let x: B = new B();
+    x.a = 1;
+    class C : Nada { }
+    let y: C = new C();
+    y.z = 1;
+    """
+    rep, _ = compile_source(code)
+    msgs = [str(e) for e in rep]
+    assert not any("'a'" in m for m in msgs), msgs
+    assert any("E_UNDEF" in m and "Nada" in m for m in msgs), msgs
+
+
+def test_constructor_inherited_from_any_base_level():
+    code = """
+    class A {
+      let v: integer;
+      function constructor(v: integer) { this.v = 0; }
+    }
+    class B : A { }
+    class C : B { }
+    let c: C = new C(1, 2);
+    """
+    rep, _ = compile_source(code)
+    assert [e.code for e in rep] == ["E_NEW"]
+    assert "Número incorrecto de argumentos" in str(next(iter(rep)))
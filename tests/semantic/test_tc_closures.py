@@ -26,3 +26,45 @@ def test_nested_functions_capture_undeclared():
     """
     rep, _ = compile_source(code_bad)
     assert rep.has_errors(), "Uso de identificador no resuelto en closure debía fallar"
+
+
+def test_identifier_use_sites_get_addresses():
+    from program.frontend.parsing import parse_source
+    from program.frontend.lowering import lower_program
+    from program.semantic.error_reporter import ErrorReporter
+    from program.semantic.type_checker import TypeChecker
+    prog = lower_program(parse_source("""
+        let a: integer = 1;
+        if (true) { let b: integer = a; b = a + b; }
+    """).tree)
+    TypeChecker(ErrorReporter()).visit(prog)
+    block = prog.body[1].then
+    decl_b, assign = block.body
+    assert decl_b.init.addr == (0, 0)          # 'a' global, slot 0
+    assert assign.addr == (1, 0)               # block del if, slot 0
+    assert [o.addr for o in assign.value.operands] == [(0, 0), (1, 0)]
+
+
+def test_calls_do_not_touch_captured_scopes():
+    from program.frontend.parsing import parse_source
+    from program.frontend.lowering import lower_program
+    from program.semantic.error_reporter import ErrorReporter
+    from program.semantic.type_checker import TypeChecker
+    prog = lower_program(parse_source("""
+        function outer(): integer {
+          let k: integer = 1;
+          function inner(): integer { return k; }
+          while (k < 10) { k = k + inner(); }
+          return inner();
+        }
+        let r: integer = outer();
+    """).tree)
+    checker = TypeChecker(ErrorReporter())
+    g = checker.scopes.stack[0]
+    entered = []
+    enter = checker.scopes._enter
+    checker.scopes._enter = lambda scope: (entered.append(scope), enter(scope))
+    checker.visit(prog)
+    # solo se apilan scopes nuevos (función y bloques), nunca uno capturado
+    assert len({id(s) for s in entered}) == len(entered) and g not in entered
+    assert g.symbols["outer"].closure_scope is g and g.parent is None
@@ -0,0 +1,93 @@
+from program.frontend.parsing import parse_source
+from program.frontend.lowering import lower_program
+from program.semantic.error_reporter import ErrorReporter
+from program.semantic.type_checker import TypeChecker
+from program.semantic.incremental import IncrementalChecker
+
+
+def _full(code):
+    rep = ErrorReporter()
+    TypeChecker(rep).visit(lower_program(parse_source(code).tree))
+    return [str(e) for e in rep]
+
+
+def _inc(inc, code):
+    rep = ErrorReporter()
+    checker = inc.check(lower_program(parse_source(code).tree), code, rep)
+    return [str(e) for e in rep], checker
+
+
+BASE = """
+let contador: integer;
+class Caja {
+  var v: integer;
+  function get(): integer { return this.v; }
+}
+function usa(c: Caja): integer {
+  return c.get() + "x";
+}
+function otra(): boolean {
+  return total;
+}
+function inicia(): void {
+  contador = 1;
+}
+let total: integer = contador;
+"""
+
+
+def test_unchanged_units_are_reused_with_same_diagnostics():
+    inc = IncrementalChecker()
+    first, _ = _inc(inc, BASE)
+    assert first == _full(BASE)
+    assert inc.last_rechecked == ["Caja", "usa", "otra", "inicia"]
+
+    again, checker = _inc(inc, BASE)
+    assert again == first
+    assert inc.last_rechecked == []
+    # efecto del cuerpo reutilizado y miembros de la clase reutilizada
+    g = checker.scopes.stack[0]
+    assert g.symbols["contador"].is_initialized
+    assert set(g.symbols["Caja"].methods) == {"get"}
+
+
+def test_edit_rechecks_only_the_edited_body_and_shifts_the_rest():
+    inc = IncrementalChecker()
+    _inc(inc, BASE)
+    edited = BASE.replace('return c.get() + "x";', 'let a: integer = 1;\n  return c.get() + a;')
+    errs, _ = _inc(inc, edited)
+    assert inc.last_rechecked == ["usa"]
+    assert errs == _full(edited)
+
+
+def test_dependency_change_rechecks_dependents():
+    inc = IncrementalChecker()
+    _inc(inc, BASE)
+    edited = BASE.replace("var v: integer;", "var v: string;")
+    errs, _ = _inc(inc, edited)
+    assert inc.last_rechecked == ["Caja", "usa"]
+    assert errs == _full(edited)
+
+    # un nombre que no existía y pasa a existir también invalida
+    edited2 = "let total: boolean = true;\n" + edited.replace("let total: integer = contador;", "")
+    errs, _ = _inc(inc, edited2)
+    assert "otra" in inc.last_rechecked
+    assert errs == _full(edited2)
+
+
+def test_base_class_change_rechecks_users_of_derived_class():
+    code = """
+class B { let x: integer; }
+class C : B { }
+function f(): void {
+  let c: C = new C();
+  c.x = 1;
+}
+"""
+    inc = IncrementalChecker()
+    errs, _ = _inc(inc, code)
+    assert errs == _full(code)
+    edited = code.replace("let x: integer;", "let z: integer;")
+    errs, _ = _inc(inc, edited)
+    assert "f" in inc.last_rechecked
+    assert errs == _full(edited) != []
@@ -0,0 +1,64 @@
+import contextlib
+import io
+from program.frontend.parsing import parse_source
+from program.frontend.lowering import lower_program
+from program.semantic.error_reporter import ErrorReporter
+from program.semantic.type_checker import TypeChecker
+from program.semantic.parallel import check_program_parallel
+from program.semantic.table import print_symbol_table
+
+
+def _run(code, workers):
+    prog = lower_program(parse_source(code).tree)
+    rep = ErrorReporter()
+    if workers > 1:
+        checker = check_program_parallel(prog, rep, workers)
+    else:
+        checker = TypeChecker(rep)
+        checker.visit(prog)
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        print_symbol_table(checker.scopes)
+    return [str(e) for e in rep], out.getvalue()
+
+
+PROGRAM = """
+let total: integer = 0;
+let sinInit: integer;
+class Caja {
+  var v: integer;
+  function get(): integer { return this.v; }
+}
+function f(a: integer): integer {
+  let c: Caja = new Caja();
+  return a + c.get() + sinInit;
+}
+let mal: string = 1;
+function g(): string {
+  return f(1) + true;
+}
+function h(): boolean {
+  return noExiste;
+}
+function k(n: integer): integer {
+  if (n > 0) { return k(n - 1); }
+  return g();
+}
+total = f(2);
+"""
+
+
+def test_parallel_matches_sequential():
+    seq = _run(PROGRAM, 1)
+    assert seq[0], "el programa de prueba debe tener errores en varios cuerpos"
+    assert _run(PROGRAM, 2) == seq
+
+
+def test_body_initializing_global_falls_back_to_sequential():
+    code = """
+    let x: integer;
+    function init(): void { x = 1; }
+    function uso(): integer { return x; }
+    let y: integer = x;
+    """
+    assert _run(code, 2) == _run(code, 1)
@@ -0,0 +1,50 @@
+import json
+from program.frontend.parsing import parse_source
+from program.frontend.lowering import lower_program
+from program.semantic.error_reporter import ErrorReporter
+from program.semantic.type_checker import TypeChecker
+from program.semantic.profiling import VisitorProfile
+
+CODE = """
+let a: integer = 1;
+function f(x: integer): integer { return x + a; }
+let b: integer = f(a) + f(2);
+print(c);
+"""
+
+
+def _prog():
+    return lower_program(parse_source(CODE).tree)
+
+
+def test_profile_counts_visitors_and_lookups():
+    prof = VisitorProfile()
+    checker = TypeChecker(ErrorReporter(), profile=prof)
+    checker.visit(_prog())
+    calls = {r["visitor"]: r["calls"] for r in prof.rows()}
+    assert calls["visitProgram"] == 1
+    assert calls["visitFunctionDeclaration"] == 1
+    assert calls["visitCallExpr"] == 2
+    assert prof.lookups > 0 and prof.lookup_misses == 1
+    root = next(r for r in prof.rows() if r["visitor"] == "visitProgram")
+    assert all(r["self_ms"] <= root["cum_ms"] + 1e-6 for r in prof.rows())
+    data = json.loads(prof.to_json())
+    assert data["lookups"]["calls"] == prof.lookups
+
+
+def test_without_profile_dispatch_is_untouched():
+    checker = TypeChecker(ErrorReporter())
+    assert not any(k.startswith("visit") for k in vars(checker))
+    assert "lookup" not in vars(checker.scopes)
+
+    prof = VisitorProfile()
+    checker = TypeChecker(ErrorReporter(), profile=prof)
+    prof.detach()
+    assert not any(k.startswith("visit") for k in vars(checker))
+    assert "lookup" not in vars(checker.scopes)
+
+
+def test_profile_does_not_wrap_visit_itself():
+    prof = VisitorProfile()
+    TypeChecker(ErrorReporter(), profile=prof).visit(_prog())
+    assert "visit" not in {r["visitor"] for r in prof.rows()}
@@ -32,3 +32,55 @@ def test_comparison():
     assert comparison_type(STRING, STRING).name == "boolean"
     # orden solo numérico
     assert comparison_type(INTEGER, STRING) is None
+
+def test_types_are_interned():
+    import copy, pickle
+    from program.semantic.typesys import Type, ArrayType, FunctionType
+    assert make_array(INTEGER, 2) is make_array(INTEGER, 2)
+    assert ArrayType(name="integer[][]", elem=INTEGER, dims=2) is make_array(INTEGER, 2)
+    assert make_fn([INTEGER, STRING], VOID) is make_fn((INTEGER, STRING), VOID)
+    assert make_fn([INTEGER], VOID) is not make_fn([STRING], VOID)
+    assert Type("integer") is INTEGER
+    assert Type("Persona") is Type("Persona")
+    fn = make_fn([make_array(STRING)], BOOLEAN)
+    assert pickle.loads(pickle.dumps(fn)) is fn
+    assert copy.deepcopy(fn) is fn
+    assert isinstance(fn, FunctionType) and hash(fn) == hash(make_fn([make_array(STRING)], BOOLEAN))
+
+def test_interned_lookup_does_not_construct(monkeypatch):
+    from program.semantic.typesys import Type, ArrayType
+    arr = make_array(INTEGER, 2)   # la tabla es débil: se retiene el tipo
+    built = []
+    for cls in (Type, ArrayType):
+        init = cls.__init__
+        monkeypatch.setattr(cls, "__init__",
+                            lambda self, *a, init=init, **kw: built.append(a) or init(self, *a, **kw))
+    assert Type("integer") is INTEGER
+    assert ArrayType("integer[][]", INTEGER, dims=2) is arr
+    assert built == []
+
+def test_operator_table_agrees_with_rules_for_every_kind_pair():
+    import program.semantic.typesys as T
+    samples = dict(T.KIND_SAMPLES)
+    # representantes extra que la tabla no vio al construirse
+    samples[T.K_ARRAY] += (make_array(BOOLEAN, 3), make_array(T.Type("A")))
+    samples[T.K_CLASS] += (T.ClassType("Persona"),)
+    samples[T.K_NAMED] += (T.Type("Persona"),)
+    samples[T.K_FUNCTION] += (make_fn([STRING, INTEGER], BOOLEAN),)
+    public = {
+        T._plus_rule: T.plus_type, T._arith_rule: T.arith_type,
+        T._relational_rule: T.relational_type, T._equality_rule: T.equality_type,
+        T._logical_rule: T.logical_type,
+    }
+    for op, rule in T._OP_RULES.items():
+        for lk in T.KINDS:
+            for rk in T.KINDS:
+                for l in samples[lk]:
+                    for r in samples[rk]:
+                        expected = rule(l, r)
+                        got = T.binary_type(op, l, r)
+                        if expected is None:
+                            assert got == T.OP_ERRORS[op], (op, l, r)
+                        else:
+                            assert got is expected, (op, l, r)
+                        assert public[rule](l, r) is expected, (op, l, r)